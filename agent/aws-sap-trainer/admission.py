@@ -0,0 +1,386 @@
+"""Admission control in front of the entrypoint.
+
+Three rules apply to every invocation, in this order:
+
+1. **Coalescing** — a non-streaming request identical to one already in flight
+   for the same session (same prompt and options, e.g. a client retry) does
+   not run again: it waits for the first one and gets the same result.
+2. **Per-session serialization** — requests of one session run one at a time,
+   in arrival order, so their memory retrieval, conversation history and
+   ingested turns never interleave. Up to ADMISSION_SESSION_QUEUE_SIZE
+   requests may wait behind the one a session is running.
+3. **Global limit** — at most ADMISSION_MAX_CONCURRENT requests run at once.
+   Up to ADMISSION_QUEUE_SIZE more may wait for a free slot. Requests waiting
+   for their session do not count here, so one busy session cannot fill the
+   queue while slots are free.
+
+A request waits at most ADMISSION_QUEUE_TIMEOUT seconds in total. When a queue
+is full ``Busy`` is raised right away, so a burst gets a fast "try again"
+instead of a slow timeout.
+
+The same ``Admission`` serves the sync entrypoint (waiting on threads) and
+the async one (waiting on the event loop). A streamed response keeps its
+session and slot until the stream ends.
+
+In the sync entrypoint every request held here, whether running or waiting
+for a slot, its session or a coalesced twin, blocks a threadpool thread. At
+most ADMISSION_MAX_THREADS are held at once; beyond that ``Busy`` is raised
+right away. Keeping this below the pool size leaves threads free to turn
+excess requests away with a fast 429, instead of leaving them queued in the
+pool where admission never sees them.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import os
+import threading
+import time
+import weakref
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Hashable
+
+import telemetry
+
+ADMISSION_MAX_CONCURRENT = int(os.getenv("ADMISSION_MAX_CONCURRENT", "32"))
+ADMISSION_QUEUE_SIZE = int(os.getenv("ADMISSION_QUEUE_SIZE", "8"))
+ADMISSION_SESSION_QUEUE_SIZE = int(os.getenv("ADMISSION_SESSION_QUEUE_SIZE", "8"))
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "10"))
+# Starlette runs sync endpoints on anyio's default pool of 40 threads
+ADMISSION_MAX_THREADS = int(os.getenv("ADMISSION_MAX_THREADS", "38"))
+
+
+class Busy(Exception):
+    """The request was not admitted: the queue is full or the wait timed out."""
+
+
+class _Waiter:
+    """A one-shot wake-up usable from a thread or from an event loop."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop | None = None):
+        self._loop = loop
+        self._event = threading.Event() if loop is None else None
+        self._future = loop.create_future() if loop is not None else None
+
+    def wake(self) -> None:
+        if self._loop is None:
+            self._event.set()
+        else:
+            self._loop.call_soon_threadsafe(self._resolve)
+
+    def _resolve(self) -> None:
+        if not self._future.done():
+            self._future.set_result(None)
+
+    def wait(self, timeout: float | None) -> bool:
+        return self._event.wait(timeout)
+
+    async def wait_async(self, timeout: float | None) -> bool:
+        try:
+            await asyncio.wait_for(asyncio.shield(self._future), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+
+@dataclass
+class _Flight:
+    """An in-flight request that identical requests wait for."""
+
+    waiters: list[_Waiter] = field(default_factory=list)
+    done: bool = False
+    result: Any = None
+    error: BaseException | None = None
+
+
+class Admission:
+    def __init__(
+        self,
+        max_concurrent: int = ADMISSION_MAX_CONCURRENT,
+        queue_size: int = ADMISSION_QUEUE_SIZE,
+        queue_timeout: float = ADMISSION_QUEUE_TIMEOUT,
+        session_queue_size: int = ADMISSION_SESSION_QUEUE_SIZE,
+        max_threads: int = ADMISSION_MAX_THREADS,
+    ):
+        self.max_concurrent = max_concurrent
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.session_queue_size = session_queue_size
+        self.max_threads = max_threads
+        self._lock = threading.Lock()
+        self._threads = 0  # requests held by the sync entrypoint
+        self._running = 0
+        self._queued = 0  # waiting for a global slot
+        self._session_waiting = 0  # waiting behind an earlier request of their session
+        self._slot_waiters: deque[_Waiter] = deque()
+        self._sessions: dict[str, deque[_Waiter]] = {}  # head holds the session
+        self._flights: dict[Hashable, _Flight] = {}
+        self._admitted = 0
+        self._rejected = 0
+        self._coalesced = 0
+
+    # -- sync entrypoint ----------------------------------------------------
+
+    def run(self, session_id: str, key: Hashable | None, call: Callable[[], Any]) -> Any:
+        """Run ``call`` under the admission rules; ``key`` enables coalescing."""
+        self._hold_thread()
+        try:
+            return self._run(session_id, key, call)
+        finally:
+            with self._lock:
+                self._threads -= 1
+
+    def _run(self, session_id: str, key: Hashable | None, call: Callable[[], Any]) -> Any:
+        flight, leader = self._join(key)
+        if not leader:
+            waiter = _Waiter()
+            if not self._follow(flight, waiter):
+                waiter.wait(None)
+            return self._outcome(flight)
+
+        try:
+            started = time.monotonic()
+            deadline = started + self.queue_timeout
+            turn = _Waiter()
+            if self._reserve(session_id, turn):
+                self._session_waited(session_id, turn, turn.wait(self._remaining(deadline)))
+            slot = self._take_slot(session_id, turn, None)
+            if slot is not None:
+                self._slot_waited(session_id, turn, slot, slot.wait(self._remaining(deadline)))
+            self._admit(started)
+            try:
+                result = call()
+            except BaseException:
+                self._leave(session_id, turn)
+                raise
+            result = self._hold_for_stream(session_id, turn, result)
+        except BaseException as e:
+            self._land(key, flight, error=e)
+            raise
+        self._land(key, flight, result=result)
+        return result
+
+    # -- async entrypoint ---------------------------------------------------
+
+    async def run_async(self, session_id: str, key: Hashable | None, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Async variant of ``run``; waiting never blocks the event loop."""
+        loop = asyncio.get_running_loop()
+        flight, leader = self._join(key)
+        if not leader:
+            waiter = _Waiter(loop)
+            if not self._follow(flight, waiter):
+                await waiter.wait_async(None)
+            return self._outcome(flight)
+
+        try:
+            started = time.monotonic()
+            deadline = started + self.queue_timeout
+            turn = _Waiter(loop)
+            if self._reserve(session_id, turn):
+                self._session_waited(session_id, turn, await turn.wait_async(self._remaining(deadline)))
+            slot = self._take_slot(session_id, turn, loop)
+            if slot is not None:
+                self._slot_waited(session_id, turn, slot, await slot.wait_async(self._remaining(deadline)))
+            self._admit(started)
+            try:
+                result = await call()
+            except BaseException:
+                self._leave(session_id, turn)
+                raise
+            result = self._hold_for_stream(session_id, turn, result)
+        except BaseException as e:
+            self._land(key, flight, error=e)
+            raise
+        self._land(key, flight, result=result)
+        return result
+
+    # -- shared -------------------------------------------------------------
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "running": self._running,
+                "queued": self._queued,
+                "session_waiting": self._session_waiting,
+                "threads": self._threads,
+                "sessions": len(self._sessions),
+                "in_flight": len(self._flights),
+                "admitted": self._admitted,
+                "rejected": self._rejected,
+                "coalesced": self._coalesced,
+            }
+
+    def _hold_thread(self) -> None:
+        with self._lock:
+            if self.max_threads <= 0 or self._threads < self.max_threads:
+                self._threads += 1
+                return
+            self._rejected += 1
+        telemetry.incr("admission.rejected")
+        raise Busy(f"{self.max_threads} requests already hold a thread")
+
+    def _join(self, key: Hashable | None) -> tuple[_Flight | None, bool]:
+        """Return the flight for ``key`` and whether this request leads it."""
+        if key is None:
+            return None, True
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                self._coalesced += 1
+                telemetry.incr("admission.coalesced")
+                return flight, False
+            flight = self._flights[key] = _Flight()
+            return flight, True
+
+    def _follow(self, flight: _Flight, waiter: _Waiter) -> bool:
+        """Register ``waiter`` on ``flight``; True when it has already landed."""
+        with self._lock:
+            if flight.done:
+                return True
+            flight.waiters.append(waiter)
+            return False
+
+    @staticmethod
+    def _outcome(flight: _Flight) -> Any:
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    def _land(self, key: Hashable | None, flight: _Flight | None, result: Any = None,
+              error: BaseException | None = None) -> None:
+        if flight is None:
+            return
+        with self._lock:
+            self._flights.pop(key, None)
+            flight.done, flight.result, flight.error = True, result, error
+            waiters, flight.waiters = flight.waiters, []
+        for waiter in waiters:
+            waiter.wake()
+
+    @staticmethod
+    def _remaining(deadline: float) -> float:
+        return max(0.0, deadline - time.monotonic())
+
+    def _reserve(self, session_id: str, turn: _Waiter) -> bool:
+        """Queue ``turn`` for the session; True when another request holds it."""
+        with self._lock:
+            queue = self._sessions.get(session_id)
+            if queue is not None and len(queue) > self.session_queue_size:
+                self._rejected += 1
+                telemetry.incr("admission.rejected")
+                raise Busy(f"{len(queue) - 1} requests of this session already waiting")
+            if queue is None:
+                queue = self._sessions[session_id] = deque()
+            queue.append(turn)
+            if len(queue) == 1:
+                return False
+            self._session_waiting += 1
+            return True
+
+    def _session_waited(self, session_id: str, turn: _Waiter, woken: bool) -> None:
+        """Account for a wait for the session; on timeout leave its queue and raise ``Busy``."""
+        with self._lock:
+            self._session_waiting -= 1
+            if woken:
+                return
+            self._rejected += 1
+        telemetry.incr("admission.rejected")
+        self._release_session(session_id, turn)  # passes the session on if it was handed over meanwhile
+        raise Busy(f"not admitted within {self.queue_timeout:g}s")
+
+    def _take_slot(self, session_id: str, turn: _Waiter, loop: asyncio.AbstractEventLoop | None) -> _Waiter | None:
+        """Take a global slot, or return a waiter queued for the next free one.
+
+        Raises ``Busy`` (leaving the session) when the slot queue is full.
+        """
+        with self._lock:
+            if self.max_concurrent <= 0 or (self._running < self.max_concurrent and not self._slot_waiters):
+                self._running += 1
+                return None
+            if self._queued >= self.queue_size:
+                self._rejected += 1
+                busy = Busy(f"{self._running} requests running and {self._queued} queued")
+            else:
+                self._queued += 1
+                slot = _Waiter(loop)
+                self._slot_waiters.append(slot)
+                return slot
+        telemetry.incr("admission.rejected")
+        self._release_session(session_id, turn)
+        raise busy
+
+    def _slot_waited(self, session_id: str, turn: _Waiter, slot: _Waiter, woken: bool) -> None:
+        """Account for a wait for a slot; on timeout leave the queues and raise ``Busy``."""
+        with self._lock:
+            self._queued -= 1
+            if woken:
+                return
+            granted = slot not in self._slot_waiters
+            if not granted:
+                self._slot_waiters.remove(slot)
+            self._rejected += 1
+        telemetry.incr("admission.rejected")
+        if granted:
+            self._release_slot()  # handed over just as the wait timed out
+        self._release_session(session_id, turn)
+        raise Busy(f"not admitted within {self.queue_timeout:g}s")
+
+    def _admit(self, started: float) -> None:
+        with self._lock:
+            self._admitted += 1
+        telemetry.observe("admission.wait_ms", (time.monotonic() - started) * 1000)
+
+    def _hold_for_stream(self, session_id: str, turn: _Waiter, result: Any) -> Any:
+        """Keep the session and slot until a streamed response is fully sent."""
+        if not inspect.isasyncgen(result):
+            self._leave(session_id, turn)
+            return result
+
+        released = threading.Event()
+
+        def leave_once() -> None:
+            if not released.is_set():
+                released.set()
+                self._leave(session_id, turn)
+
+        async def stream():
+            try:
+                async for event in result:
+                    yield event
+            finally:
+                leave_once()
+
+        wrapped = stream()
+        # A stream that is dropped without ever being iterated never runs its
+        # finally block; release when it is garbage collected instead
+        weakref.finalize(wrapped, leave_once)
+        return wrapped
+
+    def _leave(self, session_id: str, turn: _Waiter) -> None:
+        self._release_slot()
+        self._release_session(session_id, turn)
+
+    def _release_slot(self) -> None:
+        with self._lock:
+            if not self._slot_waiters:
+                self._running -= 1
+                return
+            nxt = self._slot_waiters.popleft()  # hand the slot over
+        nxt.wake()
+
+    def _release_session(self, session_id: str, turn: _Waiter) -> None:
+        """Remove ``turn`` from the session's queue, passing the session on if it held it."""
+        with self._lock:
+            queue = self._sessions.get(session_id)
+            if not queue or turn not in queue:
+                return
+            held = queue[0] is turn
+            queue.remove(turn)
+            if not queue:
+                del self._sessions[session_id]
+                return
+            nxt = queue[0] if held else None
+        if nxt is not None:
+            nxt.wake()
@@ -0,0 +1,135 @@
+"""Pool of pre-built Strands agents reused across invocations.
+
+Building an ``Agent`` registers every tool again (``@tool`` introspection,
+MCP tool specs). The pool keeps idle agents instead: each request leases one
+for its exclusive use and hands it back afterwards, when its conversation
+state is reset so nothing leaks into the next request. Only one request
+uses an agent at a time, which is what the previous agent-per-invocation
+design guaranteed, without paying for a build every time.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from typing import Callable
+
+from strands import Agent
+from strands.agent.state import AgentState
+from strands.telemetry.metrics import EventLoopMetrics
+
+# Starlette runs sync entrypoints on anyio's threadpool, 40 threads by default,
+# so at most that many agents are ever leased at once
+AGENT_POOL_SIZE = int(os.getenv("AGENT_POOL_SIZE", "40"))
+
+
+class AgentPool:
+    """Thread-safe LIFO pool of agents built by ``factory``.
+
+    ``acquire`` never blocks: when no idle agent is available a new one is
+    built. At most ``size`` idle agents are kept; extra ones are dropped on
+    release. ``clear`` discards every idle agent and marks leased ones so they
+    are dropped on release, e.g. when the tools they were built with change.
+    """
+
+    def __init__(self, factory: Callable[[], Agent], size: int = AGENT_POOL_SIZE):
+        self._factory = factory
+        self.size = size
+        self._lock = threading.Lock()
+        self._idle: list[Agent] = []
+        self._generation = 0
+        self._leased: dict[int, int] = {}  # id(agent) → generation it was built for
+        self._created = 0
+        self._reused = 0
+        self._discarded = 0
+
+    def acquire(self) -> Agent:
+        with self._lock:
+            if self._idle:
+                agent = self._idle.pop()
+                self._reused += 1
+                self._leased[id(agent)] = self._generation
+                return agent
+            generation = self._generation
+        agent = self._factory()
+        with self._lock:
+            self._created += 1
+            self._leased[id(agent)] = generation
+        return agent
+
+    def release(self, agent: Agent, discard: bool = False) -> None:
+        """Return ``agent`` to the pool, or drop it when ``discard`` is set
+        (e.g. its invocation failed half-way), it stopped on an interrupt, or
+        the pool is full or was cleared."""
+        discard = discard or _interrupted(agent)
+        with self._lock:
+            generation = self._leased.pop(id(agent), None)
+            keep = not discard and generation == self._generation and len(self._idle) < self.size
+            if not keep:
+                self._discarded += 1
+                return
+        _reset(agent)
+        with self._lock:
+            if generation == self._generation and len(self._idle) < self.size:
+                self._idle.append(agent)
+            else:
+                self._discarded += 1
+
+    def prewarm(self, count: int | None = None) -> None:
+        """Build idle agents up front (default: fill the pool)."""
+        count = self.size if count is None else min(count, self.size)
+        with self._lock:
+            missing = max(0, count - len(self._idle))
+        agents = [self.acquire() for _ in range(missing)]
+        for agent in agents:
+            self.release(agent)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._discarded += len(self._idle)
+            self._idle.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "idle": len(self._idle),
+                "leased": len(self._leased),
+                "size": self.size,
+                "created": self._created,
+                "reused": self._reused,
+                "discarded": self._discarded,
+            }
+
+
+def _interrupted(agent: Agent) -> bool:
+    """Whether ``agent`` stopped on an interrupt and awaits its responses.
+
+    Such an agent holds the pending tool execution of its invocation, so it
+    is rebuilt rather than reset.
+    """
+    interrupt_state = getattr(agent, "_interrupt_state", None)
+    return bool(interrupt_state is not None and interrupt_state.activated)
+
+
+def _reset(agent: Agent) -> None:
+    """Drop the conversation state of a finished invocation.
+
+    New objects are assigned rather than cleared in place, because the
+    previous AgentResult still references the old metrics. The private
+    interrupt, model and checkpoint state is reset too when this Strands
+    version has it.
+    """
+    agent.messages = []
+    agent.state = AgentState()
+    agent.event_loop_metrics = EventLoopMetrics()
+    if hasattr(agent.conversation_manager, "removed_message_count"):
+        agent.conversation_manager.removed_message_count = 0
+    if hasattr(agent, "_interrupt_state"):
+        agent._interrupt_state = type(agent._interrupt_state)()
+    if hasattr(agent, "_model_state"):
+        agent._model_state = {}
+    if hasattr(agent, "_checkpoint"):
+        agent._checkpoint = None
+        agent._checkpoint_cycle_index = 0
+        agent._checkpoint_resume_position = None
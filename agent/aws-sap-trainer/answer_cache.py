@@ -0,0 +1,322 @@
+"""Opt-in cache of final answers to standalone questions, shared by all sessions.
+
+Learners keep asking the same canonical questions ("Transit Gateway vs VPC
+peering", "when to use Kinesis Firehose"). With ANSWER_CACHE_TTL set, the
+answer to the first one is kept and later questions close enough to it are
+answered from the cache: no memory retrieval, no Bedrock call, no MCP doc
+lookups.
+
+A question is reduced to its content words, in order (lower-cased, question
+framing such as "what is" or "explain" removed, plurals folded). Questions
+with the same words in the same order share a key. Otherwise a MinHash
+signature of the words and their ordered pairs is split into LSH bands to find
+candidates, and the best candidate whose Jaccard similarity reaches
+ANSWER_CACHE_THRESHOLD is served, provided that:
+
+- negations agree ("when *not* to use …"), and so does what follows each
+  direction word ("from RDS to Aurora" never matches "from Aurora to RDS");
+- a question with fewer than ANSWER_CACHE_FUZZY_MIN_TERMS content words has
+  exactly the same words, so a short question with an added qualifier ("… in
+  S3 *Glacier*") is a miss.
+
+Only answers that do not depend on the asker are stored: the first turn of
+a session (no history to build on) whose run did not use the Google Drive
+tools. Entries expire after ANSWER_CACHE_TTL seconds and are evicted least
+recently used beyond ANSWER_CACHE_MAX_BYTES. With ANSWER_CACHE_DB set they
+are also written to that SQLite file and restored when the process starts.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, NamedTuple
+
+import telemetry
+from cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", "0"))
+ANSWER_CACHE_MAX_BYTES = int(os.getenv("ANSWER_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.9"))
+ANSWER_CACHE_FUZZY_MIN_TERMS = int(os.getenv("ANSWER_CACHE_FUZZY_MIN_TERMS", "8"))
+ANSWER_CACHE_DB = os.getenv("ANSWER_CACHE_DB", "")
+
+# 16 bands of 4 rows: a pair with similarity 0.9 shares a band with
+# probability > 0.999, one with similarity 0.3 with probability < 0.13
+_BANDS = 16
+_ROWS = 4
+_PRIME = (1 << 61) - 1
+_rng = random.Random(0x5A9)  # fixed seed: signatures are stable across restarts
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(_PRIME)) for _ in range(_BANDS * _ROWS)]
+
+_WORD_RE = re.compile(r"\w+")
+# Question framing that does not change which answer is wanted. Words such as
+# "not", "when", "why", "how", "from" or "to" do, so they are kept.
+_STOPWORDS = frozenset("""
+    a an the is are was were be been of in on at for by with about and or
+    what whats s it its this that these those i me my you your we us our please
+    can could would will should do does did tell explain describe give show
+    some any there here amazon aws
+""".split())
+# Words that turn a question around ("when not to use …"): two questions only
+# match when they share the same ones
+_PIVOTS = frozenset("not no never without except instead avoid don doesn isn cannot".split())
+# Words that give a question a direction ("from X to Y", "X vs Y"): two
+# questions only match when the same word follows each of them
+_DIRECTIONS = frozenset("from to into onto than over vs versus".split())
+
+# Tools whose results belong to one learner; answers that used them are not shared
+_PERSONAL_TOOLS = ("save_session_to_google_drive", "load_session_from_google_drive")
+
+
+class Hit(NamedTuple):
+    text: str
+    similarity: float
+    prompt: str  # the question the answer was generated for
+
+
+@dataclass(frozen=True)
+class _Answer:
+    prompt: str
+    terms: tuple[str, ...]
+    text: str
+    created: float  # wall clock, so persisted entries can be aged on restore
+
+    @property
+    def size(self) -> int:
+        return len(self.prompt.encode("utf-8")) + len(self.text.encode("utf-8")) + 16 * len(self.terms)
+
+
+def _terms(prompt: str) -> tuple[str, ...]:
+    """Content words of a question in order, with a naive plural fold."""
+    words = [w for w in _WORD_RE.findall(prompt.lower()) if w not in _STOPWORDS]
+    return tuple(w[:-1] if len(w) > 3 and w.endswith("s") and not w.endswith("ss") else w for w in words)
+
+
+def _shingles(terms: tuple[str, ...]) -> frozenset:
+    """Words plus ordered word pairs, so reordering lowers the similarity."""
+    return frozenset(terms) | frozenset(zip(terms, terms[1:]))
+
+
+def _anchors(terms: tuple[str, ...]) -> frozenset:
+    """Negations, and each direction word with the word after it."""
+    anchors = {t for t in terms if t in _PIVOTS}
+    anchors.update((t, nxt) for t, nxt in zip(terms, terms[1:] + ("",)) if t in _DIRECTIONS)
+    return frozenset(anchors)
+
+
+def _signature(terms: tuple[str, ...]) -> tuple[int, ...]:
+    hashes = [
+        int.from_bytes(hashlib.blake2b(repr(shingle).encode("utf-8"), digest_size=8).digest(), "big")
+        for shingle in _shingles(terms)
+    ]
+    return tuple(min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS)
+
+
+def _bands(scope: str, terms: tuple[str, ...]) -> list[tuple]:
+    signature = _signature(terms)
+    return [(scope, i, signature[i * _ROWS:(i + 1) * _ROWS]) for i in range(_BANDS)]
+
+
+def _similarity(a: tuple[str, ...], b: tuple[str, ...], fuzzy_min_terms: int = ANSWER_CACHE_FUZZY_MIN_TERMS) -> float:
+    """Jaccard similarity of two questions' shingles, 0 when they cannot share an answer."""
+    if _anchors(a) != _anchors(b):
+        return 0.0
+    if min(len(set(a)), len(set(b))) < fuzzy_min_terms and set(a) != set(b):
+        return 0.0
+    sa, sb = _shingles(a), _shingles(b)
+    return len(sa & sb) / len(sa | sb)
+
+
+class _AnswerStore:
+    """TTL/LRU answers keyed by (scope, terms) plus the LSH index over them."""
+
+    def __init__(self, ttl: float, max_bytes: int, threshold: float, db_path: str,
+                 fuzzy_min_terms: int = ANSWER_CACHE_FUZZY_MIN_TERMS):
+        self.threshold = threshold
+        self.fuzzy_min_terms = fuzzy_min_terms
+        self._cache = TTLCache(ttl=ttl, max_bytes=max_bytes, sizeof=lambda answer: answer.size)
+        self._lock = threading.Lock()
+        self._index: dict[tuple, set[tuple[str, ...]]] = {}
+        self._indexed = 0
+        self._stats = {"lookups": 0, "hits": 0, "similar_hits": 0, "stored": 0, "skipped": 0}
+        self._db: sqlite3.Connection | None = None
+        if self.enabled and db_path:
+            self._open(db_path)
+
+    @property
+    def enabled(self) -> bool:
+        return self._cache.enabled
+
+    def lookup(self, scope: str, prompt: str) -> Hit | None:
+        terms = _terms(prompt)
+        if not terms:
+            return None
+        self._count("lookups")
+        answer = self._cache.get((scope, terms))
+        similarity = 1.0
+        if answer is None:
+            answer, similarity = self._nearest(scope, terms)
+        if answer is None:
+            return None
+        self._count("hits" if similarity == 1.0 else "similar_hits")
+        return Hit(answer.text, round(similarity, 3), answer.prompt)
+
+    def store(self, scope: str, prompt: str, text: str) -> None:
+        terms = _terms(prompt)
+        if not terms:
+            return
+        answer = _Answer(prompt, terms, text, time.time())
+        self._put(scope, answer)
+        self._count("stored")
+        if self._db is not None:
+            self._persist(scope, answer)
+
+    def skip(self) -> None:
+        self._count("skipped")
+
+    def stats(self) -> dict:
+        cache = self._cache.stats()
+        with self._lock:
+            return {
+                **self._stats,
+                "entries": cache["entries"],
+                "bytes": cache["bytes"],
+                "evictions": cache["evictions"],
+                "expirations": cache["expirations"],
+                "persistent": self._db is not None,
+            }
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    def _nearest(self, scope: str, terms: tuple[str, ...]) -> tuple[_Answer | None, float]:
+        bands = _bands(scope, terms)
+        with self._lock:
+            candidates = set().union(*(self._index.get(band, ()) for band in bands))
+        best, best_similarity = None, 0.0
+        scored = sorted(
+            ((_similarity(terms, other, self.fuzzy_min_terms), other) for other in candidates), key=lambda c: -c[0],
+        )
+        for similarity, other in scored:
+            if similarity < self.threshold:
+                break
+            best = self._cache.get((scope, other))
+            if best is not None:
+                best_similarity = similarity
+                break
+            self._unindex(scope, other)  # expired or evicted
+        return best, best_similarity
+
+    def _put(self, scope: str, answer: _Answer, age: float = 0.0) -> None:
+        self._cache.put((scope, answer.terms), answer, age=age)
+        bands = _bands(scope, answer.terms)
+        with self._lock:
+            for band in bands:
+                members = self._index.setdefault(band, set())
+                if answer.terms not in members:
+                    members.add(answer.terms)
+                    self._indexed += 1
+            prune = self._indexed > _BANDS * (2 * len(self._cache) + 64)
+        if prune:
+            self._reindex()
+
+    def _unindex(self, scope: str, terms: tuple[str, ...]) -> None:
+        bands = _bands(scope, terms)
+        with self._lock:
+            for band in bands:
+                members = self._index.get(band)
+                if members and terms in members:
+                    members.discard(terms)
+                    self._indexed -= 1
+                    if not members:
+                        del self._index[band]
+
+    def _reindex(self) -> None:
+        """Rebuild the index from the live keys, dropping evicted answers."""
+        index: dict[tuple, set[tuple[str, ...]]] = {}
+        for scope, terms in self._cache.keys():
+            for band in _bands(scope, terms):
+                index.setdefault(band, set()).add(terms)
+        with self._lock:
+            self._index = index
+            self._indexed = sum(len(members) for members in index.values())
+
+    # -- SQLite persistence -------------------------------------------------
+
+    def _open(self, db_path: str) -> None:
+        """Open the database and restore the answers that have not expired yet."""
+        try:
+            db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS answers ("
+                " scope TEXT NOT NULL, terms TEXT NOT NULL, prompt TEXT NOT NULL,"
+                " answer TEXT NOT NULL, created REAL NOT NULL, PRIMARY KEY (scope, terms))"
+            )
+            now = time.time()
+            db.execute("DELETE FROM answers WHERE created < ?", (now - self._cache.ttl,))
+            rows = db.execute("SELECT scope, prompt, answer, created FROM answers ORDER BY created").fetchall()
+        except sqlite3.Error:
+            logger.exception("Answer cache database %s unavailable — not persisting", db_path)
+            return
+        for scope, prompt, text, created in rows:
+            terms = _terms(prompt)
+            if terms:
+                self._put(scope, _Answer(prompt, terms, text, created), age=now - created)
+        self._db = db
+        logger.info("Restored %d cached answers from %s", len(self._cache), db_path)
+
+    def _persist(self, scope: str, answer: _Answer) -> None:
+        try:
+            with self._lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO answers (scope, terms, prompt, answer, created) VALUES (?, ?, ?, ?, ?)",
+                    (scope, " ".join(answer.terms), answer.prompt, answer.text, answer.created),
+                )
+        except sqlite3.Error:
+            logger.exception("Failed to persist cached answer")
+
+
+_store = _AnswerStore(ANSWER_CACHE_TTL, ANSWER_CACHE_MAX_BYTES, ANSWER_CACHE_THRESHOLD, ANSWER_CACHE_DB)
+
+
+def lookup(scope: str, prompt: str) -> Hit | None:
+    """Return a cached answer for ``prompt`` (or a question close enough to it)."""
+    if not _store.enabled:
+        return None
+    hit = _store.lookup(scope, prompt)
+    telemetry.incr("answer_cache.hit" if hit else "answer_cache.miss")
+    if hit is None:
+        telemetry.annotate(answer_cache="miss")
+        return None
+    telemetry.annotate(answer_cache="hit", answer_similarity=hit.similarity)
+    logger.info("Answer cache hit (similarity=%.2f) for %r, cached from %r", hit.similarity, prompt, hit.prompt)
+    return hit
+
+
+def store(scope: str, prompt: str, text: str, result: Any = None) -> None:
+    """Cache the answer of a finished run, unless it used a learner's Drive."""
+    if not _store.enabled or not text:
+        return
+    tool_metrics = getattr(getattr(result, "metrics", None), "tool_metrics", None) or {}
+    if any(name in tool_metrics for name in _PERSONAL_TOOLS):
+        _store.skip()
+        return
+    _store.store(scope, prompt, text)
+
+
+def stats() -> dict:
+    """Return lookup/hit counters and the size of the answer cache."""
+    return _store.stats()
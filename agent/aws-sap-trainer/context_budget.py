@@ -0,0 +1,116 @@
+"""Fit retrieved memory records into a token budget before they reach the prompt.
+
+Records from the three memory namespaces are measured with a local token
+estimate. Near-identical records found in more than one namespace are kept
+once (the highest-scoring copy), the rest are ranked by relevance score and
+added until MEMORY_CONTEXT_TOKEN_BUDGET is reached. The chosen records are
+rendered back in namespace order, so the prompt layout stays the same, just
+smaller and denser.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from dataclasses import dataclass
+from typing import NamedTuple
+
+MEMORY_CONTEXT_TOKEN_BUDGET = int(os.getenv("MEMORY_CONTEXT_TOKEN_BUDGET", "1500"))
+MEMORY_DEDUP_THRESHOLD = float(os.getenv("MEMORY_DEDUP_THRESHOLD", "0.85"))
+
+_PIECE_RE = re.compile(r"\w+|[^\w\s]")
+_WORD_RE = re.compile(r"\w+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate BPE token count: one per punctuation mark, one per ~4 word characters."""
+    return sum(1 + (len(piece) - 1) // 4 for piece in _PIECE_RE.findall(text))
+
+
+class Record(NamedTuple):
+    """A retrieved memory record (a tuple, so the retrieval cache can size it)."""
+
+    text: str
+    score: float = 0.0
+
+
+@dataclass
+class ContextStats:
+    records_in: int = 0
+    records_kept: int = 0
+    duplicates: int = 0
+    tokens_in: int = 0
+    tokens_kept: int = 0
+
+    @property
+    def tokens_dropped(self) -> int:
+        return self.tokens_in - self.tokens_kept
+
+
+def _shingles(text: str) -> frozenset:
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < 3:
+        return frozenset(words)
+    return frozenset(zip(words, words[1:], words[2:]))
+
+
+def _similar(a: frozenset, b: frozenset, threshold: float) -> bool:
+    if not a or not b:
+        return a == b
+    return len(a & b) / len(a | b) >= threshold
+
+
+def assemble(
+    sections: list[tuple[str, list[Record]]],
+    budget: int = MEMORY_CONTEXT_TOKEN_BUDGET,
+    threshold: float = MEMORY_DEDUP_THRESHOLD,
+) -> tuple[str, ContextStats]:
+    """Build the ``<memory>`` block from ``(tag, records)`` pairs within ``budget`` tokens.
+
+    ``budget <= 0`` disables the limit (records are still deduplicated).
+    Returns the block (empty when nothing is kept) and what was dropped.
+    """
+    stats = ContextStats()
+    candidates: list[tuple[float, int, int, Record, int]] = []  # score, section, position, record, tokens
+    for section_index, (_, records) in enumerate(sections):
+        for position, record in enumerate(records):
+            tokens = estimate_tokens(record.text) + 1  # "- " bullet
+            stats.records_in += 1
+            stats.tokens_in += tokens
+            candidates.append((record.score, section_index, position, record, tokens))
+
+    # Highest score first; ties keep namespace order
+    candidates.sort(key=lambda c: (-c[0], c[1], c[2]))
+
+    # Each tag costs its open/close lines once it holds a record
+    tag_tokens = [2 * estimate_tokens(f"<{tag}>") + 1 for tag, _ in sections]
+    remaining = budget - estimate_tokens("<memory></memory>") if budget > 0 else None
+    kept_shingles: list[frozenset] = []
+    chosen: list[tuple[int, int, Record]] = []
+    used_sections: set[int] = set()
+    for score, section_index, position, record, tokens in candidates:
+        shingles = _shingles(record.text)
+        if any(_similar(shingles, other, threshold) for other in kept_shingles):
+            stats.duplicates += 1
+            continue
+        cost = tokens + (0 if section_index in used_sections else tag_tokens[section_index])
+        if remaining is not None:
+            if cost > remaining:
+                continue
+            remaining -= cost
+        kept_shingles.append(shingles)
+        used_sections.add(section_index)
+        chosen.append((section_index, position, record))
+        stats.records_kept += 1
+        stats.tokens_kept += tokens
+
+    if not chosen:
+        return "", stats
+
+    blocks: list[str] = []
+    for section_index, (tag, _) in enumerate(sections):
+        records = sorted((c for c in chosen if c[0] == section_index), key=lambda c: -c[2].score)
+        if records:
+            joined = "\n- ".join(r.text for _, _, r in records)
+            blocks.append(f"<{tag}>\n- {joined}\n</{tag}>")
+    return "<memory>\n" + "\n".join(blocks) + "\n</memory>\n\n", stats
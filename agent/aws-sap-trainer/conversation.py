@@ -0,0 +1,129 @@
+"""In-process history of recent conversation turns, keyed by session ID.
+
+Every completed turn (the user's prompt as typed, without the memory block,
+and the final response text) is kept, so the next invocation of the same
+session starts its agent with the exact previous exchange instead of relying
+only on AgentCore Memory summaries. Tool calls and results are not kept:
+they are large, and the final answer already contains what was learned.
+
+Sessions are evicted least-recently-used beyond CONVERSATION_MAX_BYTES and
+expire after CONVERSATION_TTL seconds without a new turn. Once a session's
+history grows past CONVERSATION_COMPACT_BYTES, all but the latest
+CONVERSATION_KEEP_TURNS turns are folded into a short extractive summary. The
+history is then trimmed to CONVERSATION_SESSION_MAX_BYTES.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from dataclasses import dataclass
+
+from cache import TTLCache
+
+CONVERSATION_TTL = float(os.getenv("CONVERSATION_TTL", "3600"))
+CONVERSATION_MAX_BYTES = int(os.getenv("CONVERSATION_MAX_BYTES", str(32 * 1024 * 1024)))
+CONVERSATION_SESSION_MAX_BYTES = int(os.getenv("CONVERSATION_SESSION_MAX_BYTES", "32768"))
+CONVERSATION_COMPACT_BYTES = int(os.getenv("CONVERSATION_COMPACT_BYTES", "16384"))
+CONVERSATION_KEEP_TURNS = int(os.getenv("CONVERSATION_KEEP_TURNS", "4"))
+# What to skip from AgentCore Memory retrieval when a session has local
+# history: "none", "session" (the summary namespace) or "all"
+CONVERSATION_SKIP_MEMORY = os.getenv("CONVERSATION_SKIP_MEMORY", "session").lower()
+
+# Per-turn excerpt lengths (characters) used when folding turns into the summary
+_SUMMARY_USER_CHARS = 200
+_SUMMARY_ASSISTANT_CHARS = 400
+
+
+@dataclass(frozen=True)
+class _History:
+    summary: str = ""
+    turns: tuple[tuple[str, str], ...] = ()  # (user, assistant), oldest first
+
+    @property
+    def size(self) -> int:
+        return _size(self.summary) + sum(_size(u) + _size(a) for u, a in self.turns)
+
+
+_store = TTLCache(
+    ttl=CONVERSATION_TTL,
+    max_bytes=CONVERSATION_MAX_BYTES,
+    sizeof=lambda history: history.size,
+)
+# Serializes read-modify-write of a session's history between concurrent turns
+_lock = threading.Lock()
+
+
+def _size(text: str) -> int:
+    return len(text.encode("utf-8"))
+
+
+def _clip(text: str, limit: int) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[:limit].rstrip() + "…"
+
+
+def _compact(history: _History) -> _History:
+    """Fold old turns into the summary, then trim to the per-session cap."""
+    summary, turns = history.summary, list(history.turns)
+    if history.size > CONVERSATION_COMPACT_BYTES and len(turns) > CONVERSATION_KEEP_TURNS:
+        folded = turns[:len(turns) - CONVERSATION_KEEP_TURNS]
+        turns = turns[len(folded):]
+        lines = [summary] if summary else []
+        lines += [
+            f"- User: {_clip(u, _SUMMARY_USER_CHARS)}\n  Answer: {_clip(a, _SUMMARY_ASSISTANT_CHARS)}"
+            for u, a in folded
+        ]
+        summary = "\n".join(lines)
+        # Keep the summary to a quarter of the threshold, dropping the oldest lines
+        while _size(summary) > CONVERSATION_COMPACT_BYTES // 4 and "\n- " in summary:
+            summary = summary[summary.index("\n- ") + 1:]
+
+    history = _History(summary, tuple(turns))
+    while history.size > CONVERSATION_SESSION_MAX_BYTES and (history.summary or len(history.turns) > 1):
+        if len(history.turns) > 1:
+            history = _History(history.summary, history.turns[1:])
+        else:
+            history = _History("", history.turns)
+    if history.size > CONVERSATION_SESSION_MAX_BYTES:
+        # A single turn larger than the cap: keep the start of the answer
+        (user, assistant), = history.turns
+        budget = CONVERSATION_SESSION_MAX_BYTES - _size(user)
+        if budget <= 0:
+            return _History()
+        history = _History("", ((user, assistant.encode("utf-8")[:budget].decode("utf-8", "ignore")),))
+    return history
+
+
+def messages(session_id: str) -> list[dict]:
+    """Strands messages replaying the session's history (empty when cold)."""
+    history = _store.get(session_id)
+    if history is None:
+        return []
+    out: list[dict] = []
+    for i, (user, assistant) in enumerate(history.turns):
+        content = [{"text": user}]
+        if i == 0 and history.summary:
+            content.insert(0, {"text": f"<earlier_turns>\n{history.summary}\n</earlier_turns>"})
+        out.append({"role": "user", "content": content})
+        out.append({"role": "assistant", "content": [{"text": assistant}]})
+    return out
+
+
+def record(session_id: str, user_message: str, response_text: str) -> None:
+    """Append a completed turn to the session's history."""
+    if not _store.enabled or not user_message or not response_text:
+        return
+    with _lock:
+        history = _store.get(session_id) or _History()
+        history = _History(history.summary, history.turns + ((user_message, response_text),))
+        history = _compact(history)
+        if history.turns:
+            _store.put(session_id, history)
+        else:
+            _store.pop(session_id)
+
+
+def stats() -> dict:
+    """Return hit/miss/eviction counters of the conversation store."""
+    return _store.stats()
@@ -0,0 +1,128 @@
+"""Local manifest of the session files saved to Google Drive.
+
+For every user and session it records the Drive file IDs written so far and
+the hash and length of the last saved summary. Saves use it to skip the
+files().list lookup, to skip uploads when nothing changed and, in incremental
+mode, to upload only the text appended since the previous save.
+
+The manifest is a cache: when it is missing or stale (e.g. after a container
+restart or a file deleted on Drive) the Drive tools fall back to listing the
+folder, so losing it only costs one extra query. It is kept in memory and, with
+a path set, in a SQLite file where each save upserts a single row.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+
+logger = logging.getLogger(__name__)
+
+DRIVE_MANIFEST_PATH = os.getenv("DRIVE_MANIFEST_PATH", "/tmp/drive-manifest.db")
+DRIVE_MANIFEST_MAX_ENTRIES = int(os.getenv("DRIVE_MANIFEST_MAX_ENTRIES", "10000"))
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class ManifestEntry:
+    file_id: str | None = None                        # overwrite mode: the session file
+    chunks: list[str] = field(default_factory=list)   # incremental mode: part files, oldest first
+    content_hash: str = ""                            # hash of the last saved summary
+    content_length: int = 0                           # its length in characters
+    revision: int = 0                                 # number of saves recorded
+
+
+class Manifest:
+    """Thread-safe map of (user, session) → ManifestEntry, persisted to SQLite.
+
+    Entries are kept in least-recently-saved order and the oldest are dropped
+    beyond ``max_entries``. An empty ``path`` keeps the manifest in memory.
+    """
+
+    def __init__(self, path: str = DRIVE_MANIFEST_PATH, max_entries: int = DRIVE_MANIFEST_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, dict] = OrderedDict()
+        self._saved = 0  # order of the last save, persisted to restore the LRU order
+        self._db: sqlite3.Connection | None = None
+        if path:
+            self._open(path)
+
+    def get(self, user_key: str, session_id: str) -> ManifestEntry | None:
+        with self._lock:
+            data = self._entries.get(self._key(user_key, session_id))
+        return ManifestEntry(**{**data, "chunks": list(data["chunks"])}) if data else None
+
+    def put(self, user_key: str, session_id: str, entry: ManifestEntry) -> None:
+        key = self._key(user_key, session_id)
+        data = asdict(entry)
+        with self._lock:
+            self._entries[key] = data
+            self._entries.move_to_end(key)
+            evicted = []
+            while len(self._entries) > self.max_entries:
+                evicted.append(self._entries.popitem(last=False)[0])
+            self._saved += 1
+            self._write(
+                ("INSERT OR REPLACE INTO entries (key, entry, saved) VALUES (?, ?, ?)", (key, json.dumps(data), self._saved)),
+                *(("DELETE FROM entries WHERE key = ?", (old,)) for old in evicted),
+            )
+
+    def drop(self, user_key: str, session_id: str) -> None:
+        key = self._key(user_key, session_id)
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self._write(("DELETE FROM entries WHERE key = ?", (key,)))
+
+    @staticmethod
+    def _key(user_key: str, session_id: str) -> str:
+        return f"{user_key}|{session_id}"
+
+    def _open(self, path: str) -> None:
+        """Open the database and restore the most recently saved entries."""
+        try:
+            db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY, entry TEXT NOT NULL, saved INTEGER NOT NULL)"
+            )
+            db.execute(
+                "DELETE FROM entries WHERE key NOT IN"
+                " (SELECT key FROM entries ORDER BY saved DESC LIMIT ?)",
+                (self.max_entries,),
+            )
+            rows = db.execute("SELECT key, entry, saved FROM entries ORDER BY saved").fetchall()
+        except sqlite3.Error as e:
+            logger.warning("Drive manifest %s unavailable, keeping it in memory: %s", path, e)
+            return
+        for key, entry, saved in rows:
+            try:
+                self._entries[key] = json.loads(entry)
+            except ValueError:
+                continue
+            self._saved = saved
+        self._db = db
+
+    def _write(self, *statements: tuple[str, tuple]) -> None:
+        """Apply ``statements`` in one transaction; called with the lock held."""
+        if self._db is None:
+            return
+        try:
+            with self._db:
+                self._db.execute("BEGIN")
+                for sql, params in statements:
+                    self._db.execute(sql, params)
+        except sqlite3.Error as e:
+            logger.warning("Failed to write Drive manifest %s: %s", self.path, e)
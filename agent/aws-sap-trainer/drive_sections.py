@@ -0,0 +1,180 @@
+"""Bounded, section-aware reading of session Markdown downloaded from Drive.
+
+A session file is split into sections at its ``## `` headings (one per save
+in incremental mode). Downloaded chunks are decoded and parsed as they
+arrive. Only the sections that will be returned are kept, and every kept
+section is bounded by a byte budget, so memory per load and the size of the
+text handed to the model stay bounded however large the file has grown.
+"""
+
+from __future__ import annotations
+
+import codecs
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator
+
+
+class TailBuffer:
+    """Text buffer that keeps only the last ``max_bytes`` (UTF-8) appended."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.dropped = 0
+        self._parts: deque[tuple[str, int]] = deque()
+
+    def append(self, text: str) -> None:
+        size = len(text.encode("utf-8"))
+        self._parts.append((text, size))
+        self.size += size
+        while self.size > self.max_bytes and len(self._parts) > 1:
+            _, dropped = self._parts.popleft()
+            self.size -= dropped
+            self.dropped += dropped
+
+    @property
+    def truncated(self) -> bool:
+        return self.dropped > 0
+
+    def text(self) -> str:
+        return "".join(text for text, _ in self._parts)
+
+
+def iter_lines(chunks: Iterable[bytes], max_line: int = 65536) -> Iterator[str]:
+    """Decode UTF-8 chunks into lines (keeping ``\\n``), splitting across chunk boundaries.
+
+    Lines longer than ``max_line`` characters are yielded in pieces so a file
+    without newlines cannot defeat the byte budgets.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")("replace")
+    pending = ""
+    for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line + "\n"
+        while len(pending) > max_line:
+            yield pending[:max_line]
+            pending = pending[max_line:]
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+@dataclass
+class Section:
+    number: int
+    heading: str
+    size: int = 0
+    body: TailBuffer | None = field(default=None, repr=False)
+
+
+class SectionReader:
+    """Collect the index of all sections and the bodies of the requested ones.
+
+    ``wanted`` selects sections by number. Otherwise the ``latest`` most recent
+    sections are kept, or every section when ``latest`` is 0. Both limits and
+    the ``max_bytes`` budget are enforced while streaming: the body of a
+    section is released as soon as it falls out of the latest N or the kept
+    total exceeds the budget (oldest first), so no more than about
+    ``max_bytes`` of section text is held at any time.
+    """
+
+    def __init__(self, max_bytes: int, latest: int = 0, wanted: set[int] | None = None):
+        self.max_bytes = max_bytes
+        self.latest = latest
+        self.wanted = wanted
+        self.preamble = TailBuffer(max_bytes)
+        self.index: list[Section] = []
+        self._kept: deque[Section] = deque()
+        self._kept_bytes = 0
+        self._dropped = 0
+        self._current: Section | None = None
+
+    def feed(self, lines: Iterable[str]) -> None:
+        """Parse Markdown lines, starting a new section at every ``## `` heading."""
+        for line in lines:
+            if line.startswith("## "):
+                self._current = self._start(line[3:].strip())
+            elif self._current is None:
+                self.preamble.append(line)
+            else:
+                self._append(self._current, line)
+
+    def add(self, heading: str, lines: Iterable[str] | None = None, size: int = 0) -> Section:
+        """Record one whole section, e.g. a part file, without splitting ``lines`` further.
+
+        Pass ``lines=None`` with the known ``size`` for a section that was not
+        downloaded; it only appears in the index.
+        """
+        section = self._start(heading)
+        if lines is None:
+            section.size = size
+        else:
+            for line in lines:
+                self._append(section, line)
+        self._current = None
+        return section
+
+    @property
+    def kept_bytes(self) -> int:
+        """Bytes of section text currently held."""
+        return self._kept_bytes
+
+    def kept(self) -> tuple[list[Section], int]:
+        """Sections to return, oldest first, and how many were dropped to fit ``max_bytes``."""
+        return list(self._kept), self._dropped
+
+    def _start(self, heading: str) -> Section:
+        section = Section(number=len(self.index) + 1, heading=heading)
+        self.index.append(section)
+        if self.wanted is None or section.number in self.wanted:
+            if self.latest and len(self._kept) == self.latest:
+                self._evict()  # falls out of the latest N
+            section.body = TailBuffer(self.max_bytes)
+            self._kept.append(section)
+        return section
+
+    def _append(self, section: Section, line: str) -> None:
+        section.size += len(line.encode("utf-8"))
+        if section.body is None:
+            return
+        before = section.body.size
+        section.body.append(line)
+        self._kept_bytes += section.body.size - before
+        while len(self._kept) > 1 and self._kept_bytes > self.max_bytes:
+            self._evict()
+            self._dropped += 1
+
+    def _evict(self) -> None:
+        section = self._kept.popleft()
+        self._kept_bytes -= section.body.size
+        section.body = None
+
+
+def render(title: str, reader: SectionReader, index_only: bool = False) -> str:
+    """Markdown returned to the model: title, preamble, optional index, kept sections."""
+    kept, dropped = ([], 0) if index_only else reader.kept()
+    out = [f"# {title}"]
+    preamble = reader.preamble.text().strip()
+    if preamble.startswith("# "):
+        preamble = preamble.split("\n", 1)[1].strip() if "\n" in preamble else ""
+    if preamble:
+        out.append(preamble)
+
+    partial = index_only or dropped or len(kept) < len(reader.index)
+    if partial and reader.index:
+        out.append(
+            "Sections (load specific ones with section_numbers):\n"
+            + "\n".join(f"{s.number}. {s.heading} ({s.size} bytes)" for s in reader.index)
+        )
+
+    for section in kept:
+        body = section.body.text().strip() if section.body else ""
+        if section.body and section.body.truncated:
+            body = f"_[… first {section.body.dropped} bytes of this section omitted]_\n\n{body}"
+        out.append(f"## {section.heading}\n\n{body}")
+    if dropped:
+        out.append(f"_[{dropped} earlier section(s) omitted to stay within the size limit]_")
+    return "\n\n".join(out) + "\n"
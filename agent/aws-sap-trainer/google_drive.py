@@ -13,16 +13,33 @@ We call GetResourceOauth2Token once:
 
 from __future__ import annotations
 
+import asyncio
+import base64
+import contextvars
+import functools
+import hashlib
 import io
+import json
 import logging
 import os
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
 from datetime import datetime, timezone
+from typing import Any, Callable, Iterator, TypeVar
 from urllib.parse import unquote
 
 from bedrock_agentcore.runtime import BedrockAgentCoreContext
 from bedrock_agentcore.services.identity import IdentityClient
 from strands import tool
 
+import telemetry
+from cache import TTLCache
+from drive_manifest import Manifest, ManifestEntry, content_hash
+from drive_sections import SectionReader, iter_lines, render
+
 logger = logging.getLogger(__name__)
 
 GOOGLE_PROVIDER_NAME = os.getenv("GOOGLE_OAUTH2_PROVIDER_NAME", "google-drive-provider")
@@ -30,10 +47,143 @@ GOOGLE_DRIVE_FOLDER_NAME = os.getenv("GOOGLE_DRIVE_FOLDER_NAME", "AgentCoreSessi
 OAUTH2_RETURN_URL = os.getenv("OAUTH2_RETURN_URL", "")
 AWS_REGION = os.getenv("AWS_REGION", os.getenv("AWS_DEFAULT_REGION", "eu-west-1"))
 
+# Google access tokens live for one hour; AgentCore Identity refreshes them on
+# the next GetResourceOauth2Token call once the cached copy has expired.
+GOOGLE_TOKEN_CACHE_TTL = float(os.getenv("GOOGLE_TOKEN_CACHE_TTL", "3000"))
+GOOGLE_FOLDER_CACHE_TTL = float(os.getenv("GOOGLE_FOLDER_CACHE_TTL", "3600"))
+# How long a pending consent session is remembered for a user
+GOOGLE_OAUTH_SESSION_TTL = float(os.getenv("GOOGLE_OAUTH_SESSION_TTL", "900"))
+# Drive v3 discovery document; defaults to the copy bundled with
+# google-api-python-client, so building a service never touches the network.
+GOOGLE_DRIVE_DISCOVERY_PATH = os.getenv("GOOGLE_DRIVE_DISCOVERY_PATH", "")
+GOOGLE_HTTP_REUSE = os.getenv("GOOGLE_HTTP_REUSE", "true").lower() == "true"
+# "overwrite": one Markdown file per session, replaced on each save.
+# "incremental": each save adds an append-only part file with only the new text.
+DRIVE_SAVE_MODE = os.getenv("DRIVE_SAVE_MODE", "overwrite").lower()
+DRIVE_RESUMABLE_THRESHOLD = int(os.getenv("DRIVE_RESUMABLE_THRESHOLD", str(5 * 1024 * 1024)))
+DRIVE_DOWNLOAD_CHUNK_SIZE = int(os.getenv("DRIVE_DOWNLOAD_CHUNK_SIZE", str(256 * 1024)))
+# Upper bound on the session text returned to the model by one load
+DRIVE_LOAD_MAX_BYTES = int(os.getenv("DRIVE_LOAD_MAX_BYTES", "65536"))
+# Sections returned by default (0 = as many recent ones as fit DRIVE_LOAD_MAX_BYTES)
+DRIVE_LOAD_LATEST_SECTIONS = int(os.getenv("DRIVE_LOAD_LATEST_SECTIONS", "0"))
+# Threads running the blocking Google API calls of the async tool variants
+DRIVE_WORKERS = int(os.getenv("DRIVE_WORKERS", "64"))
+# What identifies a user in the per-user caches and the manifest:
+# "token": a hash of the workload access token (state lasts as long as the token).
+# "jwt": issuer and subject of the inbound bearer token. Only for runtimes with
+#   an inbound JWT authorizer, which verifies that token before forwarding it.
+DRIVE_USER_KEY = os.getenv("DRIVE_USER_KEY", "token").lower()
+
 SCOPES = ["https://www.googleapis.com/auth/drive.file"]
 
-# Persist session URI across invocations so we can resume after consent
-_session_uri: str | None = None
+T = TypeVar("T")
+
+# Per-user resolved Drive folder IDs. Entries are tiny, so a fixed 1 MiB cap
+# holds thousands of users.
+_folder_cache = TTLCache(ttl=GOOGLE_FOLDER_CACHE_TTL, max_bytes=1 << 20)
+
+_manifest = Manifest()
+
+# googleapiclient service objects share an httplib2 transport that is not
+# thread-safe, so each tool thread keeps its own most recently used service.
+_local = threading.local()
+
+_drive_executor = ThreadPoolExecutor(max_workers=DRIVE_WORKERS, thread_name_prefix="drive")
+
+
+# ---------------------------------------------------------------------------
+# Per-user OAuth2 state
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class _UserAuth:
+    session_uri: str | None = None
+    session_expires: float = 0.0
+    access_token: str | None = None
+    token_expires: float = 0.0
+
+
+class _AuthRegistry:
+    """OAuth2 session URIs and access tokens, keyed by workload user.
+
+    Concurrent invocations for different users never share or overwrite each
+    other's consent session. Reads take no lock: entries are immutable and
+    replaced whole under the write lock, and a dict lookup is atomic, so
+    users that already hold a token are never serialized. Expired entries are
+    swept on write.
+    """
+
+    _SWEEP_INTERVAL = 60.0
+
+    def __init__(self) -> None:
+        self._entries: dict[str, _UserAuth] = {}
+        self._lock = threading.Lock()
+        self._next_sweep = 0.0
+        self.hits = 0
+        self.misses = 0
+
+    def access_token(self, user_key: str) -> str | None:
+        entry = self._entries.get(user_key)
+        if entry is not None and entry.access_token and entry.token_expires > time.monotonic():
+            self.hits += 1
+            return entry.access_token
+        self.misses += 1
+        return None
+
+    def session_uri(self, user_key: str) -> str | None:
+        entry = self._entries.get(user_key)
+        if entry is not None and entry.session_uri and entry.session_expires > time.monotonic():
+            return entry.session_uri
+        return None
+
+    def set_session_uri(self, user_key: str, session_uri: str | None) -> None:
+        expires = time.monotonic() + GOOGLE_OAUTH_SESSION_TTL if session_uri else 0.0
+        self._update(user_key, session_uri=session_uri, session_expires=expires)
+
+    def set_access_token(self, user_key: str, access_token: str) -> None:
+        """Store a token and drop the consent session that produced it."""
+        if GOOGLE_TOKEN_CACHE_TTL <= 0:
+            self.set_session_uri(user_key, None)
+            return
+        self._update(
+            user_key,
+            session_uri=None,
+            session_expires=0.0,
+            access_token=access_token,
+            token_expires=time.monotonic() + GOOGLE_TOKEN_CACHE_TTL,
+        )
+
+    def invalidate_token(self, user_key: str) -> None:
+        self._update(user_key, access_token=None, token_expires=0.0)
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        entries = list(self._entries.values())
+        lookups = self.hits + self.misses
+        return {
+            "users": len(entries),
+            "tokens": sum(1 for e in entries if e.access_token and e.token_expires > now),
+            "pending_consent": sum(1 for e in entries if e.session_uri and e.session_expires > now),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+    def _update(self, user_key: str, **changes: Any) -> None:
+        with self._lock:
+            self._entries[user_key] = replace(self._entries.get(user_key) or _UserAuth(), **changes)
+            now = time.monotonic()
+            if now >= self._next_sweep:
+                self._next_sweep = now + self._SWEEP_INTERVAL
+                expired = [
+                    key for key, e in self._entries.items()
+                    if e.token_expires <= now and e.session_expires <= now
+                ]
+                for key in expired:
+                    del self._entries[key]
+
+
+_auth_registry = _AuthRegistry()
 
 
 # ---------------------------------------------------------------------------
@@ -41,26 +191,72 @@ _session_uri: str | None = None
 # ---------------------------------------------------------------------------
 
 _identity_client: IdentityClient | None = None
+_identity_client_lock = threading.Lock()
 
 
 def _get_identity_client() -> IdentityClient:
     global _identity_client
     if _identity_client is None:
-        _identity_client = IdentityClient(AWS_REGION)
+        with _identity_client_lock:
+            if _identity_client is None:
+                _identity_client = IdentityClient(AWS_REGION)
     return _identity_client
 
 
+def _user_key(workload_token: str, authorization: str | None = None) -> str:
+    """Cache key identifying the end user of a request.
+
+    With DRIVE_USER_KEY=jwt and a bearer token in ``authorization``, its
+    ``iss`` and ``sub`` claims, which stay the same across invocations. The
+    runtime's JWT authorizer has verified that token, so the claims are
+    trusted without checking the signature again. Otherwise a hash of the
+    workload access token, whose claims are not verified anywhere.
+    """
+    if DRIVE_USER_KEY == "jwt" and authorization and authorization.lower().startswith("bearer "):
+        claims = _jwt_claims(authorization[7:].strip())
+        if claims.get("sub"):
+            identity = f"{claims.get('iss', '')}|{claims['sub']}"
+            return "jwt:" + hashlib.sha256(identity.encode("utf-8")).hexdigest()
+    return "token:" + hashlib.sha256(workload_token.encode("utf-8")).hexdigest()
+
+
+def _jwt_claims(token: str) -> dict:
+    parts = token.split(".")
+    if len(parts) != 3:
+        return {}
+    try:
+        claims = json.loads(base64.urlsafe_b64decode(parts[1] + "=" * (-len(parts[1]) % 4)))
+    except ValueError:
+        return {}
+    return claims if isinstance(claims, dict) else {}
+
+
+def _current_user_key() -> str | None:
+    workload_token = BedrockAgentCoreContext.get_workload_access_token()
+    if not workload_token:
+        return None
+    headers = BedrockAgentCoreContext.get_request_headers() or {}
+    return _user_key(workload_token, headers.get("Authorization"))
+
+
+def cache_stats() -> dict:
+    """Return counters of the per-user OAuth2 registry and the folder cache."""
+    return {"auth": _auth_registry.stats(), "folders": _folder_cache.stats()}
+
+
 def _get_google_access_token() -> dict:
     """Single non-blocking call to get a Google OAuth2 token or auth URL.
 
+    Access tokens are kept per user for GOOGLE_TOKEN_CACHE_TTL seconds, so
+    only the first Drive tool call of a user pays the GetResourceOauth2Token
+    round trip. A pending consent session is remembered per user so the
+    retry after consent resumes it.
+
     Returns dict with one of:
       {"access_token": str}          — ready to use
       {"authorization_url": str}     — user must complete consent
       {"error": str}                 — something went wrong
     """
-    global _session_uri
-    client = _get_identity_client()
-
     # The runtime injects the workload access token automatically
     workload_token = BedrockAgentCoreContext.get_workload_access_token()
     if workload_token is None:
@@ -69,6 +265,13 @@ def _get_google_access_token() -> dict:
             "If using SigV4 auth, include the X-Amzn-Bedrock-AgentCore-Runtime-User-Id header."
         )}
 
+    user_key = _current_user_key()
+    cached = _auth_registry.access_token(user_key)
+    if cached is not None:
+        return {"access_token": cached}
+
+    client = _get_identity_client()
+
     # Build the request — same params the decorator would use
     req = {
         "resourceCredentialProviderName": GOOGLE_PROVIDER_NAME,
@@ -83,17 +286,20 @@ def _get_google_access_token() -> dict:
     # CompleteResourceTokenAuth to bind the token to the user.
     if OAUTH2_RETURN_URL:
         req["resourceOauth2ReturnUrl"] = OAUTH2_RETURN_URL
-    if _session_uri:
-        req["sessionUri"] = _session_uri
+    session_uri = _auth_registry.session_uri(user_key)
+    if session_uri:
+        req["sessionUri"] = session_uri
 
     response = client.dp_client.get_resource_oauth2_token(**req)
 
-    # Persist session URI for the retry after consent
-    if response.get("sessionUri"):
-        _session_uri = response["sessionUri"]
-
     if response.get("accessToken"):
+        _auth_registry.set_access_token(user_key, response["accessToken"])
         return {"access_token": response["accessToken"]}
+
+    # Persist this user's session URI for the retry after consent
+    if response.get("sessionUri"):
+        _auth_registry.set_session_uri(user_key, response["sessionUri"])
+
     if response.get("authorizationUrl"):
         # The API returns a URL-encoded authorization URL. Decode it so the
         # request_uri query-param value uses raw colons (urn:ietf:params:...)
@@ -101,6 +307,7 @@ def _get_google_access_token() -> dict:
         # endpoint rejects percent-encoded request_uri values.
         return {"authorization_url": unquote(response["authorizationUrl"])}
     if response.get("sessionStatus") == "FAILED":
+        _auth_registry.set_session_uri(user_key, None)
         return {"error": "OAuth2 session failed. Please try again."}
 
     return {"error": f"Unexpected response: {response}"}
@@ -110,12 +317,104 @@ def _get_google_access_token() -> dict:
 # Google Drive API helpers
 # ---------------------------------------------------------------------------
 
+_discovery_doc: dict | None = None
+_discovery_lock = threading.Lock()
+
+
+def _get_discovery_doc() -> dict:
+    """Parse the Drive v3 discovery document once per process."""
+    global _discovery_doc
+    if _discovery_doc is None:
+        with _discovery_lock:
+            if _discovery_doc is None:
+                from googleapiclient.discovery import build_from_document
+                from googleapiclient.discovery_cache import get_static_doc
+                from googleapiclient.http import build_http
+
+                if GOOGLE_DRIVE_DISCOVERY_PATH:
+                    with open(GOOGLE_DRIVE_DISCOVERY_PATH, encoding="utf-8") as f:
+                        raw = f.read()
+                else:
+                    raw = get_static_doc("drive", "v3")
+                doc = json.loads(raw)
+                # Building a resource fills derived parameters into the document
+                # in place. Do it once under the lock so concurrent builds later
+                # only read it.
+                build_from_document(doc, http=build_http()).files()
+                _discovery_doc = doc
+    return _discovery_doc
+
+
+def _get_http():
+    """This thread's HTTP transport, reused across services to keep connections open."""
+    http = getattr(_local, "http", None)
+    if http is None:
+        from googleapiclient.http import build_http
+
+        http = _local.http = build_http()
+    return http
+
+
 def _build_drive_service(access_token: str):
     from google.oauth2.credentials import Credentials
-    from googleapiclient.discovery import build
+    from googleapiclient.discovery import build_from_document
 
     creds = Credentials(token=access_token, scopes=SCOPES)
-    return build("drive", "v3", credentials=creds)
+    if GOOGLE_HTTP_REUSE:
+        from google_auth_httplib2 import AuthorizedHttp
+
+        return build_from_document(_get_discovery_doc(), http=AuthorizedHttp(creds, http=_get_http()))
+    return build_from_document(_get_discovery_doc(), credentials=creds)
+
+
+def _get_drive_service(access_token: str):
+    """Reuse this thread's Drive service while the access token is unchanged."""
+    if getattr(_local, "access_token", None) != access_token:
+        _local.service = _build_drive_service(access_token)
+        _local.access_token = access_token
+    return _local.service
+
+
+def _get_folder_id(service, user_key: str | None) -> str:
+    key = (user_key, GOOGLE_DRIVE_FOLDER_NAME)
+    folder_id = _folder_cache.get(key) if user_key else None
+    if folder_id is None:
+        folder_id = _find_or_create_folder(service, GOOGLE_DRIVE_FOLDER_NAME)
+        if user_key:
+            _folder_cache.put(key, folder_id)
+    return folder_id
+
+
+def _run_drive_op(access_token: str, op: Callable[[Any, str], T]) -> T:
+    """Run ``op(service, folder_id)`` with the cached Drive service and folder ID.
+
+    A 401 means the cached access token was revoked or expired early: it is
+    dropped, a fresh one is requested and the operation retried once. A 404
+    means the cached folder is gone (deleted or trashed): it is resolved again
+    and the operation retried once.
+    """
+    from googleapiclient.errors import HttpError
+
+    user_key = _current_user_key()
+    for attempt in range(2):
+        service = _get_drive_service(access_token)
+        folder_id = _get_folder_id(service, user_key)
+        try:
+            return op(service, folder_id)
+        except HttpError as e:
+            status = getattr(e.resp, "status", None)
+            if attempt or user_key is None or status not in (401, 404):
+                raise
+            if status == 401:
+                logger.info("Drive rejected the cached access token, requesting a new one")
+                _auth_registry.invalidate_token(user_key)
+                token_result = _get_google_access_token()
+                if "access_token" not in token_result:
+                    raise
+                access_token = token_result["access_token"]
+            else:
+                logger.info("Cached Drive folder not found, resolving it again")
+                _folder_cache.pop((user_key, GOOGLE_DRIVE_FOLDER_NAME))
 
 
 def _find_or_create_folder(service, folder_name: str) -> str:
@@ -148,32 +447,234 @@ def _session_to_markdown(session_data: dict) -> str:
     return "\n".join(lines)
 
 
-def _upload_markdown(service, folder_id: str, filename: str, content: str) -> str:
+def _media(content: str):
+    """Upload body; resumable (chunked, retryable) above DRIVE_RESUMABLE_THRESHOLD bytes."""
     from googleapiclient.http import MediaIoBaseUpload
 
-    query = f"name='{filename}' and '{folder_id}' in parents and trashed=false"
-    existing = service.files().list(q=query, fields="files(id)", pageSize=1).execute()
-    media = MediaIoBaseUpload(io.BytesIO(content.encode("utf-8")), mimetype="text/markdown")
+    data = content.encode("utf-8")
+    return MediaIoBaseUpload(
+        io.BytesIO(data), mimetype="text/markdown", resumable=len(data) > DRIVE_RESUMABLE_THRESHOLD
+    )
+
+
+def _is_not_found(e: Exception) -> bool:
+    return getattr(getattr(e, "resp", None), "status", None) == 404
+
+
+def _upload_markdown(service, folder_id: str, filename: str, content: str, file_id: str | None = None) -> str:
+    """Replace the content of ``file_id`` (looked up by name if unknown) or create the file."""
+    from googleapiclient.errors import HttpError
+
+    if file_id is None:
+        query = f"name='{filename}' and '{folder_id}' in parents and trashed=false"
+        existing = service.files().list(q=query, fields="files(id)", pageSize=1).execute()
+        if existing.get("files"):
+            file_id = existing["files"][0]["id"]
 
-    if existing.get("files"):
-        file_id = existing["files"][0]["id"]
-        service.files().update(fileId=file_id, media_body=media).execute()
-        return file_id
+    if file_id:
+        try:
+            service.files().update(fileId=file_id, media_body=_media(content)).execute()
+            return file_id
+        except HttpError as e:
+            if not _is_not_found(e):
+                raise
+            logger.info("Drive file %s no longer exists, creating it again", file_id)
 
     metadata = {"name": filename, "parents": [folder_id]}
-    created = service.files().create(body=metadata, media_body=media, fields="id").execute()
+    created = service.files().create(body=metadata, media_body=_media(content), fields="id").execute()
     return created["id"]
 
 
-def _download_markdown(service, folder_id: str, filename: str) -> str | None:
+def _list_session_parts(service, folder_id: str, session_id: str) -> list[dict]:
+    """Part files of an incrementally saved session, oldest first."""
+    query = (
+        f"'{folder_id}' in parents and trashed=false and "
+        f"appProperties has {{ key='session_id' and value='{session_id}' }}"
+    )
+    parts: list[dict] = []
+    page_token = None
+    while True:
+        results = service.files().list(
+            q=query,
+            fields="nextPageToken, files(id, size, createdTime, appProperties)",
+            pageSize=100,
+            pageToken=page_token,
+        ).execute()
+        parts.extend(results.get("files", []))
+        page_token = results.get("nextPageToken")
+        if not page_token:
+            break
+    return sorted(parts, key=lambda f: int(f.get("appProperties", {}).get("revision", 0)))
+
+
+def _save_overwrite(service, folder_id: str, user_key: str, session_id: str, summary: str, saved_at: str) -> str:
+    entry = _manifest.get(user_key, session_id) or ManifestEntry()
+    filename = f"session_{session_id}.md"
+    markdown_content = _session_to_markdown(
+        {"session_id": session_id, "summary": summary, "saved_at": saved_at}
+    )
+    entry.file_id = _upload_markdown(service, folder_id, filename, markdown_content, entry.file_id)
+    entry.content_hash, entry.content_length = content_hash(summary), len(summary)
+    entry.revision += 1
+    _manifest.put(user_key, session_id, entry)
+    return f"Session saved to Google Drive: {filename} (file ID: {entry.file_id})"
+
+
+def _save_incremental(service, folder_id: str, user_key: str, session_id: str, summary: str, saved_at: str) -> str:
+    entry = _manifest.get(user_key, session_id)
+    if entry is None:
+        # Cold manifest: continue the revision numbering of parts already on Drive
+        parts = _list_session_parts(service, folder_id, session_id)
+        entry = ManifestEntry(chunks=[p["id"] for p in parts])
+        if parts:
+            entry.revision = int(parts[-1].get("appProperties", {}).get("revision", len(parts)))
+
+    # When the new summary extends the last saved one, upload only the appended text
+    continued = (
+        entry.content_length
+        and len(summary) > entry.content_length
+        and content_hash(summary[:entry.content_length]) == entry.content_hash
+    )
+    delta = summary[entry.content_length:].lstrip("\n") if continued else summary
+
+    revision = entry.revision + 1
+    heading = f"## Save {revision} — {saved_at}" + (" (continued)" if continued else "")
+    metadata = {
+        "name": f"session_{session_id}.part{revision:04d}.md",
+        "parents": [folder_id],
+        "appProperties": {"session_id": session_id, "revision": str(revision)},
+    }
+    created = service.files().create(
+        body=metadata, media_body=_media(f"{heading}\n\n{delta}\n"), fields="id"
+    ).execute()
+
+    entry.chunks.append(created["id"])
+    entry.content_hash, entry.content_length = content_hash(summary), len(summary)
+    entry.revision = revision
+    _manifest.put(user_key, session_id, entry)
+    return (
+        f"Session saved to Google Drive: {metadata['name']} "
+        f"(revision {revision}, {len(delta)} new characters, file ID: {created['id']})"
+    )
+
+
+def _save_session(service, folder_id: str, user_key: str, session_id: str, summary: str) -> str:
+    entry = _manifest.get(user_key, session_id)
+    if entry is not None and entry.revision and entry.content_hash == content_hash(summary):
+        return f"Session already up to date on Google Drive (revision {entry.revision}), nothing uploaded."
+
+    saved_at = datetime.now(timezone.utc).isoformat()
+    if DRIVE_SAVE_MODE == "incremental":
+        return _save_incremental(service, folder_id, user_key, session_id, summary, saved_at)
+    return _save_overwrite(service, folder_id, user_key, session_id, summary, saved_at)
+
+
+def _iter_download(service, file_id: str) -> Iterator[bytes]:
+    """Download a file in DRIVE_DOWNLOAD_CHUNK_SIZE pieces, yielding each as it arrives."""
+    from googleapiclient.http import MediaIoBaseDownload
+
+    buffer = io.BytesIO()
+    downloader = MediaIoBaseDownload(
+        buffer, service.files().get_media(fileId=file_id), chunksize=DRIVE_DOWNLOAD_CHUNK_SIZE
+    )
+    done = False
+    while not done:
+        _, done = downloader.next_chunk()
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def _find_session_file(service, folder_id: str, filename: str) -> str | None:
     query = f"name='{filename}' and '{folder_id}' in parents and trashed=false"
     results = service.files().list(q=query, fields="files(id)", pageSize=1).execute()
     files = results.get("files", [])
-    if not files:
+    return files[0]["id"] if files else None
+
+
+def _select_parts(parts: list[dict], latest: int, wanted: set[int] | None) -> set[int]:
+    """Numbers (1-based, oldest first) of the part files worth downloading."""
+    if wanted is not None:
+        return wanted
+    if latest:
+        return set(range(max(1, len(parts) - latest + 1), len(parts) + 1))
+    # Newest parts first, as many as fit the byte budget (always at least one)
+    selected: set[int] = set()
+    budget = DRIVE_LOAD_MAX_BYTES
+    for number in range(len(parts), 0, -1):
+        size = int(parts[number - 1].get("size", 0))
+        if selected and size > budget:
+            break
+        selected.add(number)
+        budget -= size
+    return selected
+
+
+def _load_parts(service, parts: list[dict], reader: SectionReader) -> None:
+    selected = reader.wanted if reader.wanted is not None else set()
+    for number, part in enumerate(parts, 1):
+        revision = part.get("appProperties", {}).get("revision", number)
+        if number not in selected:
+            created = part.get("createdTime")
+            heading = f"Save {revision} — {created}" if created else f"Save {revision}"
+            reader.add(heading, None, int(part.get("size", 0)))
+            continue
+        lines = iter_lines(_iter_download(service, part["id"]))
+        first = next(lines, "")
+        if first.startswith("## "):
+            reader.add(first[3:].strip(), lines)
+        else:
+            reader.add(f"Save {revision}", itertools.chain([first], lines))
+
+
+def _load_session(
+    service,
+    folder_id: str,
+    user_key: str,
+    session_id: str,
+    latest: int = 0,
+    wanted: set[int] | None = None,
+    index_only: bool = False,
+) -> str | None:
+    """Read a session in bounded memory and return at most DRIVE_LOAD_MAX_BYTES of its sections.
+
+    Incrementally saved sessions only download the selected part files. A
+    single session file is streamed in chunks and split at its ``## ``
+    headings, keeping just the selected sections.
+    """
+    from googleapiclient.errors import HttpError
+
+    if index_only:
+        wanted, latest = set(), 0
+    elif wanted is not None:
+        latest = 0
+    title = f"Session {session_id}"
+
+    parts = _list_session_parts(service, folder_id, session_id) if DRIVE_SAVE_MODE == "incremental" else []
+    if parts:
+        reader = SectionReader(DRIVE_LOAD_MAX_BYTES, wanted=_select_parts(parts, latest, wanted))
+        _load_parts(service, parts, reader)
+        return render(title, reader, index_only)
+
+    filename = f"session_{session_id}.md"
+    entry = _manifest.get(user_key, session_id)
+    file_id = (entry.file_id if entry else None) or _find_session_file(service, folder_id, filename)
+    if file_id is None:
         return None
-
-    content = service.files().get_media(fileId=files[0]["id"]).execute()
-    return content.decode("utf-8") if isinstance(content, bytes) else content
+    reader = SectionReader(DRIVE_LOAD_MAX_BYTES, latest=latest, wanted=wanted)
+    try:
+        reader.feed(iter_lines(_iter_download(service, file_id)))
+    except HttpError as e:
+        # A stale manifest entry: the file was deleted or replaced on Drive
+        if not (_is_not_found(e) and entry and entry.file_id == file_id):
+            raise
+        _manifest.drop(user_key, session_id)
+        file_id = _find_session_file(service, folder_id, filename)
+        if file_id is None:
+            return None
+        reader = SectionReader(DRIVE_LOAD_MAX_BYTES, latest=latest, wanted=wanted)
+        reader.feed(iter_lines(_iter_download(service, file_id)))
+    return render(title, reader, index_only)
 
 
 # ---------------------------------------------------------------------------
@@ -184,7 +685,8 @@ def _download_markdown(service, folder_id: str, filename: str) -> str | None:
 def save_session_to_google_drive(session_id: str, summary: str) -> str:
     """Save the current study session to Google Drive.
 
-    Stores a JSON file with the session summary in a dedicated Google Drive folder.
+    Stores the session summary as Markdown in a dedicated Google Drive folder.
+    Saving an unchanged summary uploads nothing.
     If the user has not yet completed the Google OAuth2 consent flow, this tool
     returns the authorization URL that the user must open in their browser.
 
@@ -193,7 +695,8 @@ def save_session_to_google_drive(session_id: str, summary: str) -> str:
         summary: A text summary of the session content to save.
     """
     try:
-        token_result = _get_google_access_token()
+        with telemetry.span("drive.token"):
+            token_result = _get_google_access_token()
 
         if "authorization_url" in token_result:
             return (
@@ -205,17 +708,12 @@ def save_session_to_google_drive(session_id: str, summary: str) -> str:
             return f"Error getting Google token: {token_result['error']}"
 
         access_token = token_result["access_token"]
-        session_data = {
-            "session_id": session_id,
-            "summary": summary,
-            "saved_at": datetime.now(timezone.utc).isoformat(),
-        }
-        markdown_content = _session_to_markdown(session_data)
-        service = _build_drive_service(access_token)
-        folder_id = _find_or_create_folder(service, GOOGLE_DRIVE_FOLDER_NAME)
-        filename = f"session_{session_id}.md"
-        file_id = _upload_markdown(service, folder_id, filename, markdown_content)
-        return f"Session saved to Google Drive: {filename} (file ID: {file_id})"
+        user_key = _current_user_key()
+        with telemetry.span("drive.save"):
+            return _run_drive_op(
+                access_token,
+                lambda service, folder_id: _save_session(service, folder_id, user_key, session_id, summary),
+            )
 
     except Exception as e:
         logger.exception("Failed to save session to Google Drive")
@@ -223,18 +721,29 @@ def save_session_to_google_drive(session_id: str, summary: str) -> str:
 
 
 @tool
-def load_session_from_google_drive(session_id: str) -> str:
+def load_session_from_google_drive(
+    session_id: str,
+    latest_sections: int = 0,
+    section_numbers: list[int] | None = None,
+    index_only: bool = False,
+) -> str:
     """Load a previously saved study session from Google Drive.
 
-    Retrieves the session JSON file from the dedicated Google Drive folder.
+    Retrieves the session Markdown from the dedicated Google Drive folder.
+    Large sessions are returned in part: the most recent sections that fit a
+    size limit, plus a numbered section index to load earlier ones.
     If the user has not yet completed the Google OAuth2 consent flow, this tool
     returns the authorization URL that the user must open in their browser.
 
     Args:
         session_id: Unique identifier for the session to load.
+        latest_sections: Return only the N most recent sections (0 = as many as fit).
+        section_numbers: Return only these sections, numbered as in the section index.
+        index_only: Return just the section index, without section content.
     """
     try:
-        token_result = _get_google_access_token()
+        with telemetry.span("drive.token"):
+            token_result = _get_google_access_token()
 
         if "authorization_url" in token_result:
             return (
@@ -246,10 +755,16 @@ def load_session_from_google_drive(session_id: str) -> str:
             return f"Error getting Google token: {token_result['error']}"
 
         access_token = token_result["access_token"]
-        service = _build_drive_service(access_token)
-        folder_id = _find_or_create_folder(service, GOOGLE_DRIVE_FOLDER_NAME)
-        filename = f"session_{session_id}.md"
-        data = _download_markdown(service, folder_id, filename)
+        user_key = _current_user_key()
+        latest = latest_sections or DRIVE_LOAD_LATEST_SECTIONS
+        wanted = set(section_numbers) if section_numbers else None
+        with telemetry.span("drive.load"):
+            data = _run_drive_op(
+                access_token,
+                lambda service, folder_id: _load_session(
+                    service, folder_id, user_key, session_id, latest, wanted, index_only
+                ),
+            )
         if data is None:
             return f"No session found on Google Drive for session_id: {session_id}"
         return data
@@ -257,3 +772,24 @@ def load_session_from_google_drive(session_id: str) -> str:
     except Exception as e:
         logger.exception("Failed to load session from Google Drive")
         return f"Error loading session from Google Drive: {e}"
+
+
+def _async_tool(sync_tool):
+    """Async twin of a Drive tool, with the same name, schema and description.
+
+    The blocking Google API calls run on a dedicated executor in a copy of the
+    caller's context, which carries the AgentCore workload token. The event
+    loop is never blocked, and Drive calls do not compete with other blocking
+    work for asyncio's small default pool.
+    """
+
+    @functools.wraps(sync_tool)
+    async def run(*args, **kwargs):
+        call = functools.partial(contextvars.copy_context().run, sync_tool, *args, **kwargs)
+        return await asyncio.get_running_loop().run_in_executor(_drive_executor, call)
+
+    return tool(run)
+
+
+save_session_to_google_drive_async = _async_tool(save_session_to_google_drive)
+load_session_from_google_drive_async = _async_tool(load_session_from_google_drive)
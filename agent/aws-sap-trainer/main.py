@@ -4,14 +4,30 @@ Uses the BedrockAgentCoreApp SDK which automatically handles the HTTP server,
 /invocations and /ping endpoints on port 8080.
 """
 
+import asyncio
 import logging
 import os
+import shutil
+import threading
+import time
 from datetime import date
 
 logger = logging.getLogger(__name__)
 
+import answer_cache
+import conversation
 import memory
-from google_drive import save_session_to_google_drive, load_session_from_google_drive
+import routing
+import telemetry
+from admission import Admission, Busy
+from agent_pool import AgentPool
+import google_drive
+from google_drive import (
+    load_session_from_google_drive,
+    load_session_from_google_drive_async,
+    save_session_to_google_drive,
+    save_session_to_google_drive_async,
+)
 
 from bedrock_agentcore.runtime import BedrockAgentCoreApp
 from strands import Agent
@@ -22,8 +38,18 @@ from mcp import stdio_client, StdioServerParameters
 # ---------------------------------------------------------------------------
 # Configuration (override via environment variables)
 # ---------------------------------------------------------------------------
-MODEL_ID = os.getenv("MODEL_ID", "anthropic.claude-haiku-4-5-20251001-v1:0")
 AWS_REGION = os.getenv("AWS_REGION", os.getenv("AWS_DEFAULT_REGION", "eu-west-1"))
+STREAM_RESPONSES = os.getenv("STREAM_RESPONSES", "false").lower() == "true"
+# "sync": entrypoint runs on a worker thread; "async": on the app's event loop
+INVOKE_MODE = os.getenv("INVOKE_MODE", "sync").lower()
+AWS_DOCS_MCP_COMMAND = os.getenv("AWS_DOCS_MCP_COMMAND", "awslabs.aws-documentation-mcp-server")
+AWS_DOCS_MCP_VERSION = os.getenv("AWS_DOCS_MCP_VERSION", "1.1.30")
+MCP_WARMUP = os.getenv("MCP_WARMUP", "false").lower() == "true"
+MCP_HEALTHCHECK_INTERVAL = float(os.getenv("MCP_HEALTHCHECK_INTERVAL", "60"))
+MCP_HEALTHCHECK_TIMEOUT = float(os.getenv("MCP_HEALTHCHECK_TIMEOUT", "5"))
+MCP_START_WAIT = float(os.getenv("MCP_START_WAIT", "30"))
+METRICS_ENDPOINT = os.getenv("METRICS_ENDPOINT", "false").lower() == "true"
+PROMPT_CACHING = os.getenv("PROMPT_CACHING", "false").lower() == "true"
 SYSTEM_PROMPT = os.getenv(
     "SYSTEM_PROMPT",
     """
@@ -74,66 +100,553 @@ SYSTEM_PROMPT = os.getenv(
 # ---------------------------------------------------------------------------
 app = BedrockAgentCoreApp()
 
-_model = None
-_aws_doc_mcp_client = None
-
-
-def _get_aws_doc_mcp_client() -> MCPClient | None:
-    """Create the MCP client for AWS Docs MCP Server (singleton, safe to share)."""
-    global _aws_doc_mcp_client
-    if _aws_doc_mcp_client is None:
-        logger.info("Connecting to AWS Docs MCP Server")
-        _aws_doc_mcp_client = MCPClient(
-            lambda: stdio_client(
-                StdioServerParameters(
-                    command="uvx",
-                    args=["awslabs.aws-documentation-mcp-server@latest"]
-                )
+# One shared BedrockModel per model ID (see routing.py for how one is chosen)
+_models: dict[str, BedrockModel] = {}
+_models_lock = threading.Lock()
+
+# The AWS Docs MCP server runs as one long-lived stdio subprocess shared by all
+# invocations. Its tool list is fetched once per subprocess and handed to each
+# Agent directly, so agents never re-list tools. A supervisor thread starts,
+# health-checks and restarts it. Requests only read the current tool list,
+# waiting (up to MCP_START_WAIT) while a start or restart is in progress.
+_aws_doc_mcp_client: MCPClient | None = None
+_aws_doc_mcp_tools: list = []
+_aws_doc_mcp_checked_at = 0.0
+_aws_doc_mcp_lock = threading.Lock()
+_aws_doc_mcp_supervisor: threading.Thread | None = None
+_aws_doc_mcp_ready = threading.Event()  # clear until the first start, and during restarts
+
+
+def _aws_doc_mcp_server_params() -> StdioServerParameters:
+    """Prefer the version pre-installed in the image; fall back to a pinned uvx run."""
+    if shutil.which(AWS_DOCS_MCP_COMMAND):
+        return StdioServerParameters(command=AWS_DOCS_MCP_COMMAND, args=[])
+    logger.warning("%s not found on PATH, falling back to uvx", AWS_DOCS_MCP_COMMAND)
+    return StdioServerParameters(
+        command="uvx",
+        args=[f"awslabs.aws-documentation-mcp-server@{AWS_DOCS_MCP_VERSION}"],
+    )
+
+
+def _start_aws_doc_mcp() -> None:
+    """Start the MCP subprocess, complete the handshake and cache its tools."""
+    global _aws_doc_mcp_client, _aws_doc_mcp_tools, _aws_doc_mcp_checked_at
+    logger.info("Connecting to AWS Docs MCP Server")
+    started = time.monotonic()
+    client = MCPClient(lambda: stdio_client(_aws_doc_mcp_server_params()))
+    client.start()
+    _aws_doc_mcp_tools = list(client.list_tools_sync())
+    _aws_doc_mcp_client = client
+    _clear_agent_pools()  # pooled agents were built with the previous tool list
+    _aws_doc_mcp_checked_at = time.monotonic()
+    logger.info(
+        "AWS Docs MCP Server ready in %.2fs with tools=%s",
+        _aws_doc_mcp_checked_at - started, [t.tool_name for t in _aws_doc_mcp_tools],
+    )
+
+
+def _stop_aws_doc_mcp() -> None:
+    global _aws_doc_mcp_client, _aws_doc_mcp_tools
+    client, _aws_doc_mcp_client, _aws_doc_mcp_tools = _aws_doc_mcp_client, None, []
+    if client is None:
+        return
+    _clear_agent_pools()
+    try:
+        client.stop(None, None, None)
+    except Exception:
+        logger.exception("Error while stopping AWS Docs MCP client")
+
+
+def _aws_doc_mcp_healthy() -> bool:
+    """Round-trip a tools/list request, giving up after MCP_HEALTHCHECK_TIMEOUT.
+
+    The call runs on a throwaway daemon thread because a stalled stdio session
+    can block it indefinitely.
+    """
+    outcome: list[bool] = []
+
+    def _probe() -> None:
+        try:
+            _aws_doc_mcp_client.list_tools_sync()
+            outcome.append(True)
+        except Exception:
+            logger.exception("AWS Docs MCP health check failed")
+
+    probe = threading.Thread(target=_probe, name="mcp-healthcheck", daemon=True)
+    probe.start()
+    probe.join(MCP_HEALTHCHECK_TIMEOUT)
+    return bool(outcome)
+
+
+def _connect_aws_doc_mcp() -> None:
+    """Start the server if it is down, or restart it when the health check is due and fails.
+
+    Falls back to no doc tools when the server cannot be started, so the agent
+    still runs; the supervisor retries on its next round.
+    """
+    global _aws_doc_mcp_checked_at
+    with _aws_doc_mcp_lock:
+        try:
+            if _aws_doc_mcp_client is None:
+                _aws_doc_mcp_ready.clear()
+                _start_aws_doc_mcp()
+            elif time.monotonic() - _aws_doc_mcp_checked_at >= MCP_HEALTHCHECK_INTERVAL:
+                if _aws_doc_mcp_healthy():
+                    _aws_doc_mcp_checked_at = time.monotonic()
+                else:
+                    logger.warning("AWS Docs MCP session unresponsive — restarting")
+                    _aws_doc_mcp_ready.clear()
+                    _stop_aws_doc_mcp()
+                    _start_aws_doc_mcp()
+        except Exception:
+            logger.exception("AWS Docs MCP Server unavailable — continuing without doc tools")
+            _stop_aws_doc_mcp()
+        finally:
+            _aws_doc_mcp_ready.set()
+
+
+def _supervise_aws_doc_mcp() -> None:
+    while True:
+        _connect_aws_doc_mcp()
+        time.sleep(MCP_HEALTHCHECK_INTERVAL)
+
+
+def _start_aws_doc_mcp_supervisor() -> None:
+    global _aws_doc_mcp_supervisor
+    with _aws_doc_mcp_lock:
+        if _aws_doc_mcp_supervisor is None:
+            _aws_doc_mcp_supervisor = threading.Thread(
+                target=_supervise_aws_doc_mcp, name="mcp-supervisor", daemon=True,
             )
-        )
+            _aws_doc_mcp_supervisor.start()
+
+
+def _get_aws_doc_mcp_tools() -> list:
+    """Return the current AWS Docs MCP tools.
+
+    While the server is being started or restarted, waits up to
+    MCP_START_WAIT seconds for it rather than building an agent without doc
+    tools. Empty when the server is unavailable; the pools are cleared once it
+    is up, so the next agents are built with its tools.
+    """
+    if _aws_doc_mcp_supervisor is None:
+        _start_aws_doc_mcp_supervisor()
+    if not _aws_doc_mcp_ready.is_set() and not _aws_doc_mcp_ready.wait(MCP_START_WAIT):
+        logger.warning("AWS Docs MCP Server not ready after %.0fs — building agent without doc tools", MCP_START_WAIT)
+    return list(_aws_doc_mcp_tools)
 
-    return _aws_doc_mcp_client
 
+def _get_model(model_id: str = routing.MODEL_ID) -> BedrockModel:
+    """Lazily create the shared instance for ``model_id`` (stateless, safe to share)."""
+    model = _models.get(model_id)
+    if model is None:
+        with _models_lock:
+            model = _models.get(model_id)
+            if model is None:
+                logger.info("Initializing model=%s prompt_caching=%s", model_id, PROMPT_CACHING)
+                # A cache point after the tool definitions lets Bedrock reuse the
+                # processed tool schemas across invocations
+                cache_config = {"cache_tools": "default"} if PROMPT_CACHING else {}
+                model = _models[model_id] = BedrockModel(model_id=model_id, **cache_config)
+    return model
 
-def _get_model() -> BedrockModel:
-    """Lazily create the shared model instance (stateless, safe to share)."""
-    global _model
-    if _model is None:
-        logger.info("Initializing model=%s", MODEL_ID)
-        _model = BedrockModel(model_id=MODEL_ID)
-    return _model
 
+def _system_prompt() -> str | list[dict]:
+    """System prompt, ending with a cache point when PROMPT_CACHING is enabled."""
+    if not PROMPT_CACHING:
+        return SYSTEM_PROMPT
+    return [{"text": SYSTEM_PROMPT}, {"cachePoint": {"type": "default"}}]
 
-def _create_agent() -> Agent:
-    """Create a fresh Agent per invocation to avoid concurrency issues."""
-    tools = [save_session_to_google_drive, load_session_from_google_drive]
-    mcp = _get_aws_doc_mcp_client()
-    if mcp:
-        tools.append(mcp)
 
-    return Agent(system_prompt=SYSTEM_PROMPT, model=_get_model(), tools=tools)
+def _create_agent(model_id: str = routing.MODEL_ID) -> Agent:
+    """Build a new Agent with the Drive and AWS Docs MCP tools (used by the pools)."""
+    if INVOKE_MODE == "async":
+        tools = [save_session_to_google_drive_async, load_session_from_google_drive_async]
+    else:
+        tools = [save_session_to_google_drive, load_session_from_google_drive]
+    tools.extend(_get_aws_doc_mcp_tools())
 
+    return Agent(system_prompt=_system_prompt(), model=_get_model(model_id), tools=tools)
 
-@app.entrypoint
-def invoke(payload: dict) -> dict:
-    """Process an incoming request from AgentCore Runtime."""
+
+# Agents are not safe for concurrent invocations, so each request leases one
+# from the pool of its model for its exclusive use; it is reset and returned
+# afterwards
+_agent_pools: dict[str, AgentPool] = {}
+_agent_pools_lock = threading.Lock()
+
+
+def _get_agent_pool(model_id: str = routing.MODEL_ID) -> AgentPool:
+    pool = _agent_pools.get(model_id)
+    if pool is None:
+        with _agent_pools_lock:
+            pool = _agent_pools.get(model_id)
+            if pool is None:
+                pool = _agent_pools[model_id] = AgentPool(lambda: _create_agent(model_id))
+    return pool
+
+
+def _clear_agent_pools() -> None:
+    with _agent_pools_lock:
+        pools = list(_agent_pools.values())
+    for pool in pools:
+        pool.clear()
+
+
+def _acquire_agent(pool: AgentPool) -> Agent:
+    """Lease an agent (an MCP restart clears the pools, so it never holds dead tools)."""
+    return pool.acquire()
+
+
+def _usage(result) -> dict:
+    """Token usage of an AgentResult, including prompt-cache reads and writes."""
+    metrics = getattr(result, "metrics", None)
+    usage = {
+        key: value
+        for key, value in (getattr(metrics, "accumulated_usage", None) or {}).items()
+        if isinstance(value, (int, float))
+    }
+    logger.info(
+        "Token usage: input=%d output=%d cache_read=%d cache_write=%d",
+        usage.get("inputTokens", 0), usage.get("outputTokens", 0),
+        usage.get("cacheReadInputTokens", 0), usage.get("cacheWriteInputTokens", 0),
+    )
+    return usage
+
+
+def _metrics(request):
+    """GET /metrics — telemetry aggregates plus memory and Drive cache counters."""
+    from starlette.responses import JSONResponse
+
+    return JSONResponse({
+        **telemetry.snapshot(),
+        "memory_ingest": memory.ingest_stats(),
+        "memory_cache": memory.cache_stats(),
+        "drive_cache": google_drive.cache_stats(),
+        "agent_pools": {model_id: pool.stats() for model_id, pool in list(_agent_pools.items())},
+        "conversation": conversation.stats(),
+        "answer_cache": answer_cache.stats(),
+        "admission": _admission.stats(),
+    })
+
+
+if METRICS_ENDPOINT:
+    app.add_route("/metrics", _metrics, methods=["GET"])
+
+
+def _session_id(payload: dict) -> str:
+    return payload.get("session_id", f"session-{date.today().isoformat()}")
+
+
+def _start_request(payload: dict) -> tuple[str, str, bool, telemetry.Trace | None]:
+    """Read the payload fields and start the request trace."""
     user_message = payload.get("prompt", "Hello")
-    session_id = payload.get("session_id", f"session-{date.today().isoformat()}")
+    session_id = _session_id(payload)
+    stream = payload.get("stream", STREAM_RESPONSES)
+
+    trace = telemetry.start("invoke", session_id=session_id, stream=bool(stream), mode=INVOKE_MODE)
+    telemetry.observe("payload.prompt_bytes", len(user_message.encode("utf-8")))
+    return user_message, session_id, bool(stream), trace
+
+
+def _history_id(payload: dict) -> str | None:
+    """Session id the in-process history is kept under, or None to keep none.
+
+    Only an id the caller chose qualifies: callers that omit it share the
+    default daily id, and must never be replayed each other's turns.
+    """
+    session_id = payload.get("session_id")
+    return session_id if isinstance(session_id, str) and session_id else None
+
+
+def _history(history_id: str | None) -> tuple[list[dict], str]:
+    """The session's recent turns kept in-process, and which memory lookups they make redundant."""
+    history = conversation.messages(history_id) if history_id else []
+    skip_memory = conversation.CONVERSATION_SKIP_MEMORY if history else "none"
+    telemetry.annotate(history_turns=len(history) // 2, memory_skipped=skip_memory)
+    return history, skip_memory
+
 
-    """Retrieve from the memory the context to have memory of the conversation"""
-    memory_context = memory.retrieve(user_message, session_id)
-    augmented_message = f"{memory_context}{user_message}" if memory_context else user_message
+def _record_turn(history_id: str | None, user_message: str, response_text: str) -> None:
+    if history_id:
+        conversation.record(history_id, user_message, response_text)
 
-    """Init Strand Agent and invoke it"""
-    agent = _create_agent()
-    result = agent(augmented_message)
-    response_text = str(result)
 
-    """Store the response in the memory"""
-    memory.ingest(session_id, user_message, response_text)
+def _requested_model(payload: dict) -> str | None:
+    """The payload's "model" tier, ignoring values that are not strings."""
+    model = payload.get("model")
+    return model if isinstance(model, str) and model else None
+
+
+def _answer_scope(payload: dict, history: list[dict]) -> str | None:
+    """Answer-cache scope of a request, or None when its answer must not be shared.
+
+    Follow-ups build on the session's history, so only a session's first
+    turn is looked up and stored. Answers of a requested tier are kept apart.
+    """
+    if history or payload.get("cache") is False:
+        return None
+    return _requested_model(payload) or "auto"
+
+
+def _cached_response(hit: answer_cache.Hit, stream: bool):
+    """Serve a cached answer in the same shape as a generated one."""
+    telemetry.observe("payload.response_bytes", len(hit.text.encode("utf-8")))
+    if not stream:
+        return {"result": hit.text, "usage": {}, "cached": True}
+
+    async def events():
+        yield {"type": "text", "data": hit.text}
+        yield {"type": "done", "usage": {}, "cached": True}
+
+    return events()
+
+
+def _route(payload: dict, user_message: str, session_id: str, memory_context: str) -> routing.Route:
+    """Pick the model for this request and record the decision."""
+    telemetry.observe("payload.memory_context_bytes", len(memory_context.encode("utf-8")))
+    route = routing.choose(user_message, memory_context, _requested_model(payload))
+    telemetry.incr(f"routing.{route.tier}")
+    telemetry.annotate(model=route.tier, model_id=route.model_id, route_reason=route.reason)
+    logger.info("Routing session=%s to %s model=%s (%s)", session_id, route.tier, route.model_id, route.reason)
+    return route
+
+
+def _response(result, trace: telemetry.Trace | None = None) -> tuple[str, dict]:
+    """Response text and token usage of a finished agent run, recorded in telemetry."""
+    telemetry.record_agent_result(result, trace)
+    usage = _usage(result)
+    response_text = str(result) if result is not None else ""
+    telemetry.observe("payload.response_bytes", len(response_text.encode("utf-8")))
+    return response_text, usage
+
+
+async def _stream_response(
+    agent: Agent,
+    pool: AgentPool,
+    augmented_message: str,
+    session_id: str,
+    user_message: str,
+    trace: telemetry.Trace | None = None,
+    answer_scope: str | None = None,
+    history_id: str | None = None,
+):
+    """Yield text deltas and tool progress as they arrive, then ingest the turn.
+
+    Each yielded dict is sent by BedrockAgentCoreApp as one server-sent event.
+    The agent is returned to the pool when the stream ends.
+    """
+    seen_tool_ids: set[str] = set()
+    result = None
+    try:
+        with telemetry.span("agent.invoke", trace):
+            async for event in agent.stream_async(augmented_message):
+                if "data" in event:
+                    yield {"type": "text", "data": event["data"]}
+                elif "current_tool_use" in event:
+                    tool_use = event["current_tool_use"]
+                    tool_use_id = tool_use.get("toolUseId")
+                    if tool_use_id and tool_use_id not in seen_tool_ids:
+                        seen_tool_ids.add(tool_use_id)
+                        yield {"type": "tool_use", "name": tool_use.get("name")}
+                elif "result" in event:
+                    result = event["result"]
+        response_text, usage = _response(result, trace)
+        if answer_scope:
+            answer_cache.store(answer_scope, user_message, response_text, result)
+
+        """Store the response in the memory once the stream is complete"""
+        with telemetry.span("memory.ingest", trace):
+            await memory.ingest_async(session_id, user_message, response_text)
+        _record_turn(history_id, user_message, response_text)
+        yield {"type": "done", "usage": usage}
+    finally:
+        pool.release(agent, discard=result is None)
+        telemetry.finish(trace, completed=result is not None)
+
+
+def _invoke(payload: dict):
+    """Run one turn on a worker thread (see ``invoke``)."""
+    user_message, session_id, stream, trace = _start_request(payload)
+    try:
+        history_id = _history_id(payload)
+        history, skip_memory = _history(history_id)
+        answer_scope = _answer_scope(payload, history)
+        cached = answer_cache.lookup(answer_scope, user_message) if answer_scope else None
+        if cached is not None:
+            with telemetry.span("memory.ingest"):
+                memory.ingest(session_id, user_message, cached.text)
+            _record_turn(history_id, user_message, cached.text)
+            telemetry.finish(trace)
+            return _cached_response(cached, stream)
+
+        """Retrieve from the memory the context to have memory of the conversation"""
+        with telemetry.span("memory.retrieve"):
+            memory_context = "" if skip_memory == "all" else memory.retrieve(
+                user_message, session_id, include_session=skip_memory == "none",
+            )
+        augmented_message = f"{memory_context}{user_message}" if memory_context else user_message
+        route = _route(payload, user_message, session_id, memory_context)
+
+        """Init Strand Agent and invoke it"""
+        pool = _get_agent_pool(route.model_id)
+        with telemetry.span("agent.create"):
+            agent = _acquire_agent(pool)
+        agent.messages = history
+        if stream:
+            return _stream_response(
+                agent, pool, augmented_message, session_id, user_message, trace, answer_scope, history_id,
+            )
+
+        try:
+            with telemetry.span("agent.invoke"):
+                result = agent(augmented_message)
+        except BaseException:
+            pool.release(agent, discard=True)
+            raise
+        pool.release(agent)
+        response_text, usage = _response(result)
+        if answer_scope:
+            answer_cache.store(answer_scope, user_message, response_text, result)
+
+        """Store the response in the memory"""
+        with telemetry.span("memory.ingest"):
+            memory.ingest(session_id, user_message, response_text)
+        _record_turn(history_id, user_message, response_text)
+    except Exception as e:
+        telemetry.finish(trace, error=type(e).__name__)
+        raise
+
+    telemetry.finish(trace)
+    return {"result": response_text, "usage": usage}
+
+
+async def _invoke_async(payload: dict):
+    """Run one turn on the event loop (see ``invoke_async``)."""
+    user_message, session_id, stream, trace = _start_request(payload)
+    try:
+        history_id = _history_id(payload)
+        history, skip_memory = _history(history_id)
+        answer_scope = _answer_scope(payload, history)
+        cached = answer_cache.lookup(answer_scope, user_message) if answer_scope else None
+        if cached is not None:
+            with telemetry.span("memory.ingest"):
+                await memory.ingest_async(session_id, user_message, cached.text)
+            _record_turn(history_id, user_message, cached.text)
+            telemetry.finish(trace)
+            return _cached_response(cached, stream)
+
+        """Retrieve from the memory the context to have memory of the conversation"""
+        with telemetry.span("memory.retrieve"):
+            memory_context = "" if skip_memory == "all" else await memory.retrieve_async(
+                user_message, session_id, include_session=skip_memory == "none",
+            )
+        augmented_message = f"{memory_context}{user_message}" if memory_context else user_message
+        route = _route(payload, user_message, session_id, memory_context)
+
+        """Init Strand Agent and invoke it"""
+        pool = _get_agent_pool(route.model_id)
+        with telemetry.span("agent.create"):
+            # A build may block, so lease off the loop
+            agent = await asyncio.to_thread(_acquire_agent, pool)
+        agent.messages = history
+        if stream:
+            return _stream_response(
+                agent, pool, augmented_message, session_id, user_message, trace, answer_scope, history_id,
+            )
+
+        try:
+            with telemetry.span("agent.invoke"):
+                result = await agent.invoke_async(augmented_message)
+        except BaseException:
+            pool.release(agent, discard=True)
+            raise
+        pool.release(agent)
+        response_text, usage = _response(result)
+        if answer_scope:
+            answer_cache.store(answer_scope, user_message, response_text, result)
+
+        """Store the response in the memory"""
+        with telemetry.span("memory.ingest"):
+            await memory.ingest_async(session_id, user_message, response_text)
+        _record_turn(history_id, user_message, response_text)
+    except Exception as e:
+        telemetry.finish(trace, error=type(e).__name__)
+        raise
+
+    telemetry.finish(trace)
+    return {"result": response_text, "usage": usage}
+
+
+# Requests of one session run one at a time, identical in-flight requests
+# share one result and a global limit sheds load with 429s
+_admission = Admission()
+
+
+def _coalesce_key(payload: dict, session_id: str):
+    """Identical non-streaming requests of a session share one run."""
+    if payload.get("stream", STREAM_RESPONSES):
+        return None
+    return session_id, payload.get("prompt", "Hello"), _requested_model(payload)
+
+
+def _busy(session_id: str, e: Busy):
+    from starlette.responses import JSONResponse
+
+    logger.warning("Rejected request for session=%s: %s", session_id, e)
+    return JSONResponse(
+        {"error": "busy", "message": f"The trainer is busy, please retry shortly ({e})"},
+        status_code=429,
+        headers={"Retry-After": "1"},
+    )
+
+
+def invoke(payload: dict):
+    """Process an incoming request from AgentCore Runtime.
+
+    Returns {"result": ...} by default. When the payload sets "stream": true
+    (or STREAM_RESPONSES is enabled) an async generator is returned instead and
+    the response is sent as text/event-stream.
+
+    Set "model" to "fast" or "deep" to pick the model tier instead of letting
+    the routing heuristics decide, and "cache": false to bypass the answer
+    cache (see answer_cache.py). Returns HTTP 429 when the request cannot be
+    admitted (see admission.py).
+    """
+    session_id = _session_id(payload)
+    try:
+        return _admission.run(session_id, _coalesce_key(payload, session_id), lambda: _invoke(payload))
+    except Busy as e:
+        return _busy(session_id, e)
+
+
+async def invoke_async(payload: dict):
+    """Async variant of ``invoke``, used when INVOKE_MODE=async.
+
+    Runs on the app's event loop and awaits every I/O step, so a request
+    waiting on Bedrock, a tool or memory holds no thread: memory lookups are
+    awaited on the retrieval pool, the agent runs through ``invoke_async`` and
+    Drive tools run on their own executor. Same payload and response as
+    ``invoke``.
+    """
+    session_id = _session_id(payload)
+    try:
+        return await _admission.run_async(
+            session_id, _coalesce_key(payload, session_id), lambda: _invoke_async(payload)
+        )
+    except Busy as e:
+        return _busy(session_id, e)
+
 
-    return {"result": response_text}
+app.entrypoint(invoke_async if INVOKE_MODE == "async" else invoke)
 
 
 if __name__ == "__main__":
-    app.run()
\ No newline at end of file
+    if MCP_WARMUP:
+        # Pay the MCP subprocess start and handshake before the server starts
+        # listening, so /ping only reports healthy once the tools are ready,
+        # and build the pooled agents with them.
+        _connect_aws_doc_mcp()
+        _get_agent_pool().prewarm()
+    _start_aws_doc_mcp_supervisor()
+    app.run()
@@ -2,11 +2,26 @@
 
 from __future__ import annotations
 
+import asyncio
+import atexit
+import json
 import logging
 import os
+import queue
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
 from datetime import datetime, timezone
 
 import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError, ConnectionError as BotoConnectionError, HTTPClientError
+
+import telemetry
+from cache import TTLCache
+from context_budget import Record, assemble
 
 logger = logging.getLogger(__name__)
 
@@ -17,17 +32,95 @@ NS_SEMANTIC = os.getenv("MEMORY_NAMESPACE", "aws_knowledge")
 NS_SUMMARIZATION = os.getenv("MEMORY_NS_SUMMARIZATION", "study_sessions_{sessionId}")
 NS_USER_PREFERENCE = os.getenv("MEMORY_NS_USER_PREFERENCE", "learner_profile")
 TOP_K = int(os.getenv("MEMORY_TOP_K", "5"))
+RETRIEVE_TIMEOUT = float(os.getenv("MEMORY_RETRIEVE_TIMEOUT", "3.0"))
+# Every admitted request runs up to three namespace lookups at once, so the
+# pool (and the HTTP connection pool) is sized for all of them by default
+RETRIEVE_WORKERS = int(os.getenv(
+    "MEMORY_RETRIEVE_WORKERS", str(max(8, 3 * int(os.getenv("ADMISSION_MAX_CONCURRENT", "32")))),
+))
+MAX_POOL_CONNECTIONS = int(os.getenv("MEMORY_MAX_POOL_CONNECTIONS", str(RETRIEVE_WORKERS + 1)))
+CONNECT_TIMEOUT = float(os.getenv("MEMORY_CONNECT_TIMEOUT", "2"))
+READ_TIMEOUT = float(os.getenv("MEMORY_READ_TIMEOUT", "5"))
+MAX_ATTEMPTS = int(os.getenv("MEMORY_MAX_ATTEMPTS", "3"))
+INGEST_ASYNC = os.getenv("MEMORY_INGEST_ASYNC", "true").lower() == "true"
+INGEST_QUEUE_SIZE = int(os.getenv("MEMORY_INGEST_QUEUE_SIZE", "1000"))
+INGEST_BATCH_SIZE = int(os.getenv("MEMORY_INGEST_BATCH_SIZE", "10"))
+INGEST_MAX_RETRIES = int(os.getenv("MEMORY_INGEST_MAX_RETRIES", "3"))
+INGEST_BACKOFF = float(os.getenv("MEMORY_INGEST_BACKOFF", "0.5"))
+INGEST_SPILL_PATH = os.getenv("MEMORY_INGEST_SPILL_PATH", "")
+INGEST_MAX_REPLAYS = int(os.getenv("MEMORY_INGEST_MAX_REPLAYS", "5"))
+INGEST_FLUSH_TIMEOUT = float(os.getenv("MEMORY_INGEST_FLUSH_TIMEOUT", "10"))
+CACHE_TTL = float(os.getenv("MEMORY_CACHE_TTL", "120"))
+CACHE_MAX_BYTES = int(os.getenv("MEMORY_CACHE_MAX_BYTES", str(8 * 1024 * 1024)))
+
+_CLIENT_CONFIG = Config(
+    max_pool_connections=MAX_POOL_CONNECTIONS,
+    connect_timeout=CONNECT_TIMEOUT,
+    read_timeout=READ_TIMEOUT,
+    retries={"max_attempts": MAX_ATTEMPTS, "mode": "adaptive"},
+    tcp_keepalive=True,
+)
+
+# Shared, bounded pool for the per-namespace lookups. A slow namespace keeps
+# its worker busy until boto3 gives up, so the pool is sized for a few
+# concurrent invocations rather than one.
+_retrieve_executor = ThreadPoolExecutor(
+    max_workers=RETRIEVE_WORKERS, thread_name_prefix="memory-retrieve"
+)
+
+
+# boto3 clients are thread-safe once built, but building one is not (the
+# default session is shared), so construction happens under a lock.
+_clients: dict[str, object] = {}
+_clients_lock = threading.Lock()
+
+
+def _client(region: str = AWS_REGION):
+    """Return the process-wide bedrock-agentcore client for a region.
+
+    The client (and its HTTPS connection pool) is shared by retrieve and
+    ingest across all invocations.
+    """
+    client = _clients.get(region)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(region)
+            if client is None:
+                client = boto3.client("bedrock-agentcore", region_name=region, config=_CLIENT_CONFIG)
+                _clients[region] = client
+    return client
 
 
-def _client():
-    return boto3.client("bedrock-agentcore", region_name=AWS_REGION)
+# Namespace results keyed by (namespace, normalized query). Session
+# namespaces are invalidated whenever a turn for that session is written.
+_retrieval_cache = TTLCache(ttl=CACHE_TTL, max_bytes=CACHE_MAX_BYTES)
 
 
-def _retrieve_namespace(query: str, namespace: str) -> list[str]:
-    """Retrieve memory record texts from a single namespace.
+def _normalize_query(query: str) -> str:
+    """Collapse case, whitespace and trailing punctuation so trivial variants share a key."""
+    return re.sub(r"\s+", " ", query).strip().strip("?!.").lower()
 
-    Returns an empty list when no records are found or on any error.
+
+def _session_namespace(session_id: str) -> str:
+    return NS_SUMMARIZATION.replace("{sessionId}", session_id)
+
+
+def cache_stats() -> dict:
+    """Return hit/miss/eviction counters of the retrieval cache."""
+    return _retrieval_cache.stats()
+
+
+def _retrieve_namespace(query: str, namespace: str) -> list[Record]:
+    """Retrieve memory records (text and relevance score) from a single namespace.
+
+    Successful lookups are served from the retrieval cache for
+    MEMORY_CACHE_TTL seconds. Returns an empty list when no records are
+    found or on any error (errors are not cached).
     """
+    key = (namespace, _normalize_query(query))
+    cached = _retrieval_cache.get(key)
+    if cached is not None:
+        return cached
     try:
         resp = _client().retrieve_memory_records(
             memoryId=MEMORY_ID,
@@ -38,54 +131,373 @@ def _retrieve_namespace(query: str, namespace: str) -> list[str]:
             },
         )
         summaries = resp.get("memoryRecordSummaries", [])
-        return [s["content"]["text"] for s in summaries if s.get("content", {}).get("text")]
+        records = [
+            Record(s["content"]["text"], float(s.get("score") or 0.0))
+            for s in summaries
+            if s.get("content", {}).get("text")
+        ]
+        _retrieval_cache.put(key, records)
+        return records
     except Exception:
         logger.exception("Memory retrieval failed for namespace=%s", namespace)
         return []
 
 
-def retrieve(query: str, session_id: str = "") -> str:
+def retrieve(query: str, session_id: str = "", include_session: bool = True) -> str:
     """Return a formatted memory context block from all strategy namespaces.
 
     Queries semantic (aws_knowledge), summarization (study_sessions_{sessionId}),
-    and user preference (learner_profile) namespaces. Returns an empty string
-    when memory is disabled or no records are found.
+    and user preference (learner_profile) namespaces concurrently. Namespaces
+    that do not answer within MEMORY_RETRIEVE_TIMEOUT seconds are skipped, so a
+    slow namespace only costs its share of the budget and the rest of the
+    context is still returned. Records are then deduplicated across namespaces
+    and fitted to MEMORY_CONTEXT_TOKEN_BUDGET (see context_budget). Returns an
+    empty string when memory is disabled or no records are found.
+
+    ``include_session=False`` skips the summarization namespace, e.g. when the
+    session's recent turns are already in the conversation history.
     """
     if not MEMORY_ID:
         return ""
 
-    sections: list[str] = []
+    lookups = _lookups(session_id, include_session)
+    futures = [
+        _retrieve_executor.submit(_retrieve_namespace, query, namespace)
+        for _, namespace in lookups
+    ]
 
-    # Semantic — AWS facts, patterns, exam gotchas
-    semantic = _retrieve_namespace(query, NS_SEMANTIC)
-    if semantic:
-        joined = "\n- ".join(semantic)
-        sections.append(f"<semantic_memory>\n- {joined}\n</semantic_memory>")
+    deadline = time.monotonic() + RETRIEVE_TIMEOUT
+    sections: list[tuple[str, list[Record]]] = []
+    for (tag, namespace), future in zip(lookups, futures):
+        try:
+            records = future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except TimeoutError:
+            future.cancel()  # still queued: don't let it delay later requests' lookups
+            logger.warning(
+                "Memory retrieval timed out after %.1fs for namespace=%s — skipping",
+                RETRIEVE_TIMEOUT, namespace,
+            )
+            continue
+        if records:
+            sections.append((tag, records))
+    return _context(sections)
 
-    # Summarization — session digests (namespace contains the session ID)
-    if session_id:
-        ns_summary = NS_SUMMARIZATION.replace("{sessionId}", session_id)
-        summaries = _retrieve_namespace(query, ns_summary)
-        if summaries:
-            joined = "\n- ".join(summaries)
-            sections.append(f"<session_memory>\n- {joined}\n</session_memory>")
 
+async def retrieve_async(query: str, session_id: str = "", include_session: bool = True) -> str:
+    """Async variant of ``retrieve`` for the async entrypoint.
+
+    The boto3 lookups still run on the shared retrieval pool, but the caller
+    awaits them instead of parking a thread until they finish.
+    """
+    if not MEMORY_ID:
+        return ""
+
+    lookups = _lookups(session_id, include_session)
+    futures = [
+        asyncio.wrap_future(_retrieve_executor.submit(_retrieve_namespace, query, namespace))
+        for _, namespace in lookups
+    ]
+    done, _ = await asyncio.wait(futures, timeout=RETRIEVE_TIMEOUT)
+
+    sections: list[tuple[str, list[Record]]] = []
+    for (tag, namespace), future in zip(lookups, futures):
+        if future not in done:
+            future.cancel()  # cancels the pool future too, if it has not started
+            logger.warning(
+                "Memory retrieval timed out after %.1fs for namespace=%s — skipping",
+                RETRIEVE_TIMEOUT, namespace,
+            )
+            continue
+        records = future.result()
+        if records:
+            sections.append((tag, records))
+    return _context(sections)
+
+
+def _lookups(session_id: str, include_session: bool) -> list[tuple[str, str]]:
+    """(section tag, namespace) pairs in the order they appear in the context block."""
+    lookups: list[tuple[str, str]] = [
+        # Semantic — AWS facts, patterns, exam gotchas
+        ("semantic_memory", NS_SEMANTIC),
+    ]
+    # Summarization — session digests (namespace contains the session ID)
+    if session_id and include_session:
+        lookups.append(("session_memory", _session_namespace(session_id)))
     # User preference — learner profile, knowledge gaps, learning style
-    preferences = _retrieve_namespace(query, NS_USER_PREFERENCE)
-    if preferences:
-        joined = "\n- ".join(preferences)
-        sections.append(f"<user_preference_memory>\n- {joined}\n</user_preference_memory>")
+    lookups.append(("user_preference_memory", NS_USER_PREFERENCE))
+    return lookups
+
 
+def _context(sections: list[tuple[str, list[Record]]]) -> str:
+    """Fit the retrieved records to the token budget and record what was dropped."""
     if not sections:
         return ""
 
-    return "<memory>\n" + "\n".join(sections) + "\n</memory>\n\n"
+    context, stats = assemble(sections)
+    telemetry.observe("memory.context_tokens", stats.tokens_kept)
+    telemetry.observe("memory.context_tokens_dropped", stats.tokens_dropped)
+    telemetry.annotate(
+        memory_records=stats.records_kept,
+        memory_duplicates=stats.duplicates,
+        memory_tokens=stats.tokens_kept,
+        memory_tokens_dropped=stats.tokens_dropped,
+    )
+    if stats.tokens_dropped:
+        logger.info(
+            "Memory context: kept %d/%d records (%d tokens), dropped %d duplicates and %d tokens",
+            stats.records_kept, stats.records_in, stats.tokens_kept,
+            stats.duplicates, stats.tokens_dropped,
+        )
+    return context
+
+
+# ---------------------------------------------------------------------------
+# Ingestion — turns are queued and written by a background worker so
+# create_event latency never lands on the response path.
+# ---------------------------------------------------------------------------
+
+@dataclass
+class _Turn:
+    session_id: str
+    user_message: str
+    agent_response: str
+    timestamp: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    enqueued_at: float = field(default_factory=time.time)
+    replays: int = 0  # times the turn was re-queued from the spill file
+
+
+_THROTTLING_CODES = frozenset({
+    "Throttling", "ThrottlingException", "ThrottledException", "TooManyRequestsException",
+    "RequestLimitExceeded", "ServiceUnavailable", "ServiceUnavailableException",
+})
+
+
+def _retryable(error: Exception) -> bool:
+    """Throttling, 5xx and connection errors are worth retrying; anything else fails again."""
+    if isinstance(error, (BotoConnectionError, HTTPClientError)):
+        return True
+    if isinstance(error, ClientError):
+        code = error.response.get("Error", {}).get("Code", "")
+        status = error.response.get("ResponseMetadata", {}).get("HTTPStatusCode", 0)
+        return code in _THROTTLING_CODES or status >= 500
+    return False
+
+
+def _create_event(session_id: str, turns: list[_Turn]) -> None:
+    """Write one or more turns of a session as a single memory event."""
+    payload = []
+    for turn in turns:
+        payload.append({"conversational": {"role": "USER", "content": {"text": turn.user_message}}})
+        payload.append({"conversational": {"role": "ASSISTANT", "content": {"text": turn.agent_response}}})
+
+    _client().create_event(
+        memoryId=MEMORY_ID,
+        actorId=ACTOR_ID,
+        sessionId=session_id,
+        eventTimestamp=datetime.fromisoformat(turns[0].timestamp),
+        payload=payload,
+    )
+
+    # The session digest is about to change — stop serving the cached one.
+    ns_summary = _session_namespace(session_id)
+    _retrieval_cache.discard_where(lambda key: key[0] == ns_summary)
+
+
+class _IngestWorker:
+    """Bounded queue of turns drained by a single daemon thread.
+
+    Turns picked up together are grouped per session (order preserved) and
+    written in batches of up to MEMORY_INGEST_BATCH_SIZE turns. Throttling,
+    5xx and connection errors are retried with exponential backoff. When the
+    queue is full, or a batch exhausts its retries, turns are appended to
+    MEMORY_INGEST_SPILL_PATH if set (and replayed once the worker is idle) or
+    dropped otherwise. Turns rejected with any other error, or spilled again
+    after MEMORY_INGEST_MAX_REPLAYS replays, go to the ``.dead`` file next to
+    the spill file instead, and are never replayed.
+    """
+
+    def __init__(self) -> None:
+        self._queue: queue.Queue[_Turn] = queue.Queue(maxsize=INGEST_QUEUE_SIZE)
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._stats = {
+            "enqueued": 0,
+            "delivered": 0,
+            "retried": 0,
+            "spilled": 0,
+            "dropped": 0,
+            "failed": 0,
+            "dead_lettered": 0,
+            "last_lag_seconds": 0.0,
+            "max_lag_seconds": 0.0,
+        }
+
+    def submit(self, turn: _Turn) -> None:
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(turn)
+            self._count("enqueued")
+        except queue.Full:
+            logger.warning("Memory ingest queue full (%d) — spilling turn", INGEST_QUEUE_SIZE)
+            self._spill([turn])
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        with self._queue.mutex:
+            oldest = self._queue.queue[0].enqueued_at if self._queue.queue else None
+        stats["queue_depth"] = self._queue.qsize()
+        stats["oldest_pending_seconds"] = round(time.time() - oldest, 3) if oldest else 0.0
+        return stats
+
+    def flush(self, timeout: float = INGEST_FLUSH_TIMEOUT) -> None:
+        """Let the worker drain the queue, then wait for it to exit."""
+        thread = self._thread
+        if thread is None:
+            return
+        self._stopping.set()
+        thread.join(timeout)
+        if thread.is_alive():
+            logger.warning(
+                "Memory ingest flush timed out after %.1fs with %d turns pending",
+                timeout, self._queue.qsize(),
+            )
+
+    # -- internals ----------------------------------------------------------
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="memory-ingest", daemon=True)
+                self._thread.start()
+                atexit.register(self.flush)
+
+    def _count(self, key: str, n: int = 1) -> None:
+        with self._lock:
+            self._stats[key] += n
+
+    def _run(self) -> None:
+        while True:
+            try:
+                first = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                if self._stopping.is_set():
+                    return
+                self._replay_spill()
+                continue
+
+            batch = [first]
+            while len(batch) < INGEST_QUEUE_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            by_session: dict[str, list[_Turn]] = {}
+            for turn in batch:
+                by_session.setdefault(turn.session_id, []).append(turn)
+            for session_id, turns in by_session.items():
+                for start in range(0, len(turns), INGEST_BATCH_SIZE):
+                    self._write(session_id, turns[start:start + INGEST_BATCH_SIZE])
+
+            for _ in batch:
+                self._queue.task_done()
+
+    def _write(self, session_id: str, turns: list[_Turn]) -> None:
+        for attempt in range(INGEST_MAX_RETRIES + 1):
+            try:
+                _create_event(session_id, turns)
+            except Exception as e:
+                if not _retryable(e):
+                    logger.exception("Memory ingestion rejected for session=%s", session_id)
+                    self._count("failed", len(turns))
+                    self._dead_letter(turns)
+                    return
+                if attempt == INGEST_MAX_RETRIES:
+                    logger.exception(
+                        "Memory ingestion failed for session=%s after %d attempts",
+                        session_id, attempt + 1,
+                    )
+                    self._count("failed", len(turns))
+                    self._spill(turns)
+                    return
+                self._count("retried")
+                time.sleep(INGEST_BACKOFF * (2 ** attempt))
+                continue
+
+            lag = time.time() - turns[0].enqueued_at
+            with self._lock:
+                self._stats["delivered"] += len(turns)
+                self._stats["last_lag_seconds"] = round(lag, 3)
+                self._stats["max_lag_seconds"] = round(max(self._stats["max_lag_seconds"], lag), 3)
+            return
+
+    def _spill(self, turns: list[_Turn]) -> None:
+        self._append(INGEST_SPILL_PATH, turns, "spilled")
+
+    def _dead_letter(self, turns: list[_Turn]) -> None:
+        self._append(f"{INGEST_SPILL_PATH}.dead" if INGEST_SPILL_PATH else "", turns, "dead_lettered")
+
+    def _append(self, path: str, turns: list[_Turn], counter: str) -> None:
+        if not path:
+            self._count("dropped", len(turns))
+            return
+        try:
+            with self._lock, open(path, "a", encoding="utf-8") as f:
+                for turn in turns:
+                    f.write(json.dumps(asdict(turn)) + "\n")
+                self._stats[counter] += len(turns)
+        except OSError:
+            logger.exception("Failed to write %d turns to %s", len(turns), path)
+            self._count("dropped", len(turns))
+
+    def _replay_spill(self) -> None:
+        """Re-queue spilled turns once the worker has nothing else to do."""
+        if not INGEST_SPILL_PATH or not os.path.exists(INGEST_SPILL_PATH):
+            return
+        replay_path = f"{INGEST_SPILL_PATH}.replay"
+        try:
+            with self._lock:
+                os.replace(INGEST_SPILL_PATH, replay_path)
+            with open(replay_path, encoding="utf-8") as f:
+                turns = [_Turn(**json.loads(line)) for line in f if line.strip()]
+            os.remove(replay_path)
+        except (OSError, ValueError, TypeError):
+            logger.exception("Failed to replay spilled memory turns from %s", INGEST_SPILL_PATH)
+            return
+        expired = [turn for turn in turns if turn.replays >= INGEST_MAX_REPLAYS]
+        if expired:
+            logger.warning("Dead-lettering %d memory turns after %d replays", len(expired), INGEST_MAX_REPLAYS)
+            self._dead_letter(expired)
+        logger.info("Replaying %d spilled memory turns", len(turns) - len(expired))
+        for turn in turns:
+            if turn.replays < INGEST_MAX_REPLAYS:
+                turn.replays += 1
+                self.submit(turn)
+
+
+_ingest_worker = _IngestWorker()
+
+
+def ingest_stats() -> dict:
+    """Return ingestion queue depth, lag and delivery counters."""
+    return _ingest_worker.stats()
+
+
+def flush(timeout: float = INGEST_FLUSH_TIMEOUT) -> None:
+    """Drain pending ingestion turns (also registered to run at exit)."""
+    _ingest_worker.flush(timeout)
 
 
 def ingest(session_id: str, user_message: str, agent_response: str) -> None:
     """Ingest a single conversation turn into memory (fire-and-forget).
 
-    Silently swallows errors so the response path is never affected.
+    With MEMORY_INGEST_ASYNC (the default) the turn is handed to the
+    background worker and this returns immediately. Silently swallows errors
+    so the response path is never affected.
     """
     if not MEMORY_ID:
         return
@@ -105,15 +517,19 @@ def ingest(session_id: str, user_message: str, agent_response: str) -> None:
             else:
                 agent_response = str(agent_response)
 
-        _client().create_event(
-            memoryId=MEMORY_ID,
-            actorId=ACTOR_ID,
-            sessionId=session_id,
-            eventTimestamp=datetime.now(timezone.utc),
-            payload=[
-                {"conversational": {"role": "USER", "content": {"text": user_message}}},
-                {"conversational": {"role": "ASSISTANT", "content": {"text": agent_response}}},
-            ],
-        )
+        turn = _Turn(session_id, user_message, agent_response)
+        if INGEST_ASYNC:
+            _ingest_worker.submit(turn)
+        else:
+            _create_event(session_id, [turn])
     except Exception:
         logger.exception("Memory ingestion failed — response already sent, continuing")
+
+
+async def ingest_async(session_id: str, user_message: str, agent_response: str) -> None:
+    """Async variant of ``ingest``: queuing a turn is instant, a synchronous
+    write (MEMORY_INGEST_ASYNC=false) runs in a worker thread."""
+    if INGEST_ASYNC:
+        ingest(session_id, user_message, agent_response)
+    else:
+        await asyncio.to_thread(ingest, session_id, user_message, agent_response)
@@ -0,0 +1,75 @@
+"""Per-request choice between a fast model and a larger one for deep answers.
+
+Two tiers are configured: ``fast`` (MODEL_ID) and ``deep`` (MODEL_ID_DEEP).
+A request may name its tier in the payload ("model": "fast" | "deep");
+otherwise a few cheap local signals are scored:
+
+- keywords asking for design, comparison or a deep dive count towards ``deep``
+- short factual lookups ("what is the max …") count towards ``fast``
+- a long prompt, and a memory context to weave in, count towards ``deep``
+
+Routing is off (everything uses MODEL_ID) while MODEL_ID_DEEP is empty.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from dataclasses import dataclass
+
+MODEL_ID = os.getenv("MODEL_ID", "anthropic.claude-haiku-4-5-20251001-v1:0")
+MODEL_ID_DEEP = os.getenv("MODEL_ID_DEEP", "")
+ROUTING_DEEP_MIN_CHARS = int(os.getenv("ROUTING_DEEP_MIN_CHARS", "400"))
+ROUTING_FAST_MAX_CHARS = int(os.getenv("ROUTING_FAST_MAX_CHARS", "160"))
+
+TIERS = {"fast": MODEL_ID, "deep": MODEL_ID_DEEP or MODEL_ID}
+
+_DEEP_RE = re.compile(
+    r"\b(deep[- ]dive|in (?:depth|detail)|design|architect\w*|compare|comparison|versus|vs\.?|"
+    r"trade-?offs?|pros and cons|migrat\w*|disaster recovery|multi-(?:account|region)|"
+    r"hybrid|strategy|scenario|walk me through|step[- ]by[- ]step|explain why|"
+    r"troubleshoot\w*|best approach|most cost-effective)\b",
+    re.IGNORECASE,
+)
+_FAST_RE = re.compile(
+    r"^\s*(what(?:'s| is| are)|how (?:many|much|long)|which|is there|can i|does|define|"
+    r"max(?:imum)?|min(?:imum)?|default|limit)\b|\b(max(?:imum)?|limit|quota|default|"
+    r"how many|acronym|stand for)\b",
+    re.IGNORECASE,
+)
+
+
+@dataclass(frozen=True)
+class Route:
+    tier: str
+    model_id: str
+    reason: str
+
+
+def choose(prompt: str, memory_context: str = "", requested: str | None = None) -> Route:
+    """Pick the model tier for one request."""
+    if not MODEL_ID_DEEP:
+        return Route("fast", MODEL_ID, "routing disabled")
+    if isinstance(requested, str) and requested:  # anything else in the payload is ignored
+        tier = requested.lower()
+        if tier in TIERS:
+            return Route(tier, TIERS[tier], "payload")
+
+    score = 0
+    reasons: list[str] = []
+    deep_hits = {m.group(0).lower() for m in _DEEP_RE.finditer(prompt)}
+    if deep_hits:
+        score += 2 * len(deep_hits)
+        reasons.append("keywords=" + ",".join(sorted(deep_hits)))
+    if len(prompt) >= ROUTING_DEEP_MIN_CHARS:
+        score += 2
+        reasons.append(f"length={len(prompt)}")
+    elif len(prompt) <= ROUTING_FAST_MAX_CHARS and _FAST_RE.search(prompt):
+        score -= 2
+        reasons.append("lookup")
+    if memory_context:
+        score += 1
+        reasons.append("memory")
+
+    tier = "deep" if score >= 2 else "fast"
+    return Route(tier, TIERS[tier], " ".join([f"score={score}", *reasons]))
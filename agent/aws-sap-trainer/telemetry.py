@@ -0,0 +1,215 @@
+"""Lightweight request tracing and metrics for the invoke pipeline.
+
+Each invocation opens a request trace that collects per-stage spans (monotonic
+timings) and attributes, and is emitted as one structured JSON log line when
+it finishes. Spans, counters and histograms are also aggregated process-wide
+and exposed by ``snapshot()`` (served on ``/metrics`` by main.py).
+
+Everything is a no-op when TELEMETRY_ENABLED is false: ``span()`` returns a
+shared null context and the recording functions return immediately.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator
+
+logger = logging.getLogger(__name__)
+
+TELEMETRY_ENABLED = os.getenv("TELEMETRY_ENABLED", "false").lower() == "true"
+TELEMETRY_SAMPLES = int(os.getenv("TELEMETRY_SAMPLES", "1024"))
+
+_NOOP = nullcontext()
+
+
+class Trace:
+    """Spans and attributes of a single request."""
+
+    def __init__(self, name: str, **attrs: Any):
+        self.name = name
+        self.attrs: dict[str, Any] = dict(attrs)
+        self.spans: list[tuple[str, float]] = []
+        self.started = time.perf_counter()
+        self.duration_ms: float | None = None
+        self._lock = threading.Lock()
+
+    def add_span(self, name: str, duration_ms: float) -> None:
+        with self._lock:
+            self.spans.append((name, duration_ms))
+
+    def to_dict(self) -> dict:
+        stages: dict[str, float] = {}
+        with self._lock:
+            for name, duration_ms in self.spans:
+                stages[name] = round(stages.get(name, 0.0) + duration_ms, 2)
+        return {
+            "trace": self.name,
+            "duration_ms": round(self.duration_ms or 0.0, 2),
+            "stages_ms": stages,
+            **self.attrs,
+        }
+
+
+class _Histogram:
+    """Count/sum/min/max plus a bounded window of recent samples for percentiles."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+        self.samples: deque[float] = deque(maxlen=TELEMETRY_SAMPLES)
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        self.samples.append(value)
+
+    def summary(self) -> dict:
+        ordered = sorted(self.samples)
+
+        def pct(p: float) -> float:
+            return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))], 2)
+
+        return {
+            "count": self.count,
+            "sum": round(self.total, 2),
+            "min": round(self.min, 2),
+            "max": round(self.max, 2),
+            "p50": pct(0.50),
+            "p95": pct(0.95),
+            "p99": pct(0.99),
+        }
+
+
+_current: ContextVar[Trace | None] = ContextVar("telemetry_trace", default=None)
+_lock = threading.Lock()
+_counters: dict[str, float] = {}
+_histograms: dict[str, _Histogram] = {}
+_sinks: list[Callable[[dict], None]] = []
+
+
+def incr(name: str, value: float = 1) -> None:
+    if not TELEMETRY_ENABLED:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def observe(name: str, value: float) -> None:
+    if not TELEMETRY_ENABLED:
+        return
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = _Histogram()
+        histogram.observe(value)
+
+
+def annotate(trace: Trace | None = None, **attrs: Any) -> None:
+    """Attach attributes to ``trace`` (default: the current request trace)."""
+    trace = trace or _current.get()
+    if trace is not None:
+        trace.attrs.update(attrs)
+
+
+@contextmanager
+def _timed(name: str, trace: Trace | None) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration_ms = (time.perf_counter() - started) * 1000
+        observe(f"span.{name}.ms", duration_ms)
+        trace = trace or _current.get()
+        if trace is not None:
+            trace.add_span(name, duration_ms)
+
+
+def span(name: str, trace: Trace | None = None):
+    """Time a pipeline stage into the request trace and the ``span.<name>.ms`` histogram."""
+    if not TELEMETRY_ENABLED:
+        return _NOOP
+    return _timed(name, trace)
+
+
+def start(name: str, **attrs: Any) -> Trace | None:
+    """Open a request trace and make it current for this context."""
+    if not TELEMETRY_ENABLED:
+        return None
+    trace = Trace(name, **attrs)
+    _current.set(trace)
+    return trace
+
+
+def finish(trace: Trace | None, **attrs: Any) -> None:
+    """Close a request trace and emit it as a JSON log line (and to any sinks)."""
+    if trace is None:
+        return
+    trace.duration_ms = (time.perf_counter() - trace.started) * 1000
+    trace.attrs.update(attrs)
+    observe(f"{trace.name}.ms", trace.duration_ms)
+    incr(f"{trace.name}.count")
+    record = trace.to_dict()
+    logger.info(json.dumps(record, default=str))
+    for sink in list(_sinks):
+        try:
+            sink(record)
+        except Exception:
+            logger.exception("Telemetry sink failed")
+
+
+def add_sink(sink: Callable[[dict], None]) -> None:
+    """Receive every finished trace record (used by the benchmark harness)."""
+    _sinks.append(sink)
+
+
+def record_agent_result(result: Any, trace: Trace | None = None) -> None:
+    """Record token usage, model latency and tool calls from a Strands AgentResult."""
+    if not TELEMETRY_ENABLED or result is None:
+        return
+    metrics = getattr(result, "metrics", None)
+    if metrics is None:
+        return
+
+    usage = getattr(metrics, "accumulated_usage", None) or {}
+    for key in ("inputTokens", "outputTokens", "cacheReadInputTokens", "cacheWriteInputTokens"):
+        if key in usage:
+            observe(f"tokens.{key}", usage[key])
+
+    model_ms = (getattr(metrics, "accumulated_metrics", None) or {}).get("latencyMs", 0)
+    tool_ms = 0.0
+    tool_calls: dict[str, int] = {}
+    for name, tool_metrics in (getattr(metrics, "tool_metrics", None) or {}).items():
+        tool_calls[name] = tool_metrics.call_count
+        tool_ms += tool_metrics.total_time * 1000
+        incr(f"tool_calls.{name}", tool_metrics.call_count)
+        incr(f"tool_errors.{name}", tool_metrics.error_count)
+    observe("model.latency.ms", model_ms)
+
+    annotate(
+        trace,
+        model_latency_ms=model_ms,
+        tool_time_ms=round(tool_ms, 2),
+        tool_calls=tool_calls,
+        usage={k: v for k, v in usage.items() if isinstance(v, (int, float))},
+    )
+
+
+def snapshot() -> dict:
+    """Process-wide counters and histogram summaries."""
+    with _lock:
+        return {
+            "enabled": TELEMETRY_ENABLED,
+            "counters": dict(_counters),
+            "histograms": {name: h.summary() for name, h in _histograms.items()},
+        }
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The agent modules are flat files imported by name, as in the container
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
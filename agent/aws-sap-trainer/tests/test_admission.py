@@ -0,0 +1,152 @@
+import asyncio
+import threading
+import time
+
+from admission import Admission, Busy
+
+
+def _run_threads(admission: Admission, calls: list[tuple[str, float]]) -> tuple[list[int], list[BaseException]]:
+    """Start ``(session_id, seconds)`` calls in order; return completion order and errors."""
+    done: list[int] = []
+    errors: list[BaseException] = []
+    lock = threading.Lock()
+
+    def worker(i: int, session_id: str, seconds: float) -> None:
+        try:
+            admission.run(session_id, None, lambda: time.sleep(seconds))
+            with lock:
+                done.append(i)
+        except BaseException as e:
+            with lock:
+                errors.append(e)
+
+    threads = []
+    for i, (session_id, seconds) in enumerate(calls):
+        thread = threading.Thread(target=worker, args=(i, session_id, seconds))
+        thread.start()
+        threads.append(thread)
+        time.sleep(0.01)  # fix the arrival order
+    for thread in threads:
+        thread.join()
+    return done, errors
+
+
+def test_same_session_waiters_do_not_use_the_global_queue():
+    admission = Admission(max_concurrent=4, queue_size=1, queue_timeout=5, session_queue_size=8)
+
+    done, errors = _run_threads(admission, [("s1", 0.05)] * 6)
+
+    assert errors == []
+    assert done == list(range(6))  # arrival order
+    assert admission.stats()["rejected"] == 0
+
+
+def test_same_session_waiters_async():
+    admission = Admission(max_concurrent=4, queue_size=0, queue_timeout=5, session_queue_size=8)
+    order: list[int] = []
+
+    async def call(i: int):
+        await asyncio.sleep(0.02)
+        order.append(i)
+
+    async def main():
+        tasks = []
+        for i in range(6):
+            tasks.append(asyncio.create_task(admission.run_async("s1", None, lambda i=i: call(i))))
+            await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+
+    asyncio.run(main())
+    assert order == list(range(6))
+    assert admission.stats()["rejected"] == 0
+
+
+def test_session_queue_is_bounded():
+    admission = Admission(max_concurrent=4, queue_size=8, queue_timeout=5, session_queue_size=1)
+
+    done, errors = _run_threads(admission, [("s1", 0.2)] * 3)
+
+    assert sorted(done) == [0, 1]
+    assert len(errors) == 1 and isinstance(errors[0], Busy)
+
+
+def test_global_queue_rejects_when_slots_are_taken():
+    admission = Admission(max_concurrent=1, queue_size=1, queue_timeout=5)
+
+    done, errors = _run_threads(admission, [("a", 0.2), ("b", 0.01), ("c", 0.01)])
+
+    assert sorted(done) == [0, 1]
+    assert len(errors) == 1 and isinstance(errors[0], Busy)
+    stats = admission.stats()
+    assert stats["running"] == stats["queued"] == stats["session_waiting"] == 0
+
+
+def test_wait_times_out():
+    admission = Admission(max_concurrent=1, queue_size=4, queue_timeout=0.05)
+
+    done, errors = _run_threads(admission, [("a", 0.3), ("b", 0.01)])
+
+    assert done == [0]
+    assert len(errors) == 1 and isinstance(errors[0], Busy)
+
+
+def test_identical_requests_are_coalesced():
+    admission = Admission(max_concurrent=4, queue_size=4, queue_timeout=5)
+    calls = []
+    results = []
+
+    def call():
+        calls.append(1)
+        time.sleep(0.1)
+        return "answer"
+
+    threads = [
+        threading.Thread(target=lambda: results.append(admission.run("s1", ("s1", "q"), call)))
+        for _ in range(3)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["answer"] * 3
+    assert len(calls) == 1
+
+
+def test_stream_holds_the_session_until_it_ends():
+    admission = Admission(max_concurrent=4, queue_size=4, queue_timeout=5)
+
+    async def events():
+        yield 1
+        yield 2
+
+    stream = admission.run("s1", None, events)
+    assert admission.stats()["sessions"] == 1
+
+    async def drain():
+        return [event async for event in stream]
+
+    assert asyncio.run(drain()) == [1, 2]
+    assert admission.stats()["sessions"] == 0
+    assert admission.stats()["running"] == 0
+
+
+def test_sync_requests_beyond_the_thread_budget_are_rejected_at_once():
+    admission = Admission(max_concurrent=4, queue_size=4, queue_timeout=5, session_queue_size=8, max_threads=3)
+
+    done, errors = _run_threads(admission, [("s1", 0.2)] * 3 + [("s2", 0.2)])
+
+    assert sorted(done) == [0, 1, 2]
+    assert len(errors) == 1 and "hold a thread" in str(errors[0])
+    assert admission.stats()["threads"] == 0
+
+
+def test_thread_budget_does_not_apply_to_async_requests():
+    admission = Admission(max_concurrent=4, queue_size=0, queue_timeout=5, session_queue_size=8, max_threads=1)
+
+    async def main():
+        calls = [admission.run_async(f"s{i}", None, lambda: asyncio.sleep(0.02)) for i in range(4)]
+        await asyncio.gather(*calls)
+
+    asyncio.run(main())
+    assert admission.stats()["rejected"] == 0
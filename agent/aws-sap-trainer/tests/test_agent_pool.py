@@ -0,0 +1,37 @@
+import pytest
+from strands import Agent
+from strands.models.bedrock import BedrockModel
+
+from agent_pool import AgentPool
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    return AgentPool(lambda: Agent(model=BedrockModel(model_id="test"), callback_handler=None), size=2)
+
+
+def test_release_resets_private_agent_state(pool):
+    agent = pool.acquire()
+    agent.messages.append({"role": "user", "content": [{"text": "hi"}]})
+    agent._model_state["response_id"] = "previous"
+    agent._interrupt_state.context["key"] = "value"
+    agent._checkpoint_cycle_index = 3
+    pool.release(agent)
+
+    assert pool.acquire() is agent
+    assert agent.messages == []
+    assert agent._model_state == {}
+    assert agent._interrupt_state.context == {}
+    assert not agent._interrupt_state.activated
+    assert agent._checkpoint_cycle_index == 0
+
+
+def test_agent_stopped_on_an_interrupt_is_rebuilt(pool):
+    agent = pool.acquire()
+    agent._interrupt_state.activate()
+    pool.release(agent)
+
+    assert pool.stats()["idle"] == 0
+    assert pool.stats()["discarded"] == 1
+    assert pool.acquire() is not agent
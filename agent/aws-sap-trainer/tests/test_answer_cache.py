@@ -0,0 +1,67 @@
+from answer_cache import _AnswerStore
+
+
+def _store(db_path=""):
+    return _AnswerStore(ttl=60, max_bytes=1 << 20, threshold=0.9, db_path=db_path)
+
+
+def test_reworded_question_hits():
+    store = _store()
+    store.store("s", "What is the maximum object size in S3?", "5 TB")
+
+    hit = store.lookup("s", "Tell me the maximum object size for S3, please")
+
+    assert hit is not None and hit.text == "5 TB"
+
+
+def test_reversed_direction_misses():
+    store = _store()
+    store.store("s", "How do I migrate from RDS to Aurora?", "Create an Aurora read replica.")
+
+    assert store.lookup("s", "How do I migrate from Aurora to RDS?") is None
+    assert store.lookup("s", "How do I migrate from RDS to Aurora?") is not None
+
+
+def test_added_qualifier_misses():
+    store = _store()
+    store.store("s", "What is the maximum object size in S3?", "5 TB")
+
+    assert store.lookup("s", "What is the maximum object size in S3 Glacier?") is None
+
+
+def test_negation_misses():
+    store = _store()
+    store.store("s", "When to use DynamoDB global tables?", "For multi-Region writes.")
+
+    assert store.lookup("s", "When not to use DynamoDB global tables?") is None
+
+
+def test_long_near_duplicate_hits():
+    store = _store()
+    question = (
+        "Which services should a company use to migrate a large on-premises Oracle database "
+        "with minimal downtime and ongoing replication?"
+    )
+    store.store("s", question, "AWS DMS with CDC.")
+
+    hit = store.lookup("s", question.replace("minimal downtime", "minimal downtime please"))
+    assert hit is not None and hit.similarity == 1.0
+    hit = store.lookup("s", question.replace("replication", "replication enabled"))
+    assert hit is not None and 0.9 <= hit.similarity < 1.0
+
+
+def test_scopes_do_not_share_answers():
+    store = _store()
+    store.store("a", "What is the maximum object size in S3?", "5 TB")
+
+    assert store.lookup("b", "What is the maximum object size in S3?") is None
+
+
+def test_answers_survive_restart(tmp_path):
+    db_path = str(tmp_path / "answers.db")
+    _store(db_path).store("s", "How do I migrate from RDS to Aurora?", "Create an Aurora read replica.")
+
+    store = _store(db_path)
+
+    assert store.lookup("s", "How do I migrate from RDS to Aurora?").text == "Create an Aurora read replica."
+    assert store.lookup("s", "How do I migrate from Aurora to RDS?") is None
@@ -0,0 +1,36 @@
+from drive_manifest import Manifest, ManifestEntry
+
+
+def test_entries_are_restored_from_the_database(tmp_path):
+    path = str(tmp_path / "manifest.db")
+    manifest = Manifest(path)
+    manifest.put("user", "s1", ManifestEntry(file_id="f1", content_hash="h1", content_length=2, revision=1))
+    manifest.put("user", "s2", ManifestEntry(chunks=["p1", "p2"], revision=2))
+    manifest.drop("user", "s1")
+
+    restored = Manifest(path)
+    assert restored.get("user", "s1") is None
+    assert restored.get("user", "s2") == ManifestEntry(chunks=["p1", "p2"], revision=2)
+
+
+def test_least_recently_saved_entries_are_evicted_from_the_database(tmp_path):
+    path = str(tmp_path / "manifest.db")
+    manifest = Manifest(path, max_entries=2)
+    for session_id in ("s1", "s2", "s3"):
+        manifest.put("user", session_id, ManifestEntry(file_id=session_id))
+    manifest.put("user", "s2", ManifestEntry(file_id="s2", revision=1))
+    manifest.put("user", "s4", ManifestEntry(file_id="s4"))
+
+    restored = Manifest(path, max_entries=2)
+    assert [restored.get("user", s) is not None for s in ("s1", "s2", "s3", "s4")] == [False, True, False, True]
+    # s2 was saved before s4, so it is the next one evicted
+    restored.put("user", "s5", ManifestEntry(file_id="s5"))
+    assert restored.get("user", "s2") is None
+
+
+def test_unreadable_file_keeps_the_manifest_in_memory(tmp_path):
+    path = tmp_path / "manifest.db"
+    path.write_text('{"legacy": "json manifest"}')
+    manifest = Manifest(str(path))
+    manifest.put("user", "s1", ManifestEntry(file_id="f1"))
+    assert manifest.get("user", "s1") == ManifestEntry(file_id="f1")
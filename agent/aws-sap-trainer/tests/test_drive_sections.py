@@ -0,0 +1,75 @@
+from drive_sections import SectionReader, render
+
+
+def _session(sections: int, lines: int, width: int = 100) -> list[str]:
+    out = ["# Session\n", "intro\n"]
+    for n in range(1, sections + 1):
+        out.append(f"## Save {n}\n")
+        out.extend(f"{n:04d} {'x' * (width - 6)}\n" for _ in range(lines))
+    return out
+
+
+def _feed_tracking_peak(reader: SectionReader, lines: list[str]) -> int:
+    peak = 0
+    for line in lines:
+        reader.feed([line])
+        held = sum(s.body.size for s in reader.index if s.body is not None)
+        assert held == reader.kept_bytes
+        peak = max(peak, held)
+    return peak
+
+
+def test_all_sections_stay_within_budget_while_streaming():
+    reader = SectionReader(max_bytes=2000)
+
+    peak = _feed_tracking_peak(reader, _session(sections=50, lines=10))
+
+    assert peak <= 2000 + 100
+    kept, dropped = reader.kept()
+    assert [s.number for s in kept] == [49, 50]
+    assert dropped == 48
+    assert len(reader.index) == 50
+
+
+def test_wanted_sections_stay_within_budget_while_streaming():
+    reader = SectionReader(max_bytes=1500, wanted=set(range(1, 51, 2)))
+
+    peak = _feed_tracking_peak(reader, _session(sections=50, lines=10))
+
+    assert peak <= 1500 + 100
+    kept, dropped = reader.kept()
+    assert [s.number for s in kept] == [49]
+    assert dropped == 24
+
+
+def test_latest_sections_are_released_as_they_fall_out():
+    reader = SectionReader(max_bytes=1 << 20, latest=3)
+
+    peak = _feed_tracking_peak(reader, _session(sections=20, lines=10))
+
+    assert peak <= 3 * 10 * 100
+    kept, dropped = reader.kept()
+    assert [s.number for s in kept] == [18, 19, 20]
+    assert dropped == 0
+
+
+def test_single_large_section_keeps_its_tail():
+    reader = SectionReader(max_bytes=1000)
+
+    peak = _feed_tracking_peak(reader, _session(sections=1, lines=50))
+
+    assert peak <= 1000 + 100
+    text = render("Session", reader)
+    assert "bytes of this section omitted" in text
+    assert text.rstrip().endswith("x")
+
+
+def test_render_lists_the_index_when_sections_are_dropped():
+    reader = SectionReader(max_bytes=2000)
+    reader.feed(_session(sections=5, lines=10))
+
+    text = render("Session", reader)
+
+    assert "1. Save 1 (1000 bytes)" in text
+    assert "## Save 5" in text and "## Save 1\n" not in text
+    assert "3 earlier section(s) omitted" in text
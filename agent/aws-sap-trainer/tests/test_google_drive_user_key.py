@@ -0,0 +1,36 @@
+import base64
+import json
+
+import google_drive
+
+
+def _jwt(claims):
+    body = base64.urlsafe_b64encode(json.dumps(claims).encode()).rstrip(b"=").decode()
+    return f"eyJhbGciOiJSUzI1NiJ9.{body}.signature"
+
+
+def test_token_mode_keys_on_the_whole_workload_token(monkeypatch):
+    monkeypatch.setattr(google_drive, "DRIVE_USER_KEY", "token")
+    bearer = "Bearer " + _jwt({"iss": "https://idp", "sub": "alice"})
+
+    assert google_drive._user_key("wat-1", bearer) != google_drive._user_key("wat-2", bearer)
+    assert google_drive._user_key("wat-1", bearer).startswith("token:")
+
+
+def test_jwt_mode_is_stable_across_workload_tokens(monkeypatch):
+    monkeypatch.setattr(google_drive, "DRIVE_USER_KEY", "jwt")
+    alice = "Bearer " + _jwt({"iss": "https://idp", "sub": "alice"})
+    bob = "Bearer " + _jwt({"iss": "https://idp", "sub": "bob"})
+    other_idp = "Bearer " + _jwt({"iss": "https://other-idp", "sub": "alice"})
+
+    assert google_drive._user_key("wat-1", alice) == google_drive._user_key("wat-2", alice)
+    assert google_drive._user_key("wat-1", alice) != google_drive._user_key("wat-1", bob)
+    assert google_drive._user_key("wat-1", alice) != google_drive._user_key("wat-1", other_idp)
+
+
+def test_jwt_mode_falls_back_to_the_workload_token(monkeypatch):
+    monkeypatch.setattr(google_drive, "DRIVE_USER_KEY", "jwt")
+
+    assert google_drive._user_key("wat-1").startswith("token:")
+    assert google_drive._user_key("wat-1", "Bearer not-a-jwt").startswith("token:")
+    assert google_drive._user_key("wat-1", "Bearer " + _jwt({"iss": "https://idp"})).startswith("token:")
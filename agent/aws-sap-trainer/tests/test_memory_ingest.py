@@ -0,0 +1,69 @@
+import json
+
+from botocore.exceptions import ClientError, EndpointConnectionError
+
+import memory
+
+
+def _client_error(code, status):
+    return ClientError({"Error": {"Code": code}, "ResponseMetadata": {"HTTPStatusCode": status}}, "CreateEvent")
+
+
+def _worker(monkeypatch, tmp_path, errors):
+    spill = tmp_path / "spill.jsonl"
+    monkeypatch.setattr(memory, "INGEST_SPILL_PATH", str(spill))
+    monkeypatch.setattr(memory, "INGEST_BACKOFF", 0)
+    calls = []
+
+    def create_event(session_id, turns):
+        calls.append(session_id)
+        if errors:
+            raise errors.pop(0)
+
+    monkeypatch.setattr(memory, "_create_event", create_event)
+    return memory._IngestWorker(), spill, calls
+
+
+def test_retryable_errors():
+    assert memory._retryable(_client_error("ThrottlingException", 400))
+    assert memory._retryable(_client_error("InternalServerException", 500))
+    assert memory._retryable(EndpointConnectionError(endpoint_url="https://example.com"))
+    assert not memory._retryable(_client_error("ValidationException", 400))
+    assert not memory._retryable(ValueError("bad payload"))
+
+
+def test_transient_error_is_retried(monkeypatch, tmp_path):
+    worker, spill, calls = _worker(monkeypatch, tmp_path, [_client_error("ThrottlingException", 400)])
+
+    worker._write("s1", [memory._Turn("s1", "q", "a")])
+
+    assert len(calls) == 2
+    assert worker.stats()["delivered"] == 1
+    assert not spill.exists()
+
+
+def test_rejected_turn_is_dead_lettered_without_retry(monkeypatch, tmp_path):
+    worker, spill, calls = _worker(monkeypatch, tmp_path, [_client_error("ValidationException", 400)])
+
+    worker._write("s1", [memory._Turn("s1", "q", "a")])
+
+    assert len(calls) == 1
+    assert not spill.exists()
+    assert json.loads((tmp_path / "spill.jsonl.dead").read_text())["user_message"] == "q"
+    assert worker.stats()["dead_lettered"] == 1
+
+
+def test_spilled_turn_is_dead_lettered_after_max_replays(monkeypatch, tmp_path):
+    monkeypatch.setattr(memory, "INGEST_MAX_REPLAYS", 2)
+    worker, spill, _ = _worker(monkeypatch, tmp_path, [])
+    submitted = []
+    monkeypatch.setattr(worker, "submit", submitted.append)
+    fresh = memory._Turn("s1", "fresh", "a")
+    stale = memory._Turn("s1", "stale", "a", replays=2)
+    worker._spill([fresh, stale])
+
+    worker._replay_spill()
+
+    assert [(t.user_message, t.replays) for t in submitted] == [("fresh", 1)]
+    assert json.loads((tmp_path / "spill.jsonl.dead").read_text())["user_message"] == "stale"
+    assert not spill.exists()
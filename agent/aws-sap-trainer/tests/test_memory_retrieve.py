@@ -0,0 +1,43 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import memory
+
+
+def _slow_pool(monkeypatch, seconds):
+    """A one-worker pool whose lookups take ``seconds``; returns the namespaces looked up."""
+    started = []
+    lock = threading.Lock()
+
+    def lookup(query, namespace):
+        with lock:
+            started.append(namespace)
+        time.sleep(seconds)
+        return []
+
+    executor = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(memory, "MEMORY_ID", "mem-1")
+    monkeypatch.setattr(memory, "RETRIEVE_TIMEOUT", 0.05)
+    monkeypatch.setattr(memory, "_retrieve_namespace", lookup)
+    monkeypatch.setattr(memory, "_retrieve_executor", executor)
+    return executor, started
+
+
+def test_timed_out_lookups_that_never_started_are_cancelled(monkeypatch):
+    executor, started = _slow_pool(monkeypatch, 0.2)
+
+    assert memory.retrieve("q", "s1") == ""
+    executor.shutdown(wait=True)
+
+    assert len(started) == 1  # the two queued behind the first never ran
+
+
+def test_timed_out_lookups_are_cancelled_async(monkeypatch):
+    executor, started = _slow_pool(monkeypatch, 0.2)
+
+    assert asyncio.run(memory.retrieve_async("q", "s1")) == ""
+    executor.shutdown(wait=True)
+
+    assert len(started) == 1
@@ -0,0 +1,21 @@
+import pytest
+
+import routing
+
+
+@pytest.fixture(autouse=True)
+def deep_tier(monkeypatch):
+    monkeypatch.setattr(routing, "MODEL_ID_DEEP", "deep-model")
+    monkeypatch.setitem(routing.TIERS, "deep", "deep-model")
+
+
+def test_requested_tier_wins():
+    assert routing.choose("What is S3?", requested="Deep").tier == "deep"
+
+
+@pytest.mark.parametrize("requested", [42, ["deep"], {"tier": "deep"}, True, "", "huge"])
+def test_invalid_requested_tier_falls_back_to_auto_routing(requested):
+    route = routing.choose("What is S3?", requested=requested)
+
+    assert route.tier == "fast"
+    assert route.reason != "payload"
@@ -0,0 +1,263 @@
+"""Response cache for the AWS Documentation tools.
+
+Most documentation lookups made by the trainer agent repeat (the same S3 or
+Direct Connect pages, the same search phrases), so tool results are kept in an
+in-memory LRU backed by an optional SQLite store that survives restarts.
+
+Entries are fresh for DOCS_CACHE_TTL seconds. For a further
+DOCS_CACHE_STALE_TTL seconds a stale entry is still returned immediately while
+a background task refetches it (stale-while-revalidate). Concurrent misses for
+the same key share a single upstream call, which runs as its own task so a
+caller that is cancelled does not cancel it for the others. Error results are
+never cached.
+"""
+from __future__ import annotations
+
+import asyncio
+import functools
+import inspect
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable
+
+from loguru import logger
+
+DOCS_CACHE_ENABLED = os.getenv("DOCS_CACHE_ENABLED", "true").lower() == "true"
+DOCS_CACHE_TTL = float(os.getenv("DOCS_CACHE_TTL", "86400"))
+DOCS_CACHE_STALE_TTL = float(os.getenv("DOCS_CACHE_STALE_TTL", "604800"))
+DOCS_CACHE_MAX_ENTRIES = int(os.getenv("DOCS_CACHE_MAX_ENTRIES", "512"))
+DOCS_CACHE_PATH = os.getenv("DOCS_CACHE_PATH", "")
+
+
+def is_error_result(value: Any) -> bool:
+    """Detect the error payloads the upstream tools return instead of raising."""
+    if isinstance(value, str):
+        return value.startswith(("Failed to", "Error"))
+    results = getattr(value, "search_results", value)
+    if isinstance(results, list):
+        return any(getattr(r, "url", None) == "" for r in results)
+    return False
+
+
+class DetachedContext:
+    """Stand-in for the MCP request context, for upstream calls made outside a request.
+
+    Used by background revalidation (the request that triggered it may be
+    gone by then) and by the index seeding CLI; messages go to the log.
+    """
+
+    async def debug(self, message: str) -> None:
+        logger.debug(message)
+
+    async def info(self, message: str) -> None:
+        logger.info(message)
+
+    async def warning(self, message: str) -> None:
+        logger.warning(message)
+
+    async def error(self, message: str) -> None:
+        logger.error(message)
+
+
+class _SqliteStore:
+    """Pickled tool results keyed by cache key, shared across restarts."""
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS docs_cache ("
+            " key TEXT PRIMARY KEY, value BLOB NOT NULL, stored_at REAL NOT NULL)"
+        )
+
+    def get(self, key: str) -> tuple[Any, float] | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, stored_at FROM docs_cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        try:
+            return pickle.loads(row[0]), row[1]
+        except Exception:
+            logger.warning(f"Discarding unreadable cache entry {key}")
+            self.delete(key)
+            return None
+
+    def put(self, key: str, value: Any, stored_at: float) -> None:
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO docs_cache (key, value, stored_at) VALUES (?, ?, ?)",
+                (key, blob, stored_at),
+            )
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM docs_cache WHERE key = ?", (key,))
+
+    def prune(self, older_than: float) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "DELETE FROM docs_cache WHERE stored_at < ?", (older_than,)
+            ).rowcount
+
+
+class DocsCache:
+    """In-memory LRU with an optional SQLite tier and stale-while-revalidate."""
+
+    def __init__(
+        self,
+        ttl: float = DOCS_CACHE_TTL,
+        stale_ttl: float = DOCS_CACHE_STALE_TTL,
+        max_entries: int = DOCS_CACHE_MAX_ENTRIES,
+        path: str = DOCS_CACHE_PATH,
+    ):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._memory: OrderedDict[str, tuple[Any, float]] = OrderedDict()
+        self._store = _SqliteStore(path) if path else None
+        self._inflight: dict[str, asyncio.Task] = {}
+        self._stats = {"hits": 0, "stale_hits": 0, "misses": 0, "disk_hits": 0, "revalidations": 0, "errors": 0}
+        if self._store:
+            pruned = self._store.prune(time.time() - ttl - stale_ttl)
+            logger.info(f"Docs cache store at {path} ready ({pruned} expired entries pruned)")
+
+    async def get_or_fetch(
+        self,
+        key: str,
+        fetch: Callable[[], Awaitable[Any]],
+        refresh: Callable[[], Awaitable[Any]] | None = None,
+    ) -> Any:
+        """Return the cached value of ``key``, calling ``fetch`` on a miss.
+
+        ``refresh`` is used for background revalidation instead of ``fetch``,
+        which may be bound to the caller's request; it must not be.
+        """
+        entry = self._lookup(key)
+        if entry is not None:
+            value, stored_at = entry
+            age = time.time() - stored_at
+            if age <= self.ttl:
+                self._stats["hits"] += 1
+                return value
+            if age <= self.ttl + self.stale_ttl:
+                self._stats["stale_hits"] += 1
+                self._revalidate(key, refresh or fetch)
+                return value
+
+        self._stats["misses"] += 1
+        return await asyncio.shield(self._fetch_shared(key, fetch))
+
+    def stats(self) -> dict:
+        lookups = self._stats["hits"] + self._stats["stale_hits"] + self._stats["misses"]
+        served = self._stats["hits"] + self._stats["stale_hits"]
+        return {
+            **self._stats,
+            "hit_rate": round(served / lookups, 3) if lookups else 0.0,
+            "entries": len(self._memory),
+            "persistent": self._store is not None,
+        }
+
+    # -- internals ----------------------------------------------------------
+
+    def _lookup(self, key: str) -> tuple[Any, float] | None:
+        entry = self._memory.get(key)
+        if entry is not None:
+            self._memory.move_to_end(key)
+            return entry
+        if self._store is None:
+            return None
+        entry = self._store.get(key)
+        if entry is not None:
+            self._stats["disk_hits"] += 1
+            self._remember(key, *entry)
+        return entry
+
+    def _remember(self, key: str, value: Any, stored_at: float) -> None:
+        self._memory[key] = (value, stored_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _store_result(self, key: str, value: Any) -> None:
+        if is_error_result(value):
+            self._stats["errors"] += 1
+            return
+        stored_at = time.time()
+        self._remember(key, value, stored_at)
+        if self._store is not None:
+            try:
+                self._store.put(key, value, stored_at)
+            except Exception as e:
+                logger.warning(f"Failed to persist cache entry {key}: {e}")
+
+    def _fetch_shared(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        """Task running ``fetch`` once for concurrent callers asking for the same key."""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.get_running_loop().create_task(self._fetch(key, fetch))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._fetched(key, done))
+        return task
+
+    async def _fetch(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        value = await fetch()
+        self._store_result(key, value)
+        return value
+
+    def _fetched(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Mark retrieved so a fetch every caller gave up on doesn't log a warning
+            task.exception()
+
+    def _revalidate(self, key: str, refresh: Callable[[], Awaitable[Any]]) -> None:
+        if key in self._inflight:
+            return
+        self._fetch_shared(key, refresh).add_done_callback(lambda done: self._revalidated(key, done))
+
+    def _revalidated(self, key: str, task: asyncio.Task) -> None:
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            logger.warning(f"Background revalidation of {key} failed: {task.exception()}")
+            return
+        self._stats["revalidations"] += 1
+
+
+def cached_tool(cache: DocsCache, fn):
+    """Wrap an upstream tool so results are served from ``cache``.
+
+    functools.wraps keeps the upstream signature and annotations visible to
+    FastMCP, so the generated tool schema is unchanged. The MCP context is
+    excluded from the cache key, and background revalidation runs with a
+    DetachedContext instead of it, since the request may be over by then.
+    """
+    signature = inspect.signature(fn)
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        bound = signature.bind(*args, **kwargs)
+        key_args = {name: value for name, value in bound.arguments.items() if name != "ctx"}
+        key = f"{fn.__name__}:{json.dumps(key_args, sort_keys=True, default=str)}"
+        # By keyword: the signature is the upstream one (functools.wraps), while
+        # wrappers in between may only take ``(ctx, url, **kwargs)``
+        detached = dict(bound.arguments)
+        if "ctx" in detached:
+            detached["ctx"] = DetachedContext()
+        return await cache.get_or_fetch(
+            key,
+            lambda: fn(*args, **kwargs),
+            refresh=lambda: fn(**detached),
+        )
+
+    return wrapper
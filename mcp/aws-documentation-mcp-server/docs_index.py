@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""Local full-text index of AWS documentation pages (SQLite FTS5 / BM25).
+
+Pages returned by read_documentation are added to the index as they are read,
+and the index can be seeded at image build time from a list of URLs. When
+DOCS_LOCAL_SEARCH is enabled, search_documentation is answered from the index
+if it is confident (enough matches, strong enough top score) and falls back to
+the upstream search API otherwise.
+
+Usage:
+    # Seed the index from a file with one documentation URL per line
+    python docs_index.py seed docs-seed-urls.txt --index /app/docs-index.sqlite
+
+    # Query the index (no network needed)
+    python docs_index.py search "S3 bucket versioning" --index /app/docs-index.sqlite
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import functools
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from loguru import logger
+
+from docs_cache import DetachedContext
+
+DOCS_INDEX_PATH = os.getenv("DOCS_INDEX_PATH", "")
+DOCS_LOCAL_SEARCH = os.getenv("DOCS_LOCAL_SEARCH", "false").lower() == "true"
+DOCS_INDEX_MIN_RESULTS = int(os.getenv("DOCS_INDEX_MIN_RESULTS", "3"))
+# BM25 scores grow with corpus size, so the score floor is off by default and
+# should be tuned against a seeded index with `docs_index.py search`.
+DOCS_INDEX_MIN_SCORE = float(os.getenv("DOCS_INDEX_MIN_SCORE", "0"))
+
+# Header / pagination markers added by the upstream read_documentation tool
+_HEADER_RE = re.compile(r"^AWS Documentation from \S+:\s*", re.MULTILINE)
+_MARKER_RE = re.compile(r"<e>.*?</e>", re.DOTALL)
+_NEXT_START_RE = re.compile(r"start_index=(\d+)")
+_TITLE_RE = re.compile(r"^#+\s+(.+)$", re.MULTILINE)
+_TOKEN_RE = re.compile(r"[A-Za-z0-9]+")
+
+
+class DocsIndex:
+    """FTS5 index of documentation chunks, one row per (url, start_index)."""
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS docs USING fts5("
+            " url UNINDEXED, start_index UNINDEXED, title, content,"
+            " tokenize='porter unicode61')"
+        )
+
+    def add(self, url: str, page: str, start_index: int = 0) -> bool:
+        """Index one read_documentation result. Returns False if it had no content."""
+        content = _MARKER_RE.sub("", _HEADER_RE.sub("", page, count=1)).strip()
+        if not content:
+            return False
+        title_match = _TITLE_RE.search(content)
+        title = title_match.group(1).strip() if title_match else url
+        with self._lock:
+            # Replace the chunk atomically: a failed insert must not leave it deleted
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "DELETE FROM docs WHERE url = ? AND start_index = ?", (url, start_index)
+                )
+                self._conn.execute(
+                    "INSERT INTO docs (url, start_index, title, content) VALUES (?, ?, ?, ?)",
+                    (url, start_index, title, content),
+                )
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+        return True
+
+    def search(self, phrase: str, limit: int = 10) -> list[dict]:
+        """Return up to ``limit`` pages ranked by BM25 (higher score is better).
+
+        All terms of the phrase must match. Chunks of the same page are
+        collapsed into the best-scoring one.
+        """
+        terms = _TOKEN_RE.findall(phrase.lower())
+        if not terms:
+            return []
+        query = " ".join(f'"{t}"' for t in terms)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT url, title, snippet(docs, 3, '', '', '...', 32), bm25(docs, 0, 0, 5.0, 1.0)"
+                " FROM docs WHERE docs MATCH ? ORDER BY 4 LIMIT ?",
+                (query, limit * 4),
+            ).fetchall()
+
+        results: list[dict] = []
+        seen: set[str] = set()
+        for url, title, snippet, rank in rows:
+            if url in seen:
+                continue
+            seen.add(url)
+            results.append({"url": url, "title": title, "context": snippet, "score": -rank})
+            if len(results) == limit:
+                break
+        return results
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT count(DISTINCT url) FROM docs").fetchone()[0]
+
+
+def indexing_tool(index: DocsIndex, fn):
+    """Wrap read_documentation so every page fetched upstream is added to ``index``."""
+
+    @functools.wraps(fn)
+    async def wrapper(ctx, url, **kwargs):
+        page = await fn(ctx, url=url, **kwargs)
+        if isinstance(page, str) and not page.startswith("Failed to"):
+            try:
+                index.add(str(url), page, kwargs.get("start_index", 0))
+            except Exception as e:
+                logger.warning(f"Failed to index {url}: {e}")
+        return page
+
+    return wrapper
+
+
+def is_confident(
+    results: list[dict],
+    limit: int,
+    min_results: int | None = None,
+    min_score: float | None = None,
+) -> bool:
+    """Whether local results are good enough to skip the upstream search.
+
+    ``min_results`` and ``min_score`` default to DOCS_INDEX_MIN_RESULTS and
+    DOCS_INDEX_MIN_SCORE.
+    """
+    if not results:
+        return False
+    min_results = DOCS_INDEX_MIN_RESULTS if min_results is None else min_results
+    min_score = DOCS_INDEX_MIN_SCORE if min_score is None else min_score
+    return len(results) >= min(min_results, limit) and results[0]["score"] >= min_score
+
+
+# ---------------------------------------------------------------------------
+# CLI — seed at image build time, query locally
+# ---------------------------------------------------------------------------
+
+async def seed(index: DocsIndex, urls: list[str], max_length: int, max_pages: int) -> None:
+    from awslabs.aws_documentation_mcp_server.server_aws import read_documentation
+
+    ctx = DetachedContext()
+    for url in urls:
+        start_index = 0
+        for _ in range(max_pages):
+            started = time.monotonic()
+            try:
+                page = await read_documentation(ctx, url=url, max_length=max_length, start_index=start_index)
+            except ValueError as e:
+                logger.error(f"Skipping {url}: {e}")
+                break
+            if page.startswith("Failed to") or not index.add(url, page, start_index):
+                break
+            logger.info(f"Indexed {url} @ {start_index} in {time.monotonic() - started:.2f}s")
+            next_start = _NEXT_START_RE.search(page)
+            if not next_start:
+                break
+            start_index = int(next_start.group(1))
+
+
+def main() -> None:
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--index", default=DOCS_INDEX_PATH or "docs-index.sqlite", help="SQLite index file")
+    parser = argparse.ArgumentParser(description="Build or query the local AWS documentation index")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    seed_cmd = sub.add_parser("seed", parents=[common], help="Read documentation URLs and add them to the index")
+    seed_cmd.add_argument("urls_file", help="File with one documentation URL per line (# for comments)")
+    seed_cmd.add_argument("--max-length", type=int, default=20000, help="Characters per read_documentation call")
+    seed_cmd.add_argument("--max-pages", type=int, default=10, help="Maximum read_documentation calls per URL")
+
+    search_cmd = sub.add_parser("search", parents=[common], help="Search the index")
+    search_cmd.add_argument("phrase")
+    search_cmd.add_argument("--limit", type=int, default=10)
+    search_cmd.add_argument("--min-results", type=int, default=DOCS_INDEX_MIN_RESULTS,
+                            help="Matching pages needed for a confident answer")
+    search_cmd.add_argument("--min-score", type=float, default=DOCS_INDEX_MIN_SCORE,
+                            help="BM25 score of the top page needed for a confident answer")
+    args = parser.parse_args()
+
+    index = DocsIndex(args.index)
+    if args.command == "seed":
+        with open(args.urls_file, encoding="utf-8") as f:
+            urls = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+        asyncio.run(seed(index, urls, args.max_length, args.max_pages))
+        print(f"{index.count()} pages indexed in {args.index}")
+    else:
+        started = time.perf_counter()
+        results = index.search(args.phrase, args.limit)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        for rank, r in enumerate(results, 1):
+            print(f"{rank:2}. [{r['score']:.2f}] {r['title']}\n    {r['url']}\n    {r['context']}")
+        confident = is_confident(results, args.limit, args.min_results, args.min_score)
+        print(f"\n{len(results)} results in {elapsed_ms:.1f} ms (confident: {confident})")
+
+
+if __name__ == "__main__":
+    main()
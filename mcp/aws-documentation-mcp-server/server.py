@@ -7,7 +7,13 @@ AgentCore sample pattern: own FastMCP + @mcp.tool() decorators.
 The upstream package's FastMCP instance uses lazy handler registration that
 doesn't play well with AgentCore's tool sync. By re-registering the functions
 on our own instance, we get a clean, predictable server.
+
+Each tool is wrapped with a response cache (see docs_cache.py) keyed by the
+tool name and its arguments, so repeated lookups skip the upstream fetch.
+Optionally, pages read through read_documentation feed a local full-text
+index (see docs_index.py) that can answer search_documentation offline.
 """
+import functools
 import os
 import sys
 from loguru import logger
@@ -26,6 +32,51 @@ from awslabs.aws_documentation_mcp_server.server_aws import (  # noqa: E402
     recommend,
 )
 
+# ---------------------------------------------------------------------------
+# Response cache around the upstream tools
+# ---------------------------------------------------------------------------
+from docs_cache import DOCS_CACHE_ENABLED, DocsCache, cached_tool  # noqa: E402
+
+docs_cache = DocsCache()
+
+
+# ---------------------------------------------------------------------------
+# Local full-text index: fed by read_documentation, queried before the
+# upstream search when DOCS_LOCAL_SEARCH is enabled
+# ---------------------------------------------------------------------------
+from awslabs.aws_documentation_mcp_server.models import SearchResponse, SearchResult  # noqa: E402
+from docs_index import DOCS_INDEX_PATH, DOCS_LOCAL_SEARCH, DocsIndex, indexing_tool, is_confident  # noqa: E402
+
+docs_index = DocsIndex(DOCS_INDEX_PATH) if DOCS_INDEX_PATH else None
+
+
+def local_search_tool(fn):
+    """Wrap search_documentation to answer from the local index when confident.
+
+    Searches with product/guide filters always go upstream because the index
+    does not carry that metadata.
+    """
+
+    @functools.wraps(fn)
+    async def wrapper(ctx, search_phrase, **kwargs):
+        limit = kwargs.get("limit", 10)
+        if not kwargs.get("product_types") and not kwargs.get("guide_types"):
+            results = docs_index.search(search_phrase, limit)
+            if is_confident(results, limit):
+                logger.debug(f"Local index answered '{search_phrase}' with {len(results)} results")
+                return SearchResponse(
+                    search_results=[
+                        SearchResult(rank_order=rank, url=r["url"], title=r["title"], context=r["context"])
+                        for rank, r in enumerate(results, 1)
+                    ],
+                    facets=None,
+                    query_id="local-index",
+                )
+        return await fn(ctx, search_phrase=search_phrase, **kwargs)
+
+    return wrapper
+
+
 # ---------------------------------------------------------------------------
 # Create our own FastMCP instance (following the official AgentCore sample)
 # ---------------------------------------------------------------------------
@@ -38,13 +89,25 @@ mcp = FastMCP(
     stateless_http=True,
 )
 
+if docs_index is not None:
+    read_documentation = indexing_tool(docs_index, read_documentation)
+    if DOCS_LOCAL_SEARCH:
+        search_documentation = local_search_tool(search_documentation)
+
 # Re-register each tool on our own instance
-mcp.tool()(read_documentation)
-mcp.tool()(search_documentation)
-mcp.tool()(recommend)
+for tool_fn in (read_documentation, search_documentation, recommend):
+    mcp.tool()(cached_tool(docs_cache, tool_fn) if DOCS_CACHE_ENABLED else tool_fn)
 
 logger.info(f"Registered tools: {list(mcp._tool_manager._tools.keys())}")
 
+
+@mcp.custom_route("/cache/stats", methods=["GET"])
+async def cache_stats(request):
+    """Report docs cache hit rates (plain HTTP, outside the MCP protocol)."""
+    from starlette.responses import JSONResponse
+
+    return JSONResponse({"enabled": DOCS_CACHE_ENABLED, **docs_cache.stats()})
+
 # ---------------------------------------------------------------------------
 # Entry point
 # ---------------------------------------------------------------------------
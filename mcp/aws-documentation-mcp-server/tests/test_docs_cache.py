@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+
+from docs_cache import DocsCache
+
+
+def test_cancelled_waiter_does_not_cancel_the_shared_fetch():
+    async def scenario():
+        cache = DocsCache(ttl=60, stale_ttl=60, path="")
+        release = asyncio.Event()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await release.wait()
+            return "page"
+
+        first = asyncio.create_task(cache.get_or_fetch("k", fetch))
+        second = asyncio.create_task(cache.get_or_fetch("k", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await second == "page"
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        assert len(calls) == 1
+        assert await cache.get_or_fetch("k", fetch) == "page"
+        assert cache.stats()["hits"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_fetch_errors_reach_every_waiter_and_are_not_cached():
+    async def scenario():
+        cache = DocsCache(ttl=60, stale_ttl=60, path="")
+
+        async def fetch():
+            await asyncio.sleep(0)
+            raise RuntimeError("upstream down")
+
+        results = await asyncio.gather(
+            cache.get_or_fetch("k", fetch), cache.get_or_fetch("k", fetch), return_exceptions=True,
+        )
+        assert [type(r) for r in results] == [RuntimeError, RuntimeError]
+        assert cache.stats()["entries"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_stale_entry_is_revalidated_with_refresh_not_the_request_fetch():
+    async def scenario():
+        cache = DocsCache(ttl=0, stale_ttl=60, path="")
+        await cache.get_or_fetch("k", lambda: _value("v1"))
+        calls = []
+
+        async def fetch():
+            calls.append("fetch")
+            return "v2"
+
+        async def refresh():
+            calls.append("refresh")
+            return "v2"
+
+        assert await cache.get_or_fetch("k", fetch, refresh=refresh) == "v1"
+        await asyncio.sleep(0.01)
+
+        assert calls == ["refresh"]
+        assert cache.stats()["revalidations"] == 1
+        assert cache._memory["k"][0] == "v2"
+
+    asyncio.run(scenario())
+
+
+async def _value(value):
+    return value
+
+
+def test_revalidation_through_the_tool_chain_uses_a_detached_context(tmp_path):
+    from docs_cache import DetachedContext, cached_tool
+    from docs_index import DocsIndex, indexing_tool
+
+    calls = []
+
+    async def read_documentation(ctx, url: str, max_length: int = 5000, start_index: int = 0) -> str:
+        calls.append((ctx, url, max_length, start_index))
+        return f"AWS Documentation from {url}:\n\n# Versioning\n\nS3 bucket versioning, read {len(calls)}\n"
+
+    async def scenario():
+        cache = DocsCache(ttl=0, stale_ttl=60, path="")
+        index = DocsIndex(str(tmp_path / "index.sqlite"))
+        tool = cached_tool(cache, indexing_tool(index, read_documentation))
+        request_ctx = object()
+        url = "https://docs.aws.amazon.com/s3/versioning.html"
+
+        first = await tool(ctx=request_ctx, url=url, max_length=2000, start_index=0)
+        stale = await tool(request_ctx, url, 2000, 0)
+        await asyncio.sleep(0.01)
+
+        assert stale == first
+        assert cache.stats()["revalidations"] == 1
+        assert calls[0][0] is request_ctx
+        assert isinstance(calls[1][0], DetachedContext)
+        assert calls[1][1:] == (url, 2000, 0)
+        assert "read 2" in index.search("versioning", limit=1)[0]["context"]
+
+    asyncio.run(scenario())
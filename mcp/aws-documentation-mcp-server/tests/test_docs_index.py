@@ -0,0 +1,59 @@
+import sqlite3
+
+import pytest
+
+from docs_index import DocsIndex, is_confident
+
+PAGE = "AWS Documentation from {url}:\n\n# {title}\n\n{body}\n"
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = DocsIndex(str(tmp_path / "index.sqlite"))
+    for n, title in enumerate(["Using versioning in S3 buckets", "S3 bucket policies", "S3 Glacier"]):
+        url = f"https://docs.aws.amazon.com/s3/{n}.html"
+        index.add(url, PAGE.format(url=url, title=title, body=f"{title}. Amazon S3 bucket versioning keeps objects."))
+    return index
+
+
+def test_confident_result(index):
+    results = index.search("S3 bucket versioning", limit=10)
+
+    assert results[0]["title"] == "Using versioning in S3 buckets"
+    assert is_confident(results, limit=10, min_results=3, min_score=0)
+
+
+def test_non_confident_results(index):
+    results = index.search("S3 bucket versioning", limit=10)
+
+    assert not is_confident(results, limit=10, min_results=4, min_score=0)
+    assert not is_confident(results, limit=10, min_results=1, min_score=results[0]["score"] + 1)
+    assert not is_confident([], limit=10, min_results=0, min_score=0)
+
+
+def test_re_adding_a_chunk_replaces_it(index):
+    url = "https://docs.aws.amazon.com/s3/0.html"
+    index.add(url, PAGE.format(url=url, title="Object Lock", body="Retention periods."))
+
+    assert index.count() == 3
+    assert [r["url"] for r in index.search("retention", limit=10)] == [url]
+    assert index.search("versioning buckets using", limit=10) == []
+
+
+def test_failed_insert_keeps_the_previous_chunk(index, monkeypatch):
+    url = "https://docs.aws.amazon.com/s3/0.html"
+    conn = index._conn
+
+    class FailingInsert:
+        def execute(self, sql, *args):
+            if sql.startswith("INSERT"):
+                raise sqlite3.OperationalError("disk I/O error")
+            return conn.execute(sql, *args)
+
+    monkeypatch.setattr(index, "_conn", FailingInsert())
+    with pytest.raises(sqlite3.OperationalError):
+        index.add(url, PAGE.format(url=url, title="Object Lock", body="Retention periods."))
+    monkeypatch.undo()
+
+    assert not conn.in_transaction
+    assert [r["url"] for r in index.search("versioning buckets using", limit=10)] == [url]
@@ -0,0 +1,472 @@
+#!/usr/bin/env python3
+"""Offline load test of the agent entrypoint.
+
+Drives ``main.invoke`` in-process (or a local ``/invocations`` server) with
+local stand-ins for Bedrock, the AgentCore Memory APIs and the AWS
+Documentation MCP server, so no network or AWS credentials are needed.
+Reports latency percentiles, throughput, per-stage timings (from the agent's
+telemetry traces) and memory growth.
+
+Usage:
+    # In-process: 200 requests, 8 concurrent, one fake doc search per request
+    python test/benchmark.py run --requests 200 --concurrency 8 --tool-calls 1
+
+    # Streaming path, saving the result as the baseline for later runs
+    python test/benchmark.py run --stream --save-baseline bench-baseline.json
+
+    # Fail (exit 1) if p95 or throughput regressed more than 20% vs the baseline
+    python test/benchmark.py run --baseline bench-baseline.json --max-regression 0.2
+
+    # Same load through the async entrypoint (INVOKE_MODE=async), to compare with sync
+    python test/benchmark.py run --requests 200 --concurrency 64 --invoke-mode async
+
+    # Exact Python heap growth over the run (tracemalloc slows requests down)
+    python test/benchmark.py run --requests 500 --tracemalloc
+
+    # Serve the agent with the same fakes on :8080, then load it over HTTP
+    python test/benchmark.py serve --port 8080
+    python test/benchmark.py http --url http://localhost:8080/invocations --requests 200
+
+Install:
+    pip install -r agent/aws-sap-trainer/requirements.txt httpx
+"""
+
+import argparse
+import asyncio
+import contextlib
+import gc
+import json
+import os
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from config import latency_summary
+
+AGENT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "agent", "aws-sap-trainer")
+
+PROMPTS = [
+    "Explain the difference between S3 and EBS",
+    "When should I use AWS Transit Gateway instead of VPC peering?",
+    "Compare Direct Connect and Site-to-Site VPN for a hybrid network",
+    "How does Aurora Global Database handle cross-region failover?",
+    "What are the exam gotchas for AWS Organizations SCPs?",
+]
+
+
+# ---------------------------------------------------------------------------
+# Local stand-ins for Bedrock, AgentCore Memory and the AWS Docs MCP server
+# ---------------------------------------------------------------------------
+
+def _make_fake_model(latency_ms: float, response_words: int, tool_calls: int):
+    """Build a Strands model that streams a canned answer after ``latency_ms``.
+
+    When ``tool_calls`` is set and a ``search_documentation`` tool is
+    available, the first turns request that tool before answering, so the
+    agent's tool loop is exercised as well.
+    """
+    from strands.models import Model
+
+    answer = " ".join(["lorem"] * response_words)
+
+    class FakeBedrockModel(Model):
+        def __init__(self) -> None:
+            self.config = {"model_id": "fake-bedrock-model"}
+
+        def update_config(self, **model_config: Any) -> None:
+            self.config.update(model_config)
+
+        def get_config(self) -> Any:
+            return self.config
+
+        async def structured_output(self, output_model, prompt, system_prompt=None, **kwargs):
+            # Same latency as a turn; fields keep their defaults (no validation)
+            await asyncio.sleep(latency_ms / 1000)
+            yield {"output": output_model.model_construct()}
+
+        async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs):
+            started = time.perf_counter()
+            tool_names = {spec["name"] for spec in tool_specs or []}
+            tool_results = sum(
+                1 for m in messages for block in m.get("content", []) if "toolResult" in block
+            )
+            input_tokens = sum(len(json.dumps(m.get("content", []))) for m in messages) // 4
+
+            yield {"messageStart": {"role": "assistant"}}
+            if tool_results < tool_calls and "search_documentation" in tool_names:
+                await asyncio.sleep(latency_ms / 2000)
+                yield {"contentBlockStart": {"start": {"toolUse": {
+                    "toolUseId": f"tooluse_{uuid.uuid4().hex[:12]}", "name": "search_documentation"}}}}
+                yield {"contentBlockDelta": {"delta": {"toolUse": {
+                    "input": json.dumps({"search_phrase": "benchmark"})}}}}
+                yield {"contentBlockStop": {}}
+                stop_reason, output_tokens = "tool_use", 20
+            else:
+                chunks = max(1, response_words // 25)
+                for i in range(chunks):
+                    await asyncio.sleep(latency_ms / 1000 / chunks)
+                    words = answer.split(" ")[i * 25:(i + 1) * 25 if i < chunks - 1 else None]
+                    yield {"contentBlockDelta": {"delta": {"text": " ".join(words) + " "}}}
+                yield {"contentBlockStop": {}}
+                stop_reason, output_tokens = "end_turn", response_words
+            yield {"messageStop": {"stopReason": stop_reason}}
+            yield {"metadata": {
+                "usage": {
+                    "inputTokens": input_tokens,
+                    "outputTokens": output_tokens,
+                    "totalTokens": input_tokens + output_tokens,
+                },
+                "metrics": {"latencyMs": int((time.perf_counter() - started) * 1000)},
+            }}
+
+    return FakeBedrockModel()
+
+
+class FakeMemoryClient:
+    """Stand-in for the ``bedrock-agentcore`` data plane client used by memory.py."""
+
+    def __init__(self, latency_ms: float):
+        self.latency = latency_ms / 1000
+        self.events = 0
+        self._lock = threading.Lock()
+
+    def retrieve_memory_records(self, **kwargs: Any) -> dict:
+        time.sleep(self.latency)
+        query = kwargs.get("searchCriteria", {}).get("searchQuery", "")
+        return {"memoryRecordSummaries": [
+            {"content": {"text": f"Remembered fact {i} about {query[:40]}"}, "score": 0.9 - i / 10}
+            for i in range(3)
+        ]}
+
+    def create_event(self, **kwargs: Any) -> dict:
+        time.sleep(self.latency)
+        with self._lock:
+            self.events += 1
+        return {"event": {"eventId": uuid.uuid4().hex}}
+
+
+def _make_fake_docs_tool(latency_ms: float):
+    """A local ``search_documentation`` tool standing in for the MCP server."""
+    from strands import tool
+
+    @tool
+    def search_documentation(search_phrase: str, limit: int = 10) -> str:
+        """Search AWS documentation.
+
+        Args:
+            search_phrase: Search phrase to use.
+            limit: Maximum number of results to return.
+        """
+        time.sleep(latency_ms / 1000)
+        return json.dumps([
+            {"rank_order": i + 1, "url": f"https://docs.aws.amazon.com/bench/{i}.html",
+             "title": f"Result {i} for {search_phrase}", "context": "lorem ipsum " * 20}
+            for i in range(min(limit, 5))
+        ])
+
+    return search_documentation
+
+
+def install_fakes(args: argparse.Namespace):
+    """Import the agent with every remote dependency replaced by a local fake."""
+    os.environ.setdefault("MEMORY_ID", "bench-memory")
+    os.environ["TELEMETRY_ENABLED"] = "true"
+    os.environ["INVOKE_MODE"] = args.invoke_mode
+    sys.path.insert(0, os.path.abspath(AGENT_DIR))
+
+    import main
+    import memory
+
+    memory._clients[memory.AWS_REGION] = FakeMemoryClient(args.memory_latency)
+    fake_model = _make_fake_model(args.model_latency, args.response_words, args.tool_calls)
+    main._get_model = lambda model_id=None: fake_model
+    docs_tool = _make_fake_docs_tool(args.tool_latency)
+    main._get_aws_doc_mcp_tools = lambda: [docs_tool]
+    return main
+
+
+# ---------------------------------------------------------------------------
+# Load generators
+# ---------------------------------------------------------------------------
+
+def _payload(i: int, args: argparse.Namespace) -> dict:
+    payload = {
+        "prompt": PROMPTS[i % len(PROMPTS)],
+        "session_id": f"bench-session-{i % args.sessions}",
+    }
+    if args.stream:
+        payload["stream"] = True
+    return payload
+
+
+def _run_in_process(main, args: argparse.Namespace) -> tuple[list[dict], list[dict]]:
+    import telemetry
+
+    traces: list[dict] = []
+    telemetry.add_sink(traces.append)
+
+    async def _drain(stream) -> float | None:
+        first = None
+        async for event in stream:
+            if first is None and event.get("type") == "text":
+                first = time.perf_counter()
+        return first
+
+    def one(i: int) -> dict:
+        started = time.perf_counter()
+        try:
+            result = main.invoke(_payload(i, args))
+            if getattr(result, "status_code", 200) >= 400:  # e.g. 429 from admission control
+                return {"ok": False, "error": f"HTTP {result.status_code}", "ms": (time.perf_counter() - started) * 1000}
+            first = asyncio.run(_drain(result)) if args.stream else None
+        except Exception as e:
+            return {"ok": False, "error": type(e).__name__, "ms": (time.perf_counter() - started) * 1000}
+        sample = {"ok": True, "ms": (time.perf_counter() - started) * 1000}
+        if first is not None:
+            sample["ttft_ms"] = (first - started) * 1000
+        return sample
+
+    async def one_async(i: int) -> dict:
+        started = time.perf_counter()
+        try:
+            result = await main.invoke_async(_payload(i, args))
+            if getattr(result, "status_code", 200) >= 400:  # e.g. 429 from admission control
+                return {"ok": False, "error": f"HTTP {result.status_code}", "ms": (time.perf_counter() - started) * 1000}
+            first = await _drain(result) if args.stream else None
+        except Exception as e:
+            return {"ok": False, "error": type(e).__name__, "ms": (time.perf_counter() - started) * 1000}
+        sample = {"ok": True, "ms": (time.perf_counter() - started) * 1000}
+        if first is not None:
+            sample["ttft_ms"] = (first - started) * 1000
+        return sample
+
+    if args.invoke_mode == "async":
+        return asyncio.run(_load_async(one_async, args)), traces
+    return _load(one, args), traces
+
+
+def _run_http(args: argparse.Namespace) -> list[dict]:
+    import httpx
+
+    client = httpx.Client(
+        timeout=args.timeout,
+        limits=httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency),
+    )
+
+    def one(i: int) -> dict:
+        started = time.perf_counter()
+        first = None
+        try:
+            with client.stream("POST", args.url, json=_payload(i, args)) as response:
+                for line in response.iter_lines():
+                    if first is None and line.startswith("data: ") and '"text"' in line:
+                        first = time.perf_counter()
+                ok = response.status_code == 200
+        except httpx.HTTPError as e:
+            return {"ok": False, "error": type(e).__name__, "ms": (time.perf_counter() - started) * 1000}
+        sample = {"ok": ok, "ms": (time.perf_counter() - started) * 1000}
+        if not ok:
+            sample["error"] = f"HTTP {response.status_code}"
+        if first is not None:
+            sample["ttft_ms"] = (first - started) * 1000
+        return sample
+
+    try:
+        return _load(one, args)
+    finally:
+        client.close()
+
+
+def _load(one, args: argparse.Namespace) -> list[dict]:
+    """Warm up, then run ``args.requests`` calls of ``one`` at ``args.concurrency``."""
+    for i in range(args.warmup):
+        one(i)
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        return list(pool.map(one, range(args.warmup, args.warmup + args.requests)))
+
+
+async def _load_async(one, args: argparse.Namespace) -> list[dict]:
+    """Like ``_load``, with ``one`` run as tasks on a single event loop."""
+    for i in range(args.warmup):
+        await one(i)
+    slots = asyncio.Semaphore(args.concurrency)
+
+    async def bounded(i: int) -> dict:
+        async with slots:
+            return await one(i)
+
+    return list(await asyncio.gather(*(bounded(i) for i in range(args.warmup, args.warmup + args.requests))))
+
+
+# ---------------------------------------------------------------------------
+# Reporting
+# ---------------------------------------------------------------------------
+
+def _report(samples: list[dict], traces: list[dict], wall_s: float, memory_stats: dict, args) -> dict:
+    ok = [s for s in samples if s["ok"]]
+    errors: dict[str, int] = {}
+    for s in samples:
+        if not s["ok"]:
+            errors[s["error"]] = errors.get(s["error"], 0) + 1
+
+    stages: dict[str, list[float]] = {}
+    for trace in traces[-len(samples):] if samples else []:
+        for stage, ms in trace.get("stages_ms", {}).items():
+            stages.setdefault(stage, []).append(ms)
+        # Split of the agent loop reported by the Strands metrics
+        for stage, key in (("agent.invoke/model", "model_latency_ms"), ("agent.invoke/tools", "tool_time_ms")):
+            if key in trace:
+                stages.setdefault(stage, []).append(trace[key])
+
+    report = {
+        "mode": args.command,
+        "invoke_mode": getattr(args, "invoke_mode", None),
+        "requests": len(samples),
+        "concurrency": args.concurrency,
+        "stream": args.stream,
+        "errors": errors,
+        "wall_s": round(wall_s, 2),
+        "throughput_rps": round(len(ok) / wall_s, 2) if wall_s else 0.0,
+        "latency_ms": latency_summary([s["ms"] for s in ok]),
+        "stages_ms": {stage: latency_summary(values) for stage, values in sorted(stages.items())},
+        "memory": memory_stats,
+    }
+    ttft = [s["ttft_ms"] for s in ok if "ttft_ms" in s]
+    if ttft:
+        report["ttft_ms"] = latency_summary(ttft)
+    return report
+
+
+def _print_report(report: dict) -> None:
+    mode = f"{report['mode']}/{report['invoke_mode']}" if report.get("invoke_mode") else report["mode"]
+    print(f"\n{report['requests']} requests ({mode}, concurrency {report['concurrency']}, "
+          f"stream {report['stream']}) in {report['wall_s']} s — {report['throughput_rps']} req/s")
+    if report["errors"]:
+        print(f"Errors: {report['errors']}")
+    print(f"\n{'':24} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}")
+    rows = [("latency", report["latency_ms"])]
+    if "ttft_ms" in report:
+        rows.append(("time to first text", report["ttft_ms"]))
+    rows += [(f"  {stage}", summary) for stage, summary in report["stages_ms"].items()]
+    for label, s in rows:
+        print(f"{label:24} {s['p50']:>9.1f} {s['p95']:>9.1f} {s['p99']:>9.1f} {s['max']:>9.1f}")
+    if report["memory"]:
+        print("\nMemory: " + ", ".join(f"{k} {v}" for k, v in report["memory"].items()))
+
+
+def _check_regression(report: dict, baseline_path: str, max_regression: float) -> list[str]:
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    failures = []
+    base_p95, p95 = baseline["latency_ms"]["p95"], report["latency_ms"]["p95"]
+    if base_p95 and p95 > base_p95 * (1 + max_regression):
+        failures.append(f"p95 latency {p95} ms vs baseline {base_p95} ms")
+    base_rps, rps = baseline["throughput_rps"], report["throughput_rps"]
+    if base_rps and rps < base_rps * (1 - max_regression):
+        failures.append(f"throughput {rps} req/s vs baseline {base_rps} req/s")
+    # Floors (KiB) keep allocator and import-time noise of short runs from failing the check
+    for key, floor in (("growth_kb", 1024), ("max_rss_growth_kb", 8192)):
+        base_growth = baseline.get("memory", {}).get(key)
+        growth = report["memory"].get(key)
+        if base_growth is not None and growth is not None and growth > max(base_growth, floor) * (1 + max_regression):
+            failures.append(f"memory {key} {growth} KiB vs baseline {base_growth} KiB")
+    return failures
+
+
+# ---------------------------------------------------------------------------
+# Entry point
+# ---------------------------------------------------------------------------
+
+def main() -> None:
+    fakes = argparse.ArgumentParser(add_help=False)
+    fakes.add_argument("--model-latency", type=float, default=200, help="Fake Bedrock latency per model call in ms (default: 200)")
+    fakes.add_argument("--memory-latency", type=float, default=30, help="Fake AgentCore Memory API latency in ms (default: 30)")
+    fakes.add_argument("--tool-latency", type=float, default=50, help="Fake search_documentation latency in ms (default: 50)")
+    fakes.add_argument("--tool-calls", type=int, default=0, help="Doc searches the fake model requests per invocation (default: 0)")
+    fakes.add_argument("--response-words", type=int, default=300, help="Words in the fake model's answer (default: 300)")
+    fakes.add_argument("--invoke-mode", choices=["sync", "async"], default="sync",
+                       help="Entrypoint to drive: invoke or invoke_async (sets INVOKE_MODE; default: sync)")
+
+    load = argparse.ArgumentParser(add_help=False)
+    load.add_argument("--requests", type=int, default=100, help="Measured requests (default: 100)")
+    load.add_argument("--concurrency", type=int, default=4, help="Requests in flight (default: 4)")
+    load.add_argument("--warmup", type=int, default=5, help="Unmeasured requests sent first (default: 5)")
+    load.add_argument("--sessions", type=int, default=10, help="Distinct session IDs to rotate through (default: 10)")
+    load.add_argument("--stream", action="store_true", help="Request streamed (server-sent event) responses")
+    load.add_argument("--json", action="store_true", help="Print the report as JSON")
+    load.add_argument("--save-baseline", default=None, help="Write the report to this file")
+    load.add_argument("--baseline", default=None, help="Compare against a report saved with --save-baseline")
+    load.add_argument("--max-regression", type=float, default=0.2, help="Allowed p95/throughput/memory regression (default: 0.2)")
+
+    parser = argparse.ArgumentParser(description="Offline benchmark of the agent entrypoint")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run_cmd = sub.add_parser("run", parents=[fakes, load], help="Call main.invoke in-process")
+    run_cmd.add_argument("--tracemalloc", action="store_true",
+                         help="Trace Python allocations for exact heap growth (slows every request)")
+    http_cmd = sub.add_parser("http", parents=[load], help="POST to a running /invocations endpoint")
+    http_cmd.add_argument("--url", default="http://localhost:8080/invocations", help="Invocation URL")
+    http_cmd.add_argument("--timeout", type=float, default=120, help="Per-request timeout in seconds (default: 120)")
+    http_cmd.set_defaults(tracemalloc=False)
+    serve_cmd = sub.add_parser("serve", parents=[fakes], help="Serve the agent with the fakes installed")
+    serve_cmd.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        install_fakes(args).app.run(port=args.port)
+        return
+
+    agent = install_fakes(args) if args.command == "run" else None
+    gc.collect()
+    if args.tracemalloc:
+        tracemalloc.start()
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    started = time.perf_counter()
+    if agent is not None:
+        # Keep the agent's console callback output out of the report
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            samples, traces = _run_in_process(agent, args)
+    else:
+        samples, traces = _run_http(args), []
+    wall_s = time.perf_counter() - started
+
+    # Memory growth is only meaningful for the in-process agent
+    memory_stats: dict = {}
+    if agent is not None:
+        gc.collect()
+        memory_stats["max_rss_growth_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before
+        if args.tracemalloc:
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            memory_stats.update(
+                growth_kb=round(current / 1024, 1),
+                peak_kb=round(peak / 1024, 1),
+                growth_per_request_b=round(current / max(1, len(samples))),
+            )
+
+    report = _report(samples, traces, wall_s, memory_stats, args)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        _print_report(report)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nBaseline written to {args.save_baseline}")
+
+    if args.baseline:
+        failures = _check_regression(report, args.baseline, args.max_regression)
+        if failures:
+            print("\nREGRESSION: " + "; ".join(failures))
+            sys.exit(1)
+        print(f"\nNo regression vs {args.baseline} (threshold {args.max_regression:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@ so individual scripts stay DRY.
 """
 
 import argparse
+import math
 import boto3
 
 # ---------------------------------------------------------------------------
@@ -25,3 +26,24 @@ def add_aws_args(parser: argparse.ArgumentParser) -> None:
 def boto_session(args: argparse.Namespace) -> boto3.Session:
     """Create a boto3 Session from parsed CLI args."""
     return boto3.Session(profile_name=args.profile, region_name=args.region)
+
+
+def percentile(values: list[float], p: float) -> float:
+    """Nearest-rank percentile (``p`` in 0-100) of ``values``; 0.0 when empty."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(p / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def latency_summary(values: list[float]) -> dict:
+    """Count, mean and p50/p95/p99/max of a list of latencies (milliseconds)."""
+    return {
+        "count": len(values),
+        "mean": round(sum(values) / len(values), 2) if values else 0.0,
+        "p50": round(percentile(values, 50), 2),
+        "p95": round(percentile(values, 95), 2),
+        "p99": round(percentile(values, 99), 2),
+        "max": round(max(values), 2) if values else 0.0,
+    }
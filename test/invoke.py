@@ -4,73 +4,336 @@
 Usage:
     python test/invoke.py --runtime-arn <RUNTIME_ARN> --prompt "What is Amazon Bedrock?"
     python test/invoke.py --runtime-arn <RUNTIME_ARN> --prompt "Tell me a joke" --session-id my-session
+    python test/invoke.py --runtime-arn <RUNTIME_ARN> --prompt "Explain AWS Transit Gateway" --stream
+
+    # Local container (make run) instead of the runtime
+    python test/invoke.py --url http://localhost:8080/invocations --prompt "Hello"
+
+    # Batch: one JSON payload per line, 8 in flight, turns of a session in order
+    python test/invoke.py --runtime-arn <RUNTIME_ARN> --batch prompts.jsonl --concurrency 8 --output run-a.jsonl
+
+    # Replay a recorded run against another endpoint and compare latencies
+    python test/invoke.py --url http://localhost:8080/invocations --replay run-a.jsonl --output run-b.jsonl
 
 Install:
-    pip install boto3
+    pip install boto3 httpx
 """
 
 import argparse
+import contextlib
 import json
+import sys
+import threading
+import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Iterator
+
+from config import add_aws_args, boto_session, latency_summary
+
+# AgentCore Runtime rejects runtime session IDs shorter than this
+RUNTIME_SESSION_ID_MIN_LENGTH = 33
+
+
+class RuntimeTarget:
+    """Sends payloads with ``invoke_agent_runtime`` over one shared, pooled client."""
+
+    def __init__(self, args: argparse.Namespace, pool_size: int = 10):
+        from botocore.config import Config
+
+        # No retries, so a throttled request shows up as such instead of as a slow one
+        config = Config(
+            max_pool_connections=max(10, pool_size),
+            read_timeout=args.timeout,
+            retries={"max_attempts": 1, "mode": "standard"},
+        )
+        self.client = boto_session(args).client("bedrock-agentcore", config=config)
+        self.runtime_arn = args.runtime_arn
+        self.endpoint_name = args.endpoint_name
+        self.user_id = args.user_id
+
+    @contextlib.contextmanager
+    def post(self, payload: dict, session_id: str) -> Iterator[tuple[int, str, Iterator[bytes]]]:
+        """Yield the status code, content type and body lines of one invocation."""
+        from botocore.exceptions import ClientError
+
+        kwargs = dict(
+            agentRuntimeArn=self.runtime_arn,
+            runtimeSessionId=runtime_session_id(session_id),
+            payload=json.dumps(payload).encode(),
+            qualifier=self.endpoint_name,
+        )
+        if self.user_id:
+            kwargs["runtimeUserId"] = self.user_id
+        try:
+            response = self.client.invoke_agent_runtime(**kwargs)
+        except ClientError as e:
+            status = e.response.get("ResponseMetadata", {}).get("HTTPStatusCode", 500)
+            yield status, "application/json", iter([json.dumps({"error": str(e)}).encode()])
+            return
+        yield response.get("statusCode", 200), response.get("contentType", ""), response["response"].iter_lines(chunk_size=10)
+
+    def close(self) -> None:
+        self.client.close()
+
+
+class LocalTarget:
+    """POSTs payloads to an ``/invocations`` URL (e.g. the container started with ``make run``)."""
+
+    def __init__(self, args: argparse.Namespace, pool_size: int = 10):
+        import httpx
+
+        self.url = args.url
+        self.client = httpx.Client(
+            timeout=args.timeout,
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+        )
+
+    @contextlib.contextmanager
+    def post(self, payload: dict, session_id: str) -> Iterator[tuple[int, str, Iterator[bytes]]]:
+        headers = {"X-Amzn-Bedrock-AgentCore-Runtime-Session-Id": runtime_session_id(session_id)}
+        with self.client.stream("POST", self.url, json=payload, headers=headers) as response:
+            lines = (line.encode("utf-8") for line in response.iter_lines())
+            yield response.status_code, response.headers.get("content-type", ""), lines
+
+    def close(self) -> None:
+        self.client.close()
+
+
+def runtime_session_id(session_id: str) -> str:
+    """Pad short session IDs deterministically, so every turn of a session reaches the same runtime session."""
+    if len(session_id) >= RUNTIME_SESSION_ID_MIN_LENGTH:
+        return session_id
+    return f"{session_id}-{uuid.uuid5(uuid.NAMESPACE_URL, session_id).hex}"
+
 
-from config import add_aws_args, boto_session
-
-
-def invoke(
-    runtime_arn: str,
-    endpoint_name: str,
-    prompt: str,
-    session_id: str,
-    region: str,
-    profile: str | None,
-    user_id: str | None = None,
-) -> None:
-    session = boto_session(argparse.Namespace(profile=profile, region=region))
-    client = session.client("bedrock-agentcore")
-
-    payload = json.dumps({"prompt": prompt}).encode()
-
-    kwargs = dict(
-        agentRuntimeArn=runtime_arn,
-        runtimeSessionId=session_id,
-        payload=payload,
-        qualifier=endpoint_name,
-    )
-    if user_id:
-        kwargs["runtimeUserId"] = user_id
-
-    response = client.invoke_agent_runtime(**kwargs)
-
-    content_type = response.get("contentType", "")
-
-    if "text/event-stream" in content_type:
-        for line in response["response"].iter_lines(chunk_size=10):
-            if line:
-                line = line.decode("utf-8")
-                if line.startswith("data: "):
-                    print(line[6:])
-    elif content_type == "application/json":
-        raw = b"".join(response.get("response", []))
-        print(json.dumps(json.loads(raw.decode("utf-8")), indent=2, ensure_ascii=False))
+def invoke(target, prompt: str, session_id: str, stream: bool = False) -> None:
+    body = {"prompt": prompt}
+    if stream:
+        body["stream"] = True
+
+    with target.post(body, session_id) as (status, content_type, lines):
+        if "text/event-stream" in content_type:
+            for line in lines:
+                if line:
+                    line = line.decode("utf-8")
+                    if line.startswith("data: "):
+                        print_event(line[6:])
+            print()
+        elif content_type.startswith("application/json"):
+            raw = b"\n".join(lines)
+            print(json.dumps(json.loads(raw.decode("utf-8")), indent=2, ensure_ascii=False))
+        else:
+            raw = b"\n".join(lines)
+            print(raw.decode("utf-8"))
+
+
+def print_event(data: str) -> None:
+    """Print one server-sent event, writing text deltas inline."""
+    try:
+        event = json.loads(data)
+    except json.JSONDecodeError:
+        print(data)
+        return
+    if isinstance(event, dict) and event.get("type") == "text":
+        print(event.get("data", ""), end="", flush=True)
+    elif isinstance(event, dict) and event.get("type") == "tool_use":
+        print(f"\n[tool: {event.get('name')}]", flush=True)
+    elif isinstance(event, dict) and event.get("type") == "done":
+        return
     else:
-        raw = b"".join(response.get("response", []))
-        print(raw.decode("utf-8"))
+        print(data)
+
+
+# ---------------------------------------------------------------------------
+# Batch and replay
+# ---------------------------------------------------------------------------
+
+def read_requests(path: str, stream: bool = False, replay: bool = False) -> list[dict]:
+    """Load the requests of a batch file or, with ``replay``, of a recorded run.
+
+    A batch line is the invocation payload itself (``prompt``, ``session_id``,
+    ``stream``, ``model``, …) plus an optional ``id``. Lines without
+    ``session_id`` each get a session of their own.
+
+    A recorded run is the ``--output`` of an earlier batch: each line carries
+    the payload under ``request`` and its latency under ``ms``, kept as the
+    baseline. Requests are put back in their original order, and every
+    session is given a fresh ID (same for all its turns), so the replay
+    starts from an empty history just like the recording did.
+    """
+    requests = []
+    run_tag = uuid.uuid4().hex[:8]
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if replay:
+                payload = dict(record["request"])
+                payload["session_id"] = f"{payload['session_id']}-replay-{run_tag}"
+                request = {"id": record.get("id"), "index": record.get("index", len(requests)),
+                           "payload": payload, "baseline_ms": record.get("ms") if record.get("ok") else None}
+            else:
+                payload = dict(record)
+                request = {"id": payload.pop("id", len(requests)), "index": len(requests),
+                           "payload": payload, "baseline_ms": None}
+                payload.setdefault("session_id", f"batch-{uuid.uuid4()}")
+            if stream:
+                payload.setdefault("stream", True)
+            requests.append(request)
+    return sorted(requests, key=lambda r: r["index"])
+
+
+def send(target, request: dict) -> dict:
+    """Send one request and return its output record (timings, status and answer)."""
+    payload = request["payload"]
+    record = {
+        "id": request["id"],
+        "index": request["index"],
+        "session_id": payload["session_id"],
+        "request": payload,
+        "started_at": datetime.now(timezone.utc).isoformat(),
+    }
+    started = time.perf_counter()
+    first = None
+    text: list[str] = []
+    body: dict = {}
+    try:
+        with target.post(payload, payload["session_id"]) as (status, content_type, lines):
+            if "text/event-stream" in content_type:
+                for line in lines:
+                    if not line.startswith(b"data: "):
+                        continue
+                    event = json.loads(line[6:])
+                    if event.get("type") == "text":
+                        first = first or time.perf_counter()
+                        text.append(event.get("data", ""))
+                    elif event.get("type") == "done":
+                        body = {k: v for k, v in event.items() if k != "type"}
+            else:
+                raw = b"\n".join(lines).decode("utf-8")
+                try:
+                    body = json.loads(raw)
+                except json.JSONDecodeError:
+                    body = {"result": raw}
+                if isinstance(body, dict):
+                    text.append(str(body.pop("result", "")))
+                else:
+                    body = {"result": body}
+    except Exception as e:
+        record.update(ok=False, status=None, error=f"{type(e).__name__}: {e}",
+                      ms=round((time.perf_counter() - started) * 1000, 2))
+        return record
+
+    record.update(ok=status == 200, status=status, ms=round((time.perf_counter() - started) * 1000, 2))
+    if first is not None:
+        record["ttft_ms"] = round((first - started) * 1000, 2)
+    if status != 200:
+        record["error"] = body.get("error") or body.get("message") or f"HTTP {status}"
+    record["result"] = "".join(text)
+    record.update({k: v for k, v in body.items() if k in ("usage", "cached")})
+    if request["baseline_ms"] is not None:
+        record["baseline_ms"] = request["baseline_ms"]
+    return record
+
+
+def run_batch(target, requests: list[dict], concurrency: int, out) -> list[dict]:
+    """Send ``requests`` with ``concurrency`` sessions in flight, each session's turns in file order.
+
+    Records are written to ``out`` as JSON lines as soon as they complete.
+    """
+    sessions: dict[str, list[dict]] = {}
+    for request in requests:
+        sessions.setdefault(request["payload"]["session_id"], []).append(request)
+
+    records: list[dict] = []
+    lock = threading.Lock()
+
+    def run_session(turns: list[dict]) -> None:
+        for request in turns:
+            record = send(target, request)
+            with lock:
+                records.append(record)
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                out.flush()
+                print(f"[{len(records)}/{len(requests)}] {record['session_id']} {record['status'] or record.get('error')} "
+                      f"{record['ms']:.0f} ms", file=sys.stderr)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(run_session, sessions.values()))
+    return sorted(records, key=lambda r: r["index"])
+
+
+def print_summary(records: list[dict], wall_s: float) -> None:
+    ok = [r for r in records if r["ok"]]
+    errors: dict[str, int] = {}
+    for r in records:
+        if not r["ok"]:
+            key = f"HTTP {r['status']}" if r["status"] else r["error"]
+            errors[key] = errors.get(key, 0) + 1
+
+    print(f"\n{len(records)} requests, {len(ok)} ok in {wall_s:.2f} s — {len(ok) / wall_s if wall_s else 0:.2f} req/s",
+          file=sys.stderr)
+    if errors:
+        print(f"Errors: {errors}", file=sys.stderr)
+
+    rows = [("latency", latency_summary([r["ms"] for r in ok]))]
+    ttft = [r["ttft_ms"] for r in ok if "ttft_ms" in r]
+    if ttft:
+        rows.append(("time to first text", latency_summary(ttft)))
+    replayed = [r for r in ok if r.get("baseline_ms") is not None]
+    if replayed:
+        rows.append(("baseline latency", latency_summary([r["baseline_ms"] for r in replayed])))
+        rows.append(("delta (this - baseline)", latency_summary([r["ms"] - r["baseline_ms"] for r in replayed])))
+    print(f"\n{'':24} {'mean':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}", file=sys.stderr)
+    for label, s in rows:
+        print(f"{label:24} {s['mean']:>9.1f} {s['p50']:>9.1f} {s['p95']:>9.1f} {s['p99']:>9.1f} {s['max']:>9.1f}",
+              file=sys.stderr)
+    if replayed:
+        faster = sum(r["ms"] < r["baseline_ms"] for r in replayed)
+        print(f"\n{faster}/{len(replayed)} replayed requests faster than the recording", file=sys.stderr)
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Invoke an AgentCore Runtime endpoint")
     add_aws_args(parser)
-    parser.add_argument("--runtime-arn", required=True, help="AgentCore Runtime ARN")
+    target_group = parser.add_mutually_exclusive_group(required=True)
+    target_group.add_argument("--runtime-arn", help="AgentCore Runtime ARN")
+    target_group.add_argument("--url", help="Invocation URL of a local container, e.g. http://localhost:8080/invocations")
     parser.add_argument("--endpoint-name", required=False, default="DEFAULT", help="AgentCore Runtime endpoint name (default: DEFAULT)")
-    parser.add_argument("--prompt", required=True, help="Prompt to send to the agent")
+    input_group = parser.add_mutually_exclusive_group(required=True)
+    input_group.add_argument("--prompt", help="Prompt to send to the agent")
+    input_group.add_argument("--batch", help="JSONL file with one invocation payload per line")
+    input_group.add_argument("--replay", help="JSONL output of an earlier --batch run to send again and compare with")
     parser.add_argument("--session-id", default=None, help="Session ID (default: random UUID)")
     parser.add_argument("--user-id", default=None, help="Runtime user ID for identity/OAuth2 flows")
+    parser.add_argument("--stream", action="store_true", help="Request a streamed (text/event-stream) response")
+    parser.add_argument("--concurrency", type=int, default=4, help="Sessions in flight in batch/replay mode (default: 4)")
+    parser.add_argument("--output", default="-", help="JSONL file for batch/replay results (default: stdout)")
+    parser.add_argument("--timeout", type=float, default=300, help="Per-request read timeout in seconds (default: 300)")
     args = parser.parse_args()
 
-    session_id = args.session_id or str(uuid.uuid4())
-    print(f"Session: {session_id}\n")
+    pool_size = 1 if args.prompt is not None else args.concurrency
+    target = LocalTarget(args, pool_size) if args.url else RuntimeTarget(args, pool_size)
+    try:
+        if args.prompt is not None:
+            session_id = args.session_id or str(uuid.uuid4())
+            print(f"Session: {session_id}\n")
+            invoke(target, args.prompt, session_id, args.stream)
+            return
 
-    invoke(args.runtime_arn, args.endpoint_name, args.prompt, session_id, args.region, args.profile, args.user_id)
+        requests = read_requests(args.batch or args.replay, args.stream, replay=args.replay is not None)
+        with contextlib.ExitStack() as stack:
+            out = sys.stdout if args.output == "-" else stack.enter_context(open(args.output, "w", encoding="utf-8"))
+            started = time.perf_counter()
+            records = run_batch(target, requests, args.concurrency, out)
+            print_summary(records, time.perf_counter() - started)
+        if not all(r["ok"] for r in records):
+            sys.exit(1)
+    finally:
+        target.close()
 
 
 if __name__ == "__main__":
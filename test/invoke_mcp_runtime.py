@@ -13,6 +13,14 @@ Usage:
         --tool search_documentation \\
         --args '{"search_phrase": "Amazon S3 bucket versioning"}'
 
+    # Benchmark: every call of a JSONL workload, 16 in flight over one session
+    python test/invoke_mcp_runtime.py --runtime-arn <RUNTIME_ARN> \\
+        --workload mcp-workload.jsonl --concurrency 16
+
+    # Same against server.py running locally (no SigV4)
+    python test/invoke_mcp_runtime.py --url http://localhost:8000/mcp --no-auth \\
+        --workload mcp-workload.jsonl --repeat 5
+
 Install:
     pip install boto3 mcp botocore httpx
 """
@@ -20,6 +28,7 @@ Install:
 import argparse
 import asyncio
 import json
+import time
 from collections.abc import Generator
 
 import httpx
@@ -28,7 +37,7 @@ from botocore.awsrequest import AWSRequest
 from mcp import ClientSession
 from mcp.client.streamable_http import streamablehttp_client
 
-from config import add_aws_args, boto_session
+from config import add_aws_args, boto_session, latency_summary
 
 
 class SigV4HttpxAuth(httpx.Auth):
@@ -56,13 +65,34 @@ def build_url(runtime_arn: str, region: str) -> str:
     return f"https://bedrock-agentcore.{region}.amazonaws.com/runtimes/{encoded}/invocations"
 
 
-async def run(runtime_arn: str, region: str, profile: str | None, tool: str | None, tool_args: dict) -> None:
-    url = build_url(runtime_arn, region)
-    print(f"URL: {url}\n")
-
+def build_auth(region: str, profile: str | None) -> SigV4HttpxAuth:
+    """Resolve the AWS credentials once and sign every request with them."""
     session = boto_session(argparse.Namespace(profile=profile, region=region))
     credentials = session.get_credentials().get_frozen_credentials()
-    auth = SigV4HttpxAuth(credentials, "bedrock-agentcore", region)
+    return SigV4HttpxAuth(credentials, "bedrock-agentcore", region)
+
+
+def pooled_client_factory(pool_size: int):
+    """httpx client factory for the MCP transport with a keep-alive pool of ``pool_size`` connections.
+
+    httpx keeps only 20 idle connections by default, so with more calls in
+    flight new TLS connections would keep being opened and dropped.
+    """
+
+    def factory(headers: dict[str, str] | None = None, timeout: httpx.Timeout | None = None,
+                auth: httpx.Auth | None = None) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            headers=headers,
+            timeout=timeout or httpx.Timeout(30, read=300),
+            auth=auth,
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+        )
+
+    return factory
+
+
+async def run(url: str, auth: httpx.Auth | None, tool: str | None, tool_args: dict) -> None:
+    print(f"URL: {url}\n")
 
     async with streamablehttp_client(url, auth=auth, terminate_on_close=False) as (read, write, _):
         async with ClientSession(read, write) as session:
@@ -84,21 +114,128 @@ async def run(runtime_arn: str, region: str, profile: str | None, tool: str | No
                         print(item)
 
 
+# ---------------------------------------------------------------------------
+# Benchmark / driver mode
+# ---------------------------------------------------------------------------
+
+def read_workload(path: str) -> list[dict]:
+    """One call per JSONL line: ``{"tool": "search_documentation", "args": {...}}``."""
+    calls = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                call = json.loads(line)
+                calls.append({"tool": call["tool"], "args": call.get("args", {})})
+    return calls
+
+
+async def call_once(session: ClientSession, call: dict) -> dict:
+    started = time.perf_counter()
+    try:
+        result = await session.call_tool(call["tool"], call["args"])
+    except Exception as e:
+        return {"tool": call["tool"], "ok": False, "error": type(e).__name__,
+                "ms": (time.perf_counter() - started) * 1000}
+    sample = {"tool": call["tool"], "ok": not result.isError, "ms": (time.perf_counter() - started) * 1000}
+    if result.isError:
+        sample["error"] = "tool error"
+    return sample
+
+
+async def bench(url: str, auth: httpx.Auth | None, calls: list[dict], concurrency: int, warmup: int) -> dict:
+    """Send ``calls`` over a single MCP session with ``concurrency`` requests in flight.
+
+    The session (transport, connection pool, credentials, ``initialize``) is
+    set up once; only the ``call_tool`` requests are measured. The first
+    ``warmup`` calls are sent one at a time beforehand and not measured, so
+    they do not hit a cache they warmed themselves.
+    """
+    warmup_calls, calls = calls[:warmup], calls[warmup:]
+    started = time.perf_counter()
+    async with streamablehttp_client(
+        url, auth=auth, terminate_on_close=False, httpx_client_factory=pooled_client_factory(concurrency),
+    ) as (read, write, _):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            connect_ms = (time.perf_counter() - started) * 1000
+
+            for call in warmup_calls:
+                await call_once(session, call)
+
+            slots = asyncio.Semaphore(concurrency)
+
+            async def bounded(call: dict) -> dict:
+                async with slots:
+                    return await call_once(session, call)
+
+            started = time.perf_counter()
+            samples = await asyncio.gather(*(bounded(call) for call in calls))
+            wall_s = time.perf_counter() - started
+
+    ok = [s for s in samples if s["ok"]]
+    errors: dict[str, int] = {}
+    for s in samples:
+        if not s["ok"]:
+            key = f"{s['tool']}: {s['error']}"
+            errors[key] = errors.get(key, 0) + 1
+    per_tool: dict[str, list[float]] = {}
+    for s in ok:
+        per_tool.setdefault(s["tool"], []).append(s["ms"])
+    return {
+        "url": url,
+        "calls": len(samples),
+        "concurrency": concurrency,
+        "errors": errors,
+        "connect_ms": round(connect_ms, 2),
+        "wall_s": round(wall_s, 2),
+        "throughput_cps": round(len(ok) / wall_s, 2) if wall_s else 0.0,
+        "latency_ms": latency_summary([s["ms"] for s in ok]),
+        "tools_ms": {tool: latency_summary(values) for tool, values in sorted(per_tool.items())},
+    }
+
+
+def print_report(report: dict) -> None:
+    print(f"\n{report['calls']} calls (concurrency {report['concurrency']}) in {report['wall_s']} s — "
+          f"{report['throughput_cps']} calls/s, session setup {report['connect_ms']} ms")
+    if report["errors"]:
+        print(f"Errors: {report['errors']}")
+    print(f"\n{'':24} {'count':>7} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}")
+    rows = [("all tools", report["latency_ms"])] + [(f"  {tool}", s) for tool, s in report["tools_ms"].items()]
+    for label, s in rows:
+        print(f"{label:24} {s['count']:>7} {s['p50']:>9.1f} {s['p95']:>9.1f} {s['p99']:>9.1f} {s['max']:>9.1f}")
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Invoke an AgentCore MCP Runtime")
     add_aws_args(parser)
-    parser.add_argument("--runtime-arn", required=True)
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--runtime-arn")
+    target.add_argument("--url", help="MCP endpoint URL, e.g. http://localhost:8000/mcp for a local server.py")
+    parser.add_argument("--no-auth", action="store_true", help="Send unsigned requests (local server.py)")
     parser.add_argument("--tool", default=None)
     parser.add_argument("--args", default="{}", help="Tool arguments as JSON string")
+    parser.add_argument("--workload", default=None, help="JSONL file of tool calls to benchmark over one session")
+    parser.add_argument("--repeat", type=int, default=1, help="Passes over the workload (default: 1)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Tool calls in flight (default: 8)")
+    parser.add_argument("--warmup", type=int, default=0, help="Workload calls sent first, one at a time, and not measured (default: 0)")
+    parser.add_argument("--json", action="store_true", help="Print the benchmark report as JSON")
     args = parser.parse_args()
 
-    asyncio.run(run(
-        runtime_arn=args.runtime_arn,
-        region=args.region,
-        profile=args.profile,
-        tool=args.tool,
-        tool_args=json.loads(args.args),
-    ))
+    url = args.url or build_url(args.runtime_arn, args.region)
+    auth = None if args.no_auth else build_auth(args.region, args.profile)
+
+    if args.workload:
+        calls = read_workload(args.workload) * args.repeat
+        report = asyncio.run(bench(url, auth, calls, args.concurrency, args.warmup))
+        if args.json:
+            print(json.dumps(report, indent=2))
+        else:
+            print_report(report)
+        if report["errors"]:
+            raise SystemExit(1)
+        return
+
+    asyncio.run(run(url, auth, args.tool, json.loads(args.args)))
 
 
 if __name__ == "__main__":